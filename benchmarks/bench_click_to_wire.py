@@ -0,0 +1,99 @@
+"""
+Measures click-to-wire time of a market order with and without the hot intent cache.
+
+"before": quantity calculation, parameter building, python-binance serialization and signing.
+"after":  the cached payload is only stamped with timestamp and signature.
+
+Both paths are then sent to the local mock exchange to show the full click-to-ack time.
+
+Run from the project root:
+    python -m benchmarks.bench_click_to_wire --iterations 20000
+"""
+import argparse
+import threading
+import time
+from urllib.parse import urlencode
+
+from binance.client import Client
+
+from benchmarks.mock_exchange import MockExchange
+from benchmarks.stats import format_latency_report
+from core.event_loop import AsyncLoopThread
+from core.hot_intent import HotIntentCache, send_hot_order
+from core.place_order import calculate_quantity_from_price
+
+API_KEY = "mock-key"
+API_SECRET = "mock-secret"
+SYMBOL = "BTCUSDT"
+PRICE = 64123.4
+
+
+
+def prepare_regular(client) -> str:
+    """Click path without the cache: everything up to the encoded request body."""
+    quantity = calculate_quantity_from_price(amount_usd=100, price=PRICE, precision=3, use_decimal=False)
+    kwargs = client._get_request_kwargs("post", True, data={
+        "symbol": SYMBOL,
+        "side": "BUY",
+        "type": "MARKET",
+        "quantity": quantity,
+        "newOrderRespType": "RESULT",
+    })
+    return urlencode(kwargs["data"])
+
+
+def time_calls(func, iterations: int) -> list[float]:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--rest-port", type=int, default=18083)
+    args = parser.parse_args()
+
+    client = Client(API_KEY, API_SECRET, ping=False)
+    cache = HotIntentCache(API_SECRET, recv_window=client.REQUEST_RECVWINDOW)
+    cache.configure(SYMBOL, 100, 3, False, 1.0, 2.0)
+    cache.refresh(PRICE)
+
+    print("Click-to-wire (CPU time until the request body is ready):")
+    print(format_latency_report("before (build + sign)", time_calls(lambda: prepare_regular(client), args.iterations)))
+    print(format_latency_report("after (stamp only)", time_calls(lambda: cache.stamp("BUY", PRICE), args.iterations)))
+
+    # Full round-trip against the mock exchange over the same HTTP session
+    server_thread = AsyncLoopThread(name="mock-exchange")
+    server_thread.start()
+    ready = threading.Event()
+    server_thread.submit(MockExchange().serve("127.0.0.1", args.rest_port, args.rest_port + 1, ready))
+    ready.wait(5)
+    client.FUTURES_URL = f"http://127.0.0.1:{args.rest_port}/fapi"
+
+    def regular_order() -> None:
+        client.futures_create_order(
+            symbol=SYMBOL,
+            side="BUY",
+            type="MARKET",
+            quantity=calculate_quantity_from_price(100, PRICE, 3, False),
+            newOrderRespType="RESULT"
+        )
+
+    def hot_order() -> None:
+        send_hot_order(client, cache.stamp("BUY", PRICE))
+
+    time_calls(regular_order, 10)  # warm the connection
+    print("Click-to-ack against the local mock exchange:")
+    print(format_latency_report("before (build + sign)", time_calls(regular_order, args.orders)))
+    print(format_latency_report("after (stamp only)", time_calls(hot_order, args.orders)))
+
+    server_thread.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Throughput of the stream frame decoders in core/websockets_listener.py.
+
+Decodes the same frames with every installed decoder and reports messages per
+second and CPU time per message. All decoders are first checked to produce the
+same events as the stdlib reference decoder.
+
+Frames are read from a file with one raw frame per line (plain or .gz), or
+from a recording made by the stream worker (see core/frame_recorder.py).
+Without a file, realistic trade and bookTicker frames are generated.
+
+Run from the project root:
+    python -m benchmarks.bench_decoder --messages 200000
+    python -m benchmarks.bench_decoder --frames recordings/stream.frames.gz
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+
+from core.websockets_listener import available_decoders, decode_json
+
+
+def generate_frames(count: int, seed: int = 42) -> list:
+    """Generates combined-stream frames, two bookTicker updates per trade like a busy symbol."""
+    rng = random.Random(seed)
+    frames = []
+    price = 67123.4
+    trade_id = 5123456789
+    event_time = 1718000000000
+    for i in range(count):
+        event_time += rng.randint(0, 3)
+        price = round(price + rng.choice((-0.1, 0.0, 0.1)), 1)
+        if i % 3 == 0:
+            trade_id += 1
+            data = {
+                "e": "trade", "E": event_time, "T": event_time - 2, "s": "BTCUSDT", "t": trade_id,
+                "p": f"{price:.2f}", "q": f"{rng.randint(1, 5000) / 1000:.3f}", "X": "MARKET",
+                "m": rng.random() < 0.5,
+            }
+            stream = "btcusdt@trade"
+        else:
+            data = {
+                "e": "bookTicker", "u": 400900217 + i, "s": "BTCUSDT",
+                "b": f"{price - 0.1:.2f}", "B": f"{rng.uniform(0, 50):.3f}",
+                "a": f"{price:.2f}", "A": f"{rng.uniform(0, 50):.3f}",
+                "T": event_time - 2, "E": event_time,
+            }
+            stream = "btcusdt@bookTicker"
+        frames.append(json.dumps({"stream": stream, "data": data}, separators=(",", ":")).encode())
+    return frames
+
+
+def load_frames(path: str) -> list:
+    """Reads one raw frame per line from a plain or gzip file.
+
+    Recordings prefix every frame with its receive timestamp, which is dropped.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        lines = [line.rstrip(b"\r\n") for line in f if line.strip()]
+    return [line.partition(b" ")[2] if line[:1].isdigit() else line for line in lines]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", help="file with one recorded frame per line (.gz supported)")
+    parser.add_argument("--messages", type=int, default=200000, help="number of generated frames")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else generate_frames(args.messages)
+    decoders = available_decoders()
+
+    expected = [decode_json(frame) for frame in frames]
+    for name, decode in decoders.items():
+        mismatches = sum(1 for frame, event in zip(frames, expected) if decode(frame) != event)
+        if mismatches:
+            print(f"{name}: {mismatches} frames decoded differently from the stdlib reference")
+
+    print(f"{len(frames)} frames, best of {args.repeat} runs:")
+    print(f"  {'decoder':<10} {'msgs/s':>12} {'CPU/msg':>10}")
+    for name, decode in decoders.items():
+        best_wall = best_cpu = float("inf")
+        for _ in range(args.repeat):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            for frame in frames:
+                decode(frame)
+            best_wall = min(best_wall, time.perf_counter() - wall_start)
+            best_cpu = min(best_cpu, time.process_time() - cpu_start)
+        print(f"  {name:<10} {len(frames) / best_wall:12,.0f} {best_cpu / len(frames) * 1e6:8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares fill detection latency: REST polling vs user data stream events.
+
+The exchange is simulated: an order fills `--fill-ms` after creation, every REST
+call costs `--rtt-ms`, and a fill event reaches the client `--push-ms` after the fill.
+
+Run from the project root:
+    python -m benchmarks.bench_fill_detection --runs 50
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from core import place_order
+from core.fill_tracker import FillTracker
+
+
+
+class SimulatedExchange:
+    """Minimal stand-in for the Binance client used by `market_order`."""
+
+    def __init__(self, rtt: float, fill_delay: float, push_delay: float, fill_tracker=None):
+        self.rtt = rtt
+        self.fill_delay = fill_delay
+        self.push_delay = push_delay
+        self.fill_tracker = fill_tracker
+        self.rest_calls = 0
+        self.filled_at = None
+        self._next_order_id = 1
+
+    def futures_create_order(self, **params) -> dict:
+        self.rest_calls += 1
+        time.sleep(self.rtt / 2)
+        order_id = self._next_order_id
+        self._next_order_id += 1
+        self.filled_at = time.perf_counter() + self.fill_delay
+
+        # The exchange pushes the fill event independently of REST traffic
+        if self.fill_tracker is not None:
+            threading.Timer(
+                self.fill_delay + self.push_delay,
+                self.fill_tracker.on_order_update,
+                args=({"i": order_id, "X": "FILLED", "ap": "100.0"},)
+            ).start()
+
+        time.sleep(self.rtt / 2)
+        return {"orderId": order_id}
+
+    def futures_get_order(self, symbol: str, orderId: int) -> dict:
+        self.rest_calls += 1
+        time.sleep(self.rtt / 2)
+        status = "FILLED" if time.perf_counter() >= self.filled_at else "NEW"
+        time.sleep(self.rtt / 2)
+        return {"status": status, "avgPrice": "100.0"}
+
+
+def run_once(args, use_events: bool) -> tuple[float, int]:
+    """Returns the delay between the fill and its detection, and the REST call count."""
+    fill_tracker = FillTracker() if use_events else None
+    if fill_tracker is not None:
+        fill_tracker.is_streaming = True
+
+    exchange = SimulatedExchange(
+        rtt=args.rtt_ms / 1000,
+        fill_delay=args.fill_ms / 1000,
+        push_delay=args.push_ms / 1000,
+        fill_tracker=fill_tracker
+    )
+    place_order.market_order(exchange, "BTCUSDT", "BUY", 0.001, fill_tracker=fill_tracker)
+    detected_at = time.perf_counter()
+    return (detected_at - exchange.filled_at) * 1000, exchange.rest_calls
+
+
+def report(name: str, results: list[tuple[float, int]]) -> None:
+    delays = sorted(r[0] for r in results)
+    calls = statistics.mean(r[1] for r in results)
+    p95 = delays[int(len(delays) * 0.95) - 1] if len(delays) >= 20 else delays[-1]
+    print(
+        f"{name:<12} fill->detected  median {statistics.median(delays):7.2f} ms"
+        f"  p95 {p95:7.2f} ms   REST calls/order {calls:5.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="REST round-trip time")
+    parser.add_argument("--fill-ms", type=float, default=5.0, help="matching delay after create")
+    parser.add_argument("--push-ms", type=float, default=10.0, help="user stream delivery delay")
+    args = parser.parse_args()
+
+    polling = [run_once(args, use_events=False) for _ in range(args.runs)]
+    events = [run_once(args, use_events=True) for _ in range(args.runs)]
+
+    report("polling", polling)
+    report("user stream", events)
+    saved = statistics.median(r[0] for r in polling) - statistics.median(r[0] for r in events)
+    print(f"Median time saved before SL/TP placement: {saved:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
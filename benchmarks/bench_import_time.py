@@ -0,0 +1,141 @@
+"""
+Import-time audit of the app's entry points, as a regression benchmark.
+
+Imports each entry point in a fresh interpreter with `python -X importtime` and reports
+the median total time, the slowest modules it loads and the direct imports that cost
+the most. A run fails (exit status 1) when an entry point exceeds its time budget or
+loads a module that is meant to be imported later:
+- core.hermesMainWindow, everything the window needs before it is shown; python-binance,
+  aiohttp, requests and the websockets client are loaded by the background startup
+- core.websockets_listener, what the spawned stream worker process imports; no Qt and
+  no python-binance
+
+The first import of each entry point compiles the bytecode cache and is not counted.
+
+Run from the project root:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --runs 10 --top 20
+    python -m benchmarks.bench_import_time --module binance --budget-ms 0
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Entry point -> (budget in ms, modules it must not load)
+ENTRY_POINTS = {
+    "core.hermesMainWindow": (
+        400,
+        ("binance", "aiohttp", "requests", "urllib3", "dateparser", "websockets.asyncio.client")
+    ),
+    "core.websockets_listener": (250, ("PyQt5", "binance", "aiohttp", "requests", "dateparser")),
+}
+
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """Reads `-X importtime` output into (module, depth, self us, cumulative us) in import order.
+
+    Lines look like `import time:       412 |       1093 |     core.latency`, the module
+    indented by two spaces per nesting level.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return entries
+
+
+def target_tree(entries: list, module: str) -> list[tuple[str, int, int, int]]:
+    """Entries imported by `import module`, excluding what the interpreter loads at startup.
+
+    `-X importtime` prints a module after its imports, so the tree of a top-level import is
+    the run of nested entries right before it.
+    """
+    end = max(i for i, (name, depth, _, _) in enumerate(entries) if name == module and depth == 0)
+    start = end
+    while start > 0 and entries[start - 1][1] > 0:
+        start -= 1
+    return entries[start:end + 1]
+
+
+def measure(module: str) -> list[tuple[str, int, int, int]]:
+    """Imports `module` in a new interpreter; returns the entries of its import tree."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    return target_tree(parse_importtime(result.stderr), module)
+
+
+def total_ms(tree: list) -> float:
+    """Cumulative time of the top-level entries of a tree, in ms."""
+    return sum(cumulative for _, depth, _, cumulative in tree if depth == 0) / 1000
+
+
+def audit(module: str, runs: int, top: int, budget_ms: float | None, deferred: tuple) -> bool:
+    """Prints the import report of one entry point; returns False on a regression."""
+    measure(module)  # bytecode cache
+    trees = [measure(module) for _ in range(runs)]
+    totals = sorted(total_ms(tree) for tree in trees)
+    median = statistics.median(totals)
+    # The run closest to the median is the one broken down
+    tree = min(trees, key=lambda t: abs(total_ms(t) - median))
+
+    print(f"{module}: median {median:.1f} ms, min {totals[0]:.1f} ms, max {totals[-1]:.1f} ms"
+          f" ({runs} runs, {len(tree)} modules)")
+
+    print("  Slowest modules (self time):")
+    for name, _, self_us, _ in sorted(tree, key=lambda entry: -entry[2])[:top]:
+        print(f"    {self_us / 1000:8.2f} ms  {name}")
+
+    print("  Direct imports (cumulative time):")
+    direct = [entry for entry in tree if entry[1] == 1]
+    for name, _, _, cumulative in sorted(direct, key=lambda entry: -entry[3])[:top]:
+        print(f"    {cumulative / 1000:8.2f} ms  {name}")
+
+    ok = True
+    loaded = {name for name, _, _, _ in tree}
+    early = sorted(
+        name for name in loaded
+        if any(name == prefix or name.startswith(prefix + ".") for prefix in deferred)
+    )
+    if early:
+        print(f"  REGRESSION: loads {len(early)} deferred modules: {', '.join(early[:10])}")
+        ok = False
+    if budget_ms is not None and median > budget_ms:
+        print(f"  REGRESSION: {median:.1f} ms is over the budget of {budget_ms:g} ms")
+        ok = False
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", action="append", help="audit this module instead of the entry points")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="modules listed per section")
+    parser.add_argument("--budget-ms", type=float, help="time budget overriding the defaults")
+    args = parser.parse_args()
+
+    if args.module:
+        targets = {module: (args.budget_ms, ()) for module in args.module}
+    else:
+        targets = {
+            module: (budget if args.budget_ms is None else args.budget_ms, deferred)
+            for module, (budget, deferred) in ENTRY_POINTS.items()
+        }
+
+    ok = True
+    for module, (budget_ms, deferred) in targets.items():
+        ok = audit(module, args.runs, args.top, budget_ms, deferred) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+End-to-end latency suite against the local mock exchange (benchmarks/mock_exchange.py).
+
+Runs the real order path (`place_market_order` with the user data stream feeding a
+`FillTracker`) and the real stream worker process against the mock, and reports
+percentiles of:
+- click-to-ack:     click until the exchange acknowledged the market order
+- click-to-fill:    click until the app knows the order is filled (RESULT response,
+                    ORDER_TRADE_UPDATE event or status poll, whichever comes first)
+- fill-to-SL/TP:    fill known until the stop-loss and take-profit are acknowledged
+- tick-to-decision: the mock sending a trade until the UI side has read the price from
+                    the market data table and refreshed the hot order intent
+
+The order path also records its own stage timestamps (core/latency.py); their
+histograms are printed as the in-app breakdown of each mode.
+
+Everything runs offline on 127.0.0.1; exchange latency, fill delay, partial fills and
+errors are configurable like on the mock.
+
+Run from the project root:
+    python -m benchmarks.bench_latency_suite --orders 200 --ticks 1000
+    python -m benchmarks.bench_latency_suite --latency-ms 5 --fill-delay-ms 3 --partial-fills 3
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import select
+import socket
+import threading
+import time
+
+from binance.client import Client
+
+from benchmarks.mock_exchange import ERRORS, MockExchange
+from benchmarks.stats import format_latency_report
+from core.event_loop import AsyncLoopThread
+from core.fill_tracker import FillTracker
+from core.hot_intent import HotIntentCache
+from core.latency import LatencyRecorder
+from core.market_data_table import MarketDataTable
+from core.place_order import (
+    EXECUTION_MODE_RESULT_BATCH,
+    EXECUTION_MODE_SEQUENTIAL,
+    place_market_order,
+)
+from core.user_data_stream import start_user_data_listener
+from core.websockets_listener import CMD_STOP, CMD_SUBSCRIBE, DECODER_AUTO, run_stream_worker
+
+API_KEY = "mock-key"
+API_SECRET = "mock-secret"
+SYMBOL = "BTCUSDT"
+AMOUNT_USD = 100
+QUANTITY_PRECISION = 3
+PRICE_PRECISION = 1
+ST_PERCENTAGE = 1.0
+TP_PERCENTAGE = 2.0
+PROTECTIVE_ORDERS = ("STOP_MARKET", "LIMIT", "BATCH")
+
+
+
+class TimedClient:
+    """Wraps a python-binance `Client` and records when order responses arrive."""
+
+    def __init__(self, client: Client):
+        self.client = client
+        self.responses = []  # (order type, time.monotonic_ns(), response)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def futures_create_order(self, **params):
+        response = self.client.futures_create_order(**params)
+        self.responses.append((params["type"], time.monotonic_ns(), response))
+        return response
+
+    def futures_place_batch_order(self, **params):
+        response = self.client.futures_place_batch_order(**params)
+        self.responses.append(("BATCH", time.monotonic_ns(), response))
+        return response
+
+    def futures_get_order(self, **params):
+        response = self.client.futures_get_order(**params)
+        if response.get("status") == "FILLED":
+            self.responses.append(("STATUS", time.monotonic_ns(), response))
+        return response
+
+
+class TimedFillTracker(FillTracker):
+    """Records when the fill event of each order arrived."""
+
+    def __init__(self):
+        super().__init__()
+        self.filled_at = {}  # orderId -> time.monotonic_ns()
+
+    def on_order_update(self, order: dict) -> None:
+        if order.get("X") == "FILLED":
+            self.filled_at.setdefault(order["i"], time.monotonic_ns())
+        super().on_order_update(order)
+
+
+def run_orders(
+        exchange: MockExchange,
+        client: TimedClient,
+        fill_tracker,
+        mode: str,
+        count: int,
+        latency: LatencyRecorder | None = None
+) -> dict:
+    """Places `count` orders through the real order path; returns latency samples in ms per stage."""
+    samples = {"click-to-ack": [], "click-to-fill": [], "fill-to-SL/TP": []}
+    failures = 0
+    for i in range(count):
+        side = "BUY" if i % 2 == 0 else "SELL"
+        client.responses.clear()
+        click = time.monotonic_ns()
+        latency_trace = latency.begin() if latency is not None else None
+        # The order path reports its own timings; keep them out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            order_id = place_market_order(
+                client, SYMBOL, side, AMOUNT_USD, QUANTITY_PRECISION, PRICE_PRECISION,
+                ST_PERCENTAGE, TP_PERCENTAGE, exchange.price(SYMBOL), use_decimal=False,
+                fill_tracker=fill_tracker, execution_mode=mode, price_age_ms=0,
+                latency_trace=latency_trace
+            )
+        protective = [at for name, at, _ in client.responses if name in PROTECTIVE_ORDERS]
+        market = [(at, response) for name, at, response in client.responses if name == "MARKET"]
+        if order_id is None or not market or not protective:
+            failures += 1
+            continue
+
+        acked_at, response = market[0]
+        fill_times = [at for name, at, _ in client.responses if name == "STATUS"]
+        if response.get("status") == "FILLED":
+            fill_times.append(acked_at)
+        if order_id in fill_tracker.filled_at:
+            fill_times.append(fill_tracker.filled_at[order_id])
+        filled_at = min(fill_times)
+
+        samples["click-to-ack"].append((acked_at - click) / 1e6)
+        samples["click-to-fill"].append((filled_at - click) / 1e6)
+        samples["fill-to-SL/TP"].append((max(protective) - filled_at) / 1e6)
+
+        # Untimed: leave no protective orders behind for the next round
+        client.client.futures_cancel_all_open_orders(symbol=SYMBOL)
+
+    if failures:
+        print(f"  {failures} of {count} orders failed")
+    return samples
+
+
+def run_ticks(exchange: MockExchange, ws_port: int, count: int, decoder: str) -> list[float]:
+    """Measures tick-to-decision through the stream worker process; returns samples in ms."""
+    table = MarketDataTable.create()
+    notify_receiver, notify_sender = socket.socketpair()
+    notify_receiver.setblocking(False)
+    notify_sender.setblocking(False)
+    command_receiver, commands = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(
+        target=run_stream_worker,
+        args=(command_receiver, table.name, notify_sender, decoder, None, f"ws://127.0.0.1:{ws_port}/stream"),
+        daemon=True
+    )
+    worker.start()
+
+    # The decision made on every price update in the UI: re-signing the hot order payloads
+    cache = HotIntentCache(API_SECRET)
+    cache.configure(SYMBOL, AMOUNT_USD, QUANTITY_PRECISION, False, ST_PERCENTAGE, TP_PERCENTAGE)
+
+    samples = []
+    last_event_time = 0
+    try:
+        commands.send((CMD_SUBSCRIBE, SYMBOL))
+        deadline = time.monotonic() + 30 + count * exchange.tick_interval * 2
+        while len(samples) < count and time.monotonic() < deadline:
+            # Same wake-up protocol as core/price_notifier.py: drain, re-arm, then read
+            select.select([notify_receiver], [], [], 1)
+            try:
+                while notify_receiver.recv(4096):
+                    pass
+            except BlockingIOError:
+                pass
+            table.clear_notify_pending()
+            snapshot = table.read(SYMBOL)
+            if snapshot is None or snapshot.event_time == last_event_time or not snapshot.last_price:
+                continue
+            last_event_time = snapshot.event_time
+            cache.refresh(snapshot.last_price)
+            decided_at = time.monotonic_ns()
+            sent_at = exchange.tick_times.get(snapshot.event_time)
+            if sent_at is not None:
+                samples.append((decided_at - sent_at) / 1e6)
+    finally:
+        commands.send((CMD_STOP,))
+        worker.join(5)
+        notify_receiver.close()
+        notify_sender.close()
+        table.close()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=100, help="orders per execution mode")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mock processing delay per request")
+    parser.add_argument("--fill-delay-ms", type=float, default=0.0, help="mock time until a market order fills")
+    parser.add_argument("--partial-fills", type=int, default=1, help="fills per market order")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of rejected order requests")
+    parser.add_argument("--error", choices=sorted(ERRORS), default="overloaded")
+    parser.add_argument("--tick-ms", type=float, default=10.0, help="mock market tick interval")
+    parser.add_argument("--decoder", default=DECODER_AUTO)
+    parser.add_argument("--rest-port", type=int, default=18091)
+    parser.add_argument("--ws-port", type=int, default=18092)
+    args = parser.parse_args()
+
+    exchange = MockExchange(
+        latency=args.latency_ms / 1000,
+        fill_delay=args.fill_delay_ms / 1000,
+        partial_fills=args.partial_fills,
+        error_rate=args.error_rate,
+        error=args.error,
+        tick_interval=args.tick_ms / 1000
+    )
+    server_thread = AsyncLoopThread(name="mock-exchange")
+    server_thread.start()
+    ready = threading.Event()
+    server_thread.submit(exchange.serve("127.0.0.1", args.rest_port, args.ws_port, ready))
+    ready.wait(5)
+
+    rest_client = Client(API_KEY, API_SECRET, ping=False)
+    rest_client.FUTURES_URL = f"http://127.0.0.1:{args.rest_port}/fapi"
+    client = TimedClient(rest_client)
+
+    fill_tracker = TimedFillTracker()
+    start_user_data_listener(rest_client, fill_tracker, url=f"ws://127.0.0.1:{args.ws_port}/ws/")
+    deadline = time.monotonic() + 5
+    while not fill_tracker.is_streaming and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    for mode in (EXECUTION_MODE_SEQUENTIAL, EXECUTION_MODE_RESULT_BATCH):
+        print(f"Order path, {mode} mode ({args.orders} orders):")
+        run_orders(exchange, client, fill_tracker, mode, 5)  # warm the connection
+        latency = LatencyRecorder()
+        for name, samples in run_orders(exchange, client, fill_tracker, mode, args.orders, latency).items():
+            print("  " + format_latency_report(name, samples))
+        print("  In-app stage breakdown (core/latency.py):")
+        for name, stats in latency.summary().items():
+            if stats["count"]:
+                print(
+                    f"    {name:<20} p50 {stats['p50']:8.3f} ms  p99 {stats['p99']:8.3f} ms"
+                    f"  max {stats['max']:8.3f} ms"
+                )
+
+    print(f"Market data, one trade every {args.tick_ms:g} ms ({args.ticks} ticks):")
+    print("  " + format_latency_report("tick-to-decision", run_ticks(exchange, args.ws_port, args.ticks, args.decoder)))
+
+    server_thread.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Throughput of the local order book (core/order_book.py).
+
+Applies generated diff-depth events to a 1000-level book and reports events and
+level updates per second, then times fill estimates for a few order sizes.
+A busy futures symbol sends 10 diff events per second with up to a few hundred
+level changes each at the 100 ms speed.
+
+Run from the project root:
+    python -m benchmarks.bench_order_book --events 20000 --levels-per-event 50
+"""
+import argparse
+import random
+import time
+import timeit
+
+from core.order_book import DEPTH_LIMIT, OrderBook
+
+
+def build_snapshot(mid: float, tick: float, last_update_id: int) -> dict:
+    """Returns a REST-like snapshot with DEPTH_LIMIT levels per side around `mid`."""
+    return {
+        "lastUpdateId": last_update_id,
+        "bids": [[f"{mid - (i + 1) * tick:.1f}", "1.000"] for i in range(DEPTH_LIMIT)],
+        "asks": [[f"{mid + i * tick:.1f}", "1.000"] for i in range(DEPTH_LIMIT)],
+    }
+
+
+def generate_events(count: int, levels_per_event: int, mid: float, tick: float, first_id: int) -> list:
+    """Generates sequenced diff events, mostly near the top of the book, 20% removals."""
+    rng = random.Random(7)
+    events = []
+    # The first event straddles the snapshot ID, as on the exchange
+    update_id = first_id - 2
+    for _ in range(count):
+        bids, asks = [], []
+        for _ in range(levels_per_event):
+            distance = int(rng.expovariate(1 / 30))
+            quantity = "0" if rng.random() < 0.2 else f"{rng.randint(1, 5000) / 1000:.3f}"
+            if rng.random() < 0.5:
+                bids.append([f"{mid - (distance + 1) * tick:.1f}", quantity])
+            else:
+                asks.append([f"{mid + distance * tick:.1f}", quantity])
+        events.append({"U": update_id + 1, "u": update_id + 5, "pu": update_id, "b": bids, "a": asks})
+        update_id += 5
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--levels-per-event", type=int, default=50)
+    args = parser.parse_args()
+
+    mid, tick, first_id = 67000.0, 0.1, 1000
+    book = OrderBook("BTCUSDT")
+    book.load_snapshot(build_snapshot(mid, tick, first_id))
+    events = generate_events(args.events, args.levels_per_event, mid, tick, first_id)
+
+    start = time.perf_counter()
+    for event in events:
+        if not book.apply_diff(event):
+            raise RuntimeError("sequence gap in generated events")
+    elapsed = time.perf_counter() - start
+
+    print(f"Applied {len(events)} events ({args.levels_per_event} levels each) in {elapsed * 1000:.0f} ms")
+    print(f"  {len(events) / elapsed:,.0f} events/s, {len(events) * args.levels_per_event / elapsed:,.0f} levels/s")
+    print(f"  {elapsed / len(events) * 1e6:.1f} us per event; book has {len(book.bids.keys)} bids, {len(book.asks.keys)} asks")
+
+    print("Fill estimate (BUY):")
+    for amount_usd in (100, 10_000, 1_000_000):
+        estimate = book.estimate_fill("BUY", amount_usd)
+        seconds = min(timeit.repeat(lambda: book.estimate_fill("BUY", amount_usd), number=2000, repeat=3)) / 2000
+        print(
+            f"  {amount_usd:>9,} USD: {seconds * 1e6:7.1f} us, VWAP {estimate.vwap:.2f}, "
+            f"slippage {estimate.slippage_bps:.2f} bps, filled {estimate.filled_usd:,.0f} USD"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares order latency over REST and over the WebSocket API against the local mock exchange.
+
+Both transports send the same market order with the same signing work; the mock
+adds `--latency-ms` of processing time to every request.
+
+Run from the project root:
+    python -m benchmarks.bench_order_transport --orders 200
+"""
+import argparse
+import threading
+import time
+
+from binance.client import Client
+
+from benchmarks.mock_exchange import MockExchange
+from benchmarks.stats import format_latency_report
+from core.event_loop import AsyncLoopThread
+from core.ws_api_client import WsApiOrderClient
+
+API_KEY = "mock-key"
+API_SECRET = "mock-secret"
+
+
+
+def time_orders(client, count: int) -> list[float]:
+    """Returns the latency of each market order in milliseconds."""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        client.futures_create_order(
+            symbol="BTCUSDT",
+            side="BUY",
+            type="MARKET",
+            quantity=0.001,
+            newOrderRespType="RESULT"
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rest-port", type=int, default=18081)
+    parser.add_argument("--ws-port", type=int, default=18082)
+    args = parser.parse_args()
+
+    # The mock runs on its own event-loop thread, the clients call it from this thread
+    server_thread = AsyncLoopThread(name="mock-exchange")
+    server_thread.start()
+    ready = threading.Event()
+    server_thread.submit(MockExchange(latency=args.latency_ms / 1000).serve(
+        "127.0.0.1", args.rest_port, args.ws_port, ready
+    ))
+    ready.wait(5)
+
+    rest_client = Client(API_KEY, API_SECRET, ping=False)
+    rest_client.FUTURES_URL = f"http://127.0.0.1:{args.rest_port}/fapi"
+
+    ws_client = WsApiOrderClient(API_KEY, API_SECRET, f"ws://127.0.0.1:{args.ws_port}")
+    ws_client.connect()
+
+    # Warm both connections so only steady-state latency is measured
+    time_orders(rest_client, args.warmup)
+    time_orders(ws_client, args.warmup)
+
+    print(format_latency_report("REST order", time_orders(rest_client, args.orders)))
+    print(format_latency_report("WebSocket API order", time_orders(ws_client, args.orders)))
+
+    ws_client.close()
+    server_thread.stop()
+
+
+if __name__ == "__main__":
+    main()
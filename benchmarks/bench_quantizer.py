@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of order quantization: Decimal and float `round` paths vs the integer quantizer.
+
+Also counts how often each path produces a quantity worth more than the requested
+USD amount (rounded up past the step size) or a price that is not a tick multiple.
+
+Run from the project root:
+    python -m benchmarks.bench_quantizer --iterations 200000
+"""
+import argparse
+import random
+import timeit
+from decimal import Decimal
+
+from core.place_order import calculate_quantity_from_price
+from core.quantizer import SymbolQuantizer
+from core.symbol_registry import SymbolInfo
+
+SYMBOL_DATA = {
+    "symbol": "BTCUSDT",
+    "status": "TRADING",
+    "quantityPrecision": 3,
+    "pricePrecision": 2,
+    "filters": {
+        "LOT_SIZE": {"stepSize": "0.001", "minQty": "0.001", "maxQty": "1000"},
+        "MARKET_LOT_SIZE": {"stepSize": "0.001", "minQty": "0.001", "maxQty": "120"},
+        "PRICE_FILTER": {"tickSize": "0.10", "minPrice": "556.80", "maxPrice": "4529764"},
+        "MIN_NOTIONAL": {"notional": "100"},
+    },
+}
+
+
+
+def count_errors(quantizer, samples) -> dict:
+    """Counts quantities above the USD amount and prices off the tick grid for each path."""
+    errors = {"round": 0, "decimal": 0, "quantizer": 0}
+    tick = Decimal("0.1")
+    for amount_usd, price, target_price in samples:
+        for name, quantity in (
+            ("round", calculate_quantity_from_price(amount_usd, price, 3, use_decimal=False)),
+            ("decimal", calculate_quantity_from_price(amount_usd, price, 3, use_decimal=True)),
+            ("quantizer", quantizer.quantity_for_usd(amount_usd, price)),
+        ):
+            if quantity is not None and Decimal(str(quantity)) * Decimal(str(price)) > Decimal(str(amount_usd)):
+                errors[name] += 1
+
+        # The legacy price path rounds to the number of decimals of tickSize
+        if Decimal(str(round(target_price, 1))) % tick:
+            errors["round"] += 1
+        if Decimal(quantizer.format_price(target_price)) % tick:
+            errors["quantizer"] += 1
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--samples", type=int, default=20000)
+    args = parser.parse_args()
+
+    quantizer = SymbolQuantizer(SymbolInfo(SYMBOL_DATA))
+    amount_usd, price, target_price = 250.0, 64123.4, 64123.4 * 1.0137
+
+    cases = {
+        "float round": lambda: calculate_quantity_from_price(amount_usd, price, 3, use_decimal=False),
+        "Decimal": lambda: calculate_quantity_from_price(amount_usd, price, 3, use_decimal=True),
+        "integer quantizer": lambda: quantizer.quantity_for_usd(amount_usd, price),
+        "price round()": lambda: round(target_price, 1),
+        "price quantizer": lambda: quantizer.format_price(target_price),
+    }
+    print("Time per call:")
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.iterations, repeat=3))
+        print(f"  {name:<20} {seconds / args.iterations * 1e9:8.1f} ns")
+
+    rng = random.Random(42)
+    samples = []
+    for _ in range(args.samples):
+        sample_price = round(rng.uniform(1000, 100000), 1)
+        samples.append((
+            round(rng.uniform(100, 5000), 2),
+            sample_price,
+            sample_price * rng.uniform(0.9, 1.1),
+        ))
+
+    print(f"Invalid results out of {args.samples} random orders:")
+    for name, count in count_errors(quantizer, samples).items():
+        print(f"  {name:<20} {count}")
+
+
+if __name__ == "__main__":
+    main()
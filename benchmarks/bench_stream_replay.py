@@ -0,0 +1,123 @@
+"""
+End-to-end throughput of the stream worker on a replayed recording.
+
+Starts the replay server (benchmarks/replay_server.py) and the real stream worker
+process, subscribes to one symbol and measures the time until every trade and
+bookTicker event of that symbol is published into the market data table. With
+`--speed max` this is the worker's ceiling; with a speed factor it shows whether
+the worker keeps up with an N times faster market.
+
+Without `--frames`, frames generated by benchmarks/bench_decoder.py are replayed
+one millisecond apart.
+
+Run from the project root:
+    python -m benchmarks.bench_stream_replay --messages 200000 --speed max
+    python -m benchmarks.bench_stream_replay --frames recordings/stream.frames.gz --speed 20
+"""
+import argparse
+import multiprocessing
+import socket
+import threading
+import time
+
+from benchmarks.bench_decoder import generate_frames
+from benchmarks.replay_server import ReplayServer, load_recording, parse_speed
+from core.candles import CandleStore
+from core.event_loop import AsyncLoopThread
+from core.market_data_table import MarketDataTable
+from core.websockets_listener import (
+    CMD_STOP,
+    CMD_SUBSCRIBE,
+    DECODER_AUTO,
+    decode_json,
+    run_stream_worker,
+)
+
+
+def generated_recording(count: int) -> list:
+    """Generated frames as (receive time ns, stream name, frame) tuples, 1 ms apart."""
+    start = time.time_ns()
+    frames = []
+    for i, frame in enumerate(generate_frames(count)):
+        stream = "btcusdt@trade" if i % 3 == 0 else "btcusdt@bookTicker"
+        frames.append((start + i * 1_000_000, stream, frame))
+    return frames
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", help="recording written by the stream worker")
+    parser.add_argument("--messages", type=int, default=200000, help="number of generated frames")
+    parser.add_argument("--symbol", default="BTCUSDT")
+    parser.add_argument("--speed", type=parse_speed, default=None, help="speed factor, or 'max' (default)")
+    parser.add_argument("--decoder", default=DECODER_AUTO)
+    parser.add_argument("--port", type=int, default=18090)
+    args = parser.parse_args()
+
+    symbol = args.symbol.upper()
+    frames = load_recording(args.frames) if args.frames else generated_recording(args.messages)
+    expected = 0
+    for _, _, frame in frames:
+        event = decode_json(frame)
+        if event is not None and event[1] == symbol:
+            expected += 1
+    if not expected:
+        raise SystemExit(f"No {symbol} events in the recording")
+
+    server_thread = AsyncLoopThread(name="replay-server")
+    server_thread.start()
+    ready = threading.Event()
+    server = ReplayServer(frames, args.speed)
+    server_thread.submit(server.serve("127.0.0.1", args.port, ready))
+    ready.wait(5)
+
+    table = MarketDataTable.create()
+    candles = CandleStore.create(slots=table.slot_count)
+    notify_receiver, notify_sender = socket.socketpair()
+    command_receiver, commands = multiprocessing.Pipe(duplex=False)
+    worker = multiprocessing.Process(
+        target=run_stream_worker,
+        args=(
+            command_receiver, table.name, notify_sender, args.decoder, candles.name,
+            f"ws://127.0.0.1:{args.port}/stream"
+        ),
+        daemon=True
+    )
+    worker.start()
+    try:
+        while not table.read_metrics().connected:
+            time.sleep(0.01)
+
+        start = time.perf_counter()
+        commands.send((CMD_SUBSCRIBE, symbol))
+        slot = None
+        while slot is None:
+            slot = table.find_slot(symbol)
+        # The slot is written once when assigned, then twice per published event
+        target_seq = 2 + 2 * expected
+        while (snapshot := table.read_slot(slot)) is None or snapshot.seq < target_seq:
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+    finally:
+        commands.send((CMD_STOP,))
+        worker.join(5)
+        server_thread.stop()
+        notify_receiver.close()
+        notify_sender.close()
+        table.close()
+        candles.close()
+
+    recorded = (frames[-1][0] - frames[0][0]) / 1e9
+    print(f"{expected} {symbol} events of {len(frames)} frames, decoder {args.decoder}")
+    if args.speed is None:
+        print(f"  replayed at max speed in {elapsed * 1000:.0f} ms: {expected / elapsed:,.0f} events/s")
+    else:
+        target = recorded / args.speed
+        print(
+            f"  {recorded:.1f} s recorded at {args.speed:g}x: target {target:.2f} s, "
+            f"published in {elapsed:.2f} s ({expected / elapsed:,.0f} events/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,732 @@
+"""
+Local mock of Binance Futures for offline latency benchmarks.
+
+Serves the same exchange state over every interface the app uses:
+- REST (HTTP/1.1 keep-alive) under /fapi: order (place, status, cancel), batchOrders,
+  openOrders, allOpenOrders, exchangeInfo, ticker/price, depth, listenKey,
+  positionRisk (v3), balance (v3), time, ping
+- WebSocket API: order.place, order.status, order.cancel, ticker.price
+- Market streams: /stream (combined, SUBSCRIBE/UNSUBSCRIBE) and /ws/<stream> with
+  trade and bookTicker events of a random-walk price
+- User data stream: /ws/<listenKey> with ORDER_TRADE_UPDATE, ACCOUNT_UPDATE, MARGIN_CALL and
+  listenKeyExpired
+
+Market orders fill at the current price after `--fill-delay-ms`, optionally in several
+partial fills. STOP_MARKET and TAKE_PROFIT_MARKET orders trigger when the price crosses
+their stop price. A share of order requests can be rejected with a chosen error.
+
+REST responses carry X-MBX-USED-WEIGHT-1M and X-MBX-ORDER-COUNT-10S/1M headers. With
+`--enforce-limits`, a request over `--weight-limit` or the order limits is answered with
+429 and Retry-After (off by default, so long benchmark runs are not throttled).
+
+Run standalone from the project root:
+    python -m benchmarks.mock_exchange --rest-port 8081 --ws-port 8082 --latency-ms 5
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import secrets
+import time
+from urllib.parse import parse_qsl
+
+from websockets.asyncio.server import broadcast, serve
+
+from core.rate_limiter import DEFAULT_COST, ORDER_LIMITS, REST_COSTS, WEIGHT_LIMIT, parse_interval
+
+# Symbols listed by the mock: starting price and trading rules
+MARKETS = {
+    "BTCUSDT": {
+        "price": 67000.0, "tick_size": "0.10", "step_size": "0.001",
+        "price_precision": 2, "quantity_precision": 3, "min_notional": "100",
+    },
+    "ETHUSDT": {
+        "price": 3500.0, "tick_size": "0.01", "step_size": "0.001",
+        "price_precision": 2, "quantity_precision": 3, "min_notional": "20",
+    },
+}
+
+# Rejections that can be injected into order requests (--error)
+ERRORS = {
+    "overloaded": (503, {"code": -1008, "msg": "Server is currently overloaded with other requests. "
+                                               "Please try again in a few minutes."}),
+    "timeout": (503, {"code": -1007, "msg": "Timeout waiting for response from backend server. "
+                                            "Send status unknown; execution status unknown."}),
+    "margin": (400, {"code": -2019, "msg": "Margin is insufficient."}),
+}
+
+TICK_INTERVAL = 0.1  # seconds between market ticks
+VOLATILITY = 0.0002  # standard deviation of the relative price change per tick
+MAX_TICK_TIMES = 100_000  # send times kept for tick-to-decision measurements
+
+# Conditional orders trigger when the price crosses the stop price in this direction
+TRIGGER_ABOVE = {("STOP_MARKET", "BUY"), ("TAKE_PROFIT_MARKET", "SELL")}
+TRIGGER_BELOW = {("STOP_MARKET", "SELL"), ("TAKE_PROFIT_MARKET", "BUY")}
+
+
+
+def format_number(value: float) -> str:
+    """Formats a quantity or price like the exchange: no exponent, no trailing zeros."""
+    return f"{value:.8f}".rstrip("0").rstrip(".") or "0"
+
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class MockExchange:
+    """In-memory futures exchange with configurable latency, fills and errors.
+
+    Args:
+        latency (float): Processing delay of every REST and WebSocket API request, in seconds.
+        fill_price (float | None): Fixed fill price; by default orders fill at the market price.
+        fill_delay (float): Seconds from accepting a market order until it is completely filled.
+        partial_fills (int): Number of fills a market order is split into, spread over `fill_delay`.
+        error_rate (float): Share of order requests rejected with `error`.
+        error (str): Key of `ERRORS`.
+        tick_interval (float): Seconds between market ticks; 0 keeps the price still.
+        seed (int): Seed of the price walk and the error injection.
+    """
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            fill_price: float | None = None,
+            fill_delay: float = 0.0,
+            partial_fills: int = 1,
+            error_rate: float = 0.0,
+            error: str = "overloaded",
+            tick_interval: float = TICK_INTERVAL,
+            weight_limit: int = WEIGHT_LIMIT,
+            enforce_limits: bool = False,
+            seed: int = 1
+    ):
+        self.latency = latency
+        self.fill_price = fill_price
+        self.fill_delay = fill_delay
+        self.partial_fills = max(1, partial_fills)
+        self.error_rate = error_rate
+        self.error = ERRORS[error]
+        self.tick_interval = tick_interval
+        self.rng = random.Random(seed)
+        # Fixed windows like the exchange: (kind, header suffix, seconds, limit) -> [window start, used]
+        self.limits = [("weight", "1M", 60, weight_limit)]
+        self.limits += [("orders", interval.upper(), parse_interval(interval), limit)
+                        for interval, limit in ORDER_LIMITS.items()]
+        self.usage = {limit: [0, 0] for limit in self.limits}
+        self.enforce_limits = enforce_limits
+
+        self.prices = {symbol: market["price"] for symbol, market in MARKETS.items()}
+        self.orders = {}
+        self.conditional_orders = {}  # order ID -> untriggered STOP_MARKET / TAKE_PROFIT_MARKET order
+        self.positions = {}  # symbol -> [signed amount, entry price]
+        self._order_ids = itertools.count(1)
+        # Trade IDs are consecutive per symbol, as the stream worker's gap accounting expects
+        self._trade_ids = {symbol: itertools.count(1) for symbol in MARKETS}
+        self._book_update_ids = itertools.count(1)
+
+        self.listen_keys = set()
+        self.user_streams = set()  # connections of the user data stream
+        self.market_subscribers = {}  # stream name -> {connection: combined stream?}
+        # Event time (ms) of each tick -> time.monotonic_ns() when it was sent
+        self.tick_times = {}
+        self._last_event_time = 0
+
+    # Market
+
+    def price(self, symbol: str) -> float:
+        if self.fill_price is not None:
+            return self.fill_price
+        return self.prices.get(symbol, 100.0)
+
+    def _round_price(self, symbol: str, price: float) -> float:
+        tick = float(MARKETS[symbol]["tick_size"])
+        return round(round(price / tick) * tick, 8)
+
+    def _next_event_time(self) -> int:
+        # Unique per tick, so a tick can be found again by the event time the app stores
+        self._last_event_time = max(now_ms(), self._last_event_time + 1)
+        return self._last_event_time
+
+    def set_price(self, symbol: str, price: float) -> None:
+        """Moves the market price and triggers the conditional orders it crosses."""
+        self.prices[symbol] = price
+        self._check_triggers(symbol, price)
+
+    def tick(self) -> None:
+        """Moves every price one random step and publishes a trade and a bookTicker per symbol."""
+        event_time = self._next_event_time()
+        self.tick_times[event_time] = time.monotonic_ns()
+        if len(self.tick_times) > MAX_TICK_TIMES:
+            del self.tick_times[next(iter(self.tick_times))]
+        for symbol in self.prices:
+            price = self._round_price(symbol, self.prices[symbol] * (1 + self.rng.gauss(0, VOLATILITY)))
+            self.set_price(symbol, price)
+            tick = float(MARKETS[symbol]["tick_size"])
+            stream = symbol.lower()
+            self._publish(f"{stream}@trade", {
+                "e": "trade", "E": event_time, "T": event_time, "s": symbol, "t": next(self._trade_ids[symbol]),
+                "p": format_number(price), "q": format_number(self.rng.randint(1, 5000) / 1000),
+                "X": "MARKET", "m": self.rng.random() < 0.5,
+            })
+            self._publish(f"{stream}@bookTicker", {
+                "e": "bookTicker", "u": next(self._book_update_ids), "s": symbol,
+                "b": format_number(price - tick), "B": format_number(self.rng.uniform(0, 50)),
+                "a": format_number(price), "A": format_number(self.rng.uniform(0, 50)),
+                "T": event_time, "E": event_time,
+            })
+
+    def _publish(self, stream: str, data: dict) -> None:
+        subscribers = self.market_subscribers.get(stream)
+        if not subscribers:
+            return
+        combined = [ws for ws, is_combined in subscribers.items() if is_combined]
+        raw = [ws for ws, is_combined in subscribers.items() if not is_combined]
+        if combined:
+            broadcast(combined, json.dumps({"stream": stream, "data": data}))
+        if raw:
+            broadcast(raw, json.dumps(data))
+
+    async def run_market(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            self.tick()
+
+    def order_book(self, params: dict) -> tuple[int, dict]:
+        symbol = params.get("symbol")
+        if symbol not in MARKETS:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        limit = int(params.get("limit", 500))
+        price = self.price(symbol)
+        tick = float(MARKETS[symbol]["tick_size"])
+        return 200, {
+            "lastUpdateId": next(self._book_update_ids),
+            "E": now_ms(),
+            "T": now_ms(),
+            "bids": [[format_number(price - (i + 1) * tick), "1.000"] for i in range(limit)],
+            "asks": [[format_number(price + i * tick), "1.000"] for i in range(limit)],
+        }
+
+    def ticker_price(self, params: dict) -> tuple[int, object]:
+        symbol = params.get("symbol")
+        if symbol is None:
+            return 200, [
+                {"symbol": s, "price": format_number(self.price(s)), "time": now_ms()} for s in self.prices
+            ]
+        if symbol not in MARKETS:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+        return 200, {"symbol": symbol, "price": format_number(self.price(symbol)), "time": now_ms()}
+
+    def exchange_info(self, params: dict) -> tuple[int, dict]:
+        symbols = []
+        for symbol, market in MARKETS.items():
+            symbols.append({
+                "symbol": symbol,
+                "status": "TRADING",
+                "contractType": "PERPETUAL",
+                "baseAsset": symbol[:-4],
+                "quoteAsset": "USDT",
+                "pricePrecision": market["price_precision"],
+                "quantityPrecision": market["quantity_precision"],
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "minPrice": market["tick_size"],
+                     "maxPrice": "1000000", "tickSize": market["tick_size"]},
+                    {"filterType": "LOT_SIZE", "minQty": market["step_size"],
+                     "maxQty": "1000", "stepSize": market["step_size"]},
+                    {"filterType": "MARKET_LOT_SIZE", "minQty": market["step_size"],
+                     "maxQty": "120", "stepSize": market["step_size"]},
+                    {"filterType": "MIN_NOTIONAL", "notional": market["min_notional"]},
+                ],
+            })
+        return 200, {"timezone": "UTC", "serverTime": now_ms(), "symbols": symbols}
+
+    # Orders
+
+    def place_order(self, params: dict) -> tuple[int, dict]:
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return self.error
+        symbol = params.get("symbol")
+        if self.fill_price is None and symbol not in MARKETS:
+            return 400, {"code": -1121, "msg": "Invalid symbol."}
+
+        order_id = next(self._order_ids)
+        order = {
+            "orderId": order_id,
+            "symbol": symbol,
+            "clientOrderId": params.get("newClientOrderId", f"mock-{order_id}"),
+            "side": params.get("side"),
+            "type": params.get("type"),
+            "origQty": params.get("quantity", "0"),
+            "executedQty": "0",
+            "cumQuote": "0",
+            "avgPrice": "0.00",
+            "price": params.get("price", "0"),
+            "stopPrice": params.get("stopPrice", "0"),
+            "reduceOnly": params.get("reduceOnly") == "true",
+            "closePosition": params.get("closePosition") == "true",
+            "status": "NEW",
+            "updateTime": now_ms(),
+        }
+        self.orders[order_id] = order
+        self._push_order_update(order, "NEW")
+
+        if order["type"] == "MARKET":
+            self._schedule_fills(order)
+        elif order["type"] in ("STOP_MARKET", "TAKE_PROFIT_MARKET"):
+            self.conditional_orders[order_id] = order
+            # A stop price already crossed triggers immediately
+            self._check_triggers(symbol, self.price(symbol))
+
+        # An ACK response is sent before the matching engine reports the fill
+        if params.get("newOrderRespType", "ACK") == "ACK":
+            return 200, dict(order, status="NEW", executedQty="0", avgPrice="0.00")
+        return 200, dict(order)
+
+    def _find_order(self, params: dict) -> dict | None:
+        if "orderId" in params:
+            return self.orders.get(int(params["orderId"]))
+        client_order_id = params.get("origClientOrderId")
+        for order in self.orders.values():
+            if order["clientOrderId"] == client_order_id:
+                return order
+        return None
+
+    def get_order(self, params: dict) -> tuple[int, dict]:
+        order = self._find_order(params)
+        if order is None:
+            return 400, {"code": -2013, "msg": "Order does not exist."}
+        return 200, dict(order)
+
+    def cancel_order(self, params: dict) -> tuple[int, dict]:
+        order = self._find_order(params)
+        if order is None or order["status"] not in ("NEW", "PARTIALLY_FILLED"):
+            return 400, {"code": -2011, "msg": "Unknown order sent."}
+        self._close_order(order, "CANCELED")
+        return 200, dict(order)
+
+    def place_batch(self, params: dict) -> tuple[int, list]:
+        results = []
+        for order_params in json.loads(params.get("batchOrders", "[]")):
+            status, result = self.place_order(order_params)
+            results.append(result)
+        return 200, results
+
+    def open_orders(self, params: dict) -> tuple[int, list]:
+        symbol = params.get("symbol")
+        return 200, [
+            dict(order) for order in self.orders.values()
+            if order["status"] in ("NEW", "PARTIALLY_FILLED") and symbol in (None, order["symbol"])
+        ]
+
+    def cancel_all_orders(self, params: dict) -> tuple[int, dict]:
+        for order in self.open_orders(params)[1]:
+            self.cancel_order({"orderId": order["orderId"]})
+        return 200, {"code": 200, "msg": "The operation of cancel all open order is done."}
+
+    def position_risk(self, params: dict) -> tuple[int, list]:
+        symbol = params.get("symbol")
+        positions = []
+        for position_symbol, (amount, entry_price) in self.positions.items():
+            if not amount or symbol not in (None, position_symbol):
+                continue
+            mark_price = self.price(position_symbol)
+            positions.append({
+                "symbol": position_symbol,
+                "positionSide": "BOTH",
+                "positionAmt": format_number(amount),
+                "entryPrice": format_number(entry_price),
+                "markPrice": format_number(mark_price),
+                "unRealizedProfit": format_number((mark_price - entry_price) * amount),
+                "updateTime": now_ms(),
+            })
+        return 200, positions
+
+    def balance(self, params: dict) -> tuple[int, list]:
+        """A fixed USDT balance; used by the app as its credential check."""
+        return 200, [{
+            "asset": "USDT", "balance": "10000", "availableBalance": "10000",
+            "crossWalletBalance": "10000", "crossUnPnl": "0", "updateTime": now_ms(),
+        }]
+
+    # Matching
+
+    def _close_order(self, order: dict, status: str) -> None:
+        order["status"] = status
+        order["updateTime"] = now_ms()
+        self.conditional_orders.pop(order["orderId"], None)
+        self._push_order_update(order, status)
+
+    def _schedule_fills(self, order: dict) -> None:
+        chunks = self.partial_fills
+        chunk = round(float(order["origQty"]) / chunks, 8)
+        # The last fill takes the remainder, so rounded chunks still add up to the order quantity
+        quantities = [chunk] * (chunks - 1) + [None]
+        if not self.fill_delay:
+            for quantity in quantities:
+                self._fill(order, quantity)
+            return
+        loop = asyncio.get_running_loop()
+        for i, quantity in enumerate(quantities):
+            loop.call_later(self.fill_delay * (i + 1) / chunks, self._fill, order, quantity)
+
+    def _fill(self, order: dict, quantity: float | None) -> None:
+        """Executes `quantity` of an order at the current price, or all of its remainder if None."""
+        if order["status"] not in ("NEW", "PARTIALLY_FILLED"):
+            return
+        symbol = order["symbol"]
+        price = self.price(symbol)
+        position = self.positions.setdefault(symbol, [0.0, 0.0])
+        if quantity is None:
+            quantity = round(float(order["origQty"]) - float(order["executedQty"]), 8)
+        if order["closePosition"]:
+            quantity = abs(position[0])
+        elif order["reduceOnly"]:
+            # Never opens a position in the other direction
+            quantity = min(quantity, abs(position[0]))
+        if not quantity:
+            # Nothing left to reduce
+            self._close_order(order, "EXPIRED")
+            return
+
+        executed = float(order["executedQty"]) + quantity
+        cum_quote = float(order["cumQuote"]) + quantity * price
+        complete = order["closePosition"] or executed >= float(order["origQty"]) - 1e-9
+        order["executedQty"] = format_number(executed)
+        order["cumQuote"] = format_number(cum_quote)
+        order["avgPrice"] = format_number(cum_quote / executed)
+        order["status"] = "FILLED" if complete else "PARTIALLY_FILLED"
+        order["updateTime"] = now_ms()
+        self.conditional_orders.pop(order["orderId"], None)
+
+        signed = quantity if order["side"] == "BUY" else -quantity
+        amount, entry_price = position
+        if amount * signed >= 0:
+            # Opening or adding
+            total = amount + signed
+            position[1] = (entry_price * abs(amount) + price * quantity) / abs(total) if total else 0.0
+        elif abs(signed) > abs(amount):
+            # Reversing
+            position[1] = price
+        position[0] = round(amount + signed, 8)
+        if not position[0]:
+            position[1] = 0.0
+
+        self._push_order_update(order, "TRADE", last_quantity=quantity, last_price=price)
+        self._push_account_update(symbol)
+        if not position[0]:
+            # Like the exchange, closePosition orders expire once the position is gone
+            for other in list(self.conditional_orders.values()):
+                if other["symbol"] == symbol and other["closePosition"]:
+                    self._close_order(other, "EXPIRED")
+
+    def _check_triggers(self, symbol: str, price: float) -> None:
+        for order in list(self.conditional_orders.values()):
+            if order["symbol"] != symbol or order["status"] != "NEW":
+                continue
+            key = (order["type"], order["side"])
+            stop_price = float(order["stopPrice"])
+            if (key in TRIGGER_ABOVE and price >= stop_price) or (key in TRIGGER_BELOW and price <= stop_price):
+                self._fill(order, None)
+
+    # User data stream
+
+    def _push_user_event(self, event: dict) -> None:
+        if self.user_streams:
+            broadcast(self.user_streams, json.dumps(event))
+
+    def _push_order_update(
+            self,
+            order: dict,
+            execution_type: str,
+            last_quantity: float = 0.0,
+            last_price: float = 0.0
+    ) -> None:
+        event_time = now_ms()
+        self._push_user_event({
+            "e": "ORDER_TRADE_UPDATE", "E": event_time, "T": event_time,
+            "o": {
+                "s": order["symbol"], "c": order["clientOrderId"], "S": order["side"],
+                "o": order["type"], "ot": order["type"], "f": "GTC", "q": order["origQty"],
+                "p": order["price"], "sp": order["stopPrice"], "ap": order["avgPrice"],
+                "x": execution_type, "X": order["status"], "i": order["orderId"],
+                "l": format_number(last_quantity), "z": order["executedQty"], "L": format_number(last_price),
+                "T": event_time, "R": order["reduceOnly"], "cp": order["closePosition"], "ps": "BOTH",
+            },
+        })
+
+    def _push_account_update(self, symbol: str) -> None:
+        amount, entry_price = self.positions.get(symbol, (0.0, 0.0))
+        event_time = now_ms()
+        self._push_user_event({
+            "e": "ACCOUNT_UPDATE", "E": event_time, "T": event_time,
+            "a": {
+                "m": "ORDER",
+                "B": [],
+                "P": [{
+                    "s": symbol, "pa": format_number(amount), "ep": format_number(entry_price),
+                    "cr": "0", "up": format_number((self.price(symbol) - entry_price) * amount),
+                    "mt": "cross", "iw": "0", "ps": "BOTH",
+                }],
+            },
+        })
+
+    def push_margin_call(self, symbol: str) -> None:
+        """Sends a MARGIN_CALL event for the position in `symbol`."""
+        amount, _ = self.positions.get(symbol, (0.0, 0.0))
+        self._push_user_event({
+            "e": "MARGIN_CALL", "E": now_ms(), "cw": "0",
+            "p": [{
+                "s": symbol, "ps": "BOTH", "pa": format_number(amount), "mt": "CROSSED", "iw": "0",
+                "mp": format_number(self.price(symbol)), "up": "0", "mm": "0",
+            }],
+        })
+
+    def expire_listen_keys(self) -> None:
+        """Expires the listen key of every user data stream, which is told with listenKeyExpired."""
+        event_time = now_ms()
+        for ws in list(self.user_streams):
+            listen_key = ws.request.path.partition("?")[0][len("/ws/"):]
+            self.listen_keys.discard(listen_key)
+            broadcast([ws], json.dumps({"e": "listenKeyExpired", "E": event_time, "listenKey": listen_key}))
+
+    def listen_key(self, method: str, params: dict) -> tuple[int, dict]:
+        if method == "POST":
+            listen_key = secrets.token_hex(32)
+            self.listen_keys.add(listen_key)
+            return 200, {"listenKey": listen_key}
+        listen_key = params.get("listenKey")
+        if listen_key not in self.listen_keys:
+            return 400, {"code": -1125, "msg": "This listenKey does not exist."}
+        if method == "DELETE":
+            self.listen_keys.discard(listen_key)
+        return 200, {}
+
+    # REST
+
+    def count_request(self, method: str, path: str) -> tuple[dict, float | None]:
+        """Counts a request in the limit windows; returns the usage headers and Retry-After if over a limit."""
+        weight, orders, _ = REST_COSTS.get((method, path), DEFAULT_COST)
+        now = time.time()
+        headers = {}
+        retry_after = None
+        for limit in self.limits:
+            kind, suffix, interval, maximum = limit
+            window_start = now - now % interval
+            usage = self.usage[limit]
+            if usage[0] != window_start:
+                usage[0], usage[1] = window_start, 0
+            usage[1] += weight if kind == "weight" else orders
+            name = "X-MBX-USED-WEIGHT-" if kind == "weight" else "X-MBX-ORDER-COUNT-"
+            headers[name + suffix] = usage[1]
+            if self.enforce_limits and usage[1] > maximum:
+                retry_after = max(retry_after or 0, window_start + interval - now)
+        return headers, retry_after
+
+    async def handle_rest(self, method: str, path: str, params: dict) -> tuple[int, object]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if path == "/fapi/v1/order":
+            if method == "POST":
+                return self.place_order(params)
+            if method == "GET":
+                return self.get_order(params)
+            if method == "DELETE":
+                return self.cancel_order(params)
+        if path == "/fapi/v1/batchOrders" and method == "POST":
+            return self.place_batch(params)
+        if path == "/fapi/v1/openOrders":
+            return self.open_orders(params)
+        if path == "/fapi/v1/allOpenOrders" and method == "DELETE":
+            return self.cancel_all_orders(params)
+        if path == "/fapi/v3/positionRisk":
+            return self.position_risk(params)
+        if path == "/fapi/v3/balance":
+            return self.balance(params)
+        if path == "/fapi/v1/listenKey":
+            return self.listen_key(method, params)
+        if path == "/fapi/v1/exchangeInfo":
+            return self.exchange_info(params)
+        if path == "/fapi/v1/ticker/price":
+            return self.ticker_price(params)
+        if path == "/fapi/v1/depth":
+            return self.order_book(params)
+        if path == "/fapi/v1/time":
+            return 200, {"serverTime": now_ms()}
+        if path == "/fapi/v1/ping":
+            return 200, {}
+        return 404, {"code": -1000, "msg": f"Unknown endpoint {method} {path}"}
+
+    async def handle_http(self, reader, writer) -> None:
+        """Minimal HTTP/1.1 server loop with keep-alive support."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                path, _, query = target.partition("?")
+                params = dict(parse_qsl(query))
+                params.update(parse_qsl(body.decode()))
+
+                usage_headers, retry_after = self.count_request(method, path)
+                if retry_after is not None:
+                    status, payload = 429, {"code": -1003, "msg": "Too many requests."}
+                    usage_headers["Retry-After"] = int(retry_after) + 1
+                else:
+                    status, payload = await self.handle_rest(method, path, params)
+                data = json.dumps(payload).encode()
+                extra_headers = "".join(f"{name}: {value}\r\n" for name, value in usage_headers.items())
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"{extra_headers}"
+                    f"Connection: keep-alive\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    # WebSocket
+
+    async def handle_ws_api_request(self, ws, request: dict) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        handlers = {
+            "order.place": self.place_order,
+            "order.status": self.get_order,
+            "order.cancel": self.cancel_order,
+            "ticker.price": self.ticker_price,
+        }
+        handler = handlers.get(request.get("method"))
+        if handler is None:
+            status, result = 400, {"code": -1000, "msg": "Unknown method"}
+        else:
+            status, result = handler(request.get("params", {}))
+
+        response = {"id": request.get("id"), "status": status}
+        if status == 200:
+            response["result"] = result
+        else:
+            response["error"] = result
+        await ws.send(json.dumps(response))
+
+    async def handle_ws_api(self, ws) -> None:
+        """WebSocket API session: every request is answered independently."""
+        tasks = set()
+        async for message in ws:
+            task = asyncio.create_task(self.handle_ws_api_request(ws, json.loads(message)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    def _subscribe(self, ws, streams, combined: bool) -> None:
+        for stream in streams:
+            self.market_subscribers.setdefault(stream, {})[ws] = combined
+
+    def _unsubscribe(self, ws, streams) -> None:
+        for stream in streams:
+            self.market_subscribers.get(stream, {}).pop(ws, None)
+
+    async def handle_market_stream(self, ws) -> None:
+        """Combined market stream session with SUBSCRIBE/UNSUBSCRIBE requests."""
+        try:
+            async for message in ws:
+                request = json.loads(message)
+                if request.get("method") == "SUBSCRIBE":
+                    self._subscribe(ws, request.get("params", []), combined=True)
+                elif request.get("method") == "UNSUBSCRIBE":
+                    self._unsubscribe(ws, request.get("params", []))
+                await ws.send(json.dumps({"result": None, "id": request.get("id")}))
+        finally:
+            self._unsubscribe(ws, list(self.market_subscribers))
+
+    async def handle_ws(self, ws) -> None:
+        """Routes a WebSocket connection by its path."""
+        path = ws.request.path.partition("?")[0]
+        if path == "/stream":
+            await self.handle_market_stream(ws)
+        elif path.startswith("/ws/"):
+            name = path[len("/ws/"):]
+            if name in self.listen_keys:
+                self.user_streams.add(ws)
+                try:
+                    await ws.wait_closed()
+                finally:
+                    self.user_streams.discard(ws)
+            elif name.partition("@")[0].upper() in MARKETS:
+                self._subscribe(ws, [name], combined=False)
+                try:
+                    await ws.wait_closed()
+                finally:
+                    self._unsubscribe(ws, [name])
+            else:
+                await ws.close(1008, "Unknown listen key or stream")
+        else:
+            await self.handle_ws_api(ws)
+
+    async def serve(self, host: str, rest_port: int, ws_port: int, ready=None) -> None:
+        """Runs the REST and WebSocket servers and the market until cancelled."""
+        rest_server = await asyncio.start_server(self.handle_http, host, rest_port)
+        market = asyncio.create_task(self.run_market()) if self.tick_interval else None
+        try:
+            async with rest_server, serve(self.handle_ws, host, ws_port):
+                if ready is not None:
+                    ready.set()
+                await asyncio.Future()
+        finally:
+            if market is not None:
+                market.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--rest-port", type=int, default=8081)
+    parser.add_argument("--ws-port", type=int, default=8082)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="processing delay per request")
+    parser.add_argument("--fill-delay-ms", type=float, default=0.0, help="time until a market order is filled")
+    parser.add_argument("--partial-fills", type=int, default=1, help="fills per market order")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of rejected order requests")
+    parser.add_argument("--error", choices=sorted(ERRORS), default="overloaded")
+    parser.add_argument("--tick-ms", type=float, default=TICK_INTERVAL * 1000, help="market tick interval, 0 = off")
+    parser.add_argument("--weight-limit", type=int, default=WEIGHT_LIMIT, help="request weight per minute")
+    parser.add_argument("--enforce-limits", action="store_true", help="answer requests over the limits with 429")
+    args = parser.parse_args()
+
+    exchange = MockExchange(
+        latency=args.latency_ms / 1000,
+        fill_delay=args.fill_delay_ms / 1000,
+        partial_fills=args.partial_fills,
+        error_rate=args.error_rate,
+        error=args.error,
+        tick_interval=args.tick_ms / 1000,
+        weight_limit=args.weight_limit,
+        enforce_limits=args.enforce_limits
+    )
+    print(f"REST: http://{args.host}:{args.rest_port}/fapi   WS API: ws://{args.host}:{args.ws_port}")
+    print(f"Streams: ws://{args.host}:{args.ws_port}/stream   User data: ws://{args.host}:{args.ws_port}/ws/<listenKey>")
+    try:
+        asyncio.run(exchange.serve(args.host, args.rest_port, args.ws_port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Local WebSocket server replaying a recording of the combined market stream.
+
+Recordings are made by the stream worker when the `record_frames_path` setting
+is set (see core/frame_recorder.py). The server answers SUBSCRIBE/UNSUBSCRIBE
+like the exchange and, from the first SUBSCRIBE on, sends the recorded frames
+of the subscribed streams with their original spacing divided by the speed
+factor, or back to back with `--speed max`.
+
+Point the app at it with the `stream_url` setting, e.g. "ws://127.0.0.1:8090/stream".
+
+Run from the project root:
+    python -m benchmarks.replay_server --frames recordings/stream.frames.gz --speed 10
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from websockets.asyncio.server import serve
+
+from core.frame_recorder import read_frames
+
+
+
+def load_recording(path: str) -> list:
+    """Reads a recording into (receive time ns, stream name, frame) tuples.
+
+    Subscription replies are dropped; frames of a single-stream connection have no
+    stream name and are sent to every subscriber.
+    """
+    frames = []
+    for timestamp, frame in read_frames(path):
+        message = json.loads(frame)
+        if "id" in message:
+            continue
+        frames.append((timestamp, message.get("stream"), frame))
+    return frames
+
+
+def parse_speed(value: str) -> float | None:
+    """'max' means no pacing (None); anything else is a positive speed factor."""
+    if value == "max":
+        return None
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or 'max'")
+    return speed
+
+
+class ReplayServer:
+    """Serves recorded frames to every connection, paced by their receive timestamps."""
+
+    def __init__(self, frames: list, speed: float | None = 1.0, repeat: bool = False):
+        self.frames = frames
+        self.speed = speed
+        self.repeat = repeat
+        self.finished = asyncio.Event()  # set when a connection has been sent the whole recording
+        self.frames_sent = 0
+
+    async def replay(self, ws, streams: set) -> None:
+        speed = self.speed
+        while True:
+            first_timestamp = self.frames[0][0] if self.frames else 0
+            start = time.perf_counter()
+            for timestamp, stream, frame in self.frames:
+                if speed is not None:
+                    delay = (timestamp - first_timestamp) / 1e9 / speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if stream is None or stream in streams:
+                    # Text frames, like the exchange; the bytes are sent without re-encoding
+                    await ws.send(frame, text=True)
+                    self.frames_sent += 1
+            if not self.repeat:
+                break
+        self.finished.set()
+
+    async def handle(self, ws) -> None:
+        streams = set()
+        replay_task = None
+        try:
+            async for message in ws:
+                request = json.loads(message)
+                method = request.get("method")
+                if method == "SUBSCRIBE":
+                    streams.update(request.get("params", []))
+                elif method == "UNSUBSCRIBE":
+                    streams.difference_update(request.get("params", []))
+                await ws.send(json.dumps({"result": None, "id": request.get("id")}))
+                if method == "SUBSCRIBE" and replay_task is None:
+                    replay_task = asyncio.create_task(self.replay(ws, streams))
+        finally:
+            if replay_task is not None:
+                replay_task.cancel()
+
+    async def serve(self, host: str, port: int, ready=None) -> None:
+        """Runs the server until cancelled."""
+        async with serve(self.handle, host, port, max_queue=None):
+            if ready is not None:
+                ready.set()
+            await asyncio.Future()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", required=True, help="recording written by the stream worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="speed factor, or 'max'")
+    parser.add_argument("--repeat", action="store_true", help="start over at the end of the recording")
+    args = parser.parse_args()
+
+    frames = load_recording(args.frames)
+    if frames:
+        duration = (frames[-1][0] - frames[0][0]) / 1e9
+        print(f"{len(frames)} frames covering {duration:.1f} s")
+    print(f"Stream: ws://{args.host}:{args.port}/stream")
+    try:
+        asyncio.run(ReplayServer(frames, args.speed, args.repeat).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+"""Small helpers shared by the benchmark scripts."""
+
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Returns the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def format_latency_report(name: str, samples_ms: list[float]) -> str:
+    """Formats p50/p90/p99/max of latency samples given in milliseconds."""
+    values = sorted(samples_ms)
+    return (
+        f"{name:<24} n={len(values):<5}"
+        f" p50 {percentile(values, 0.50):8.3f} ms"
+        f"  p90 {percentile(values, 0.90):8.3f} ms"
+        f"  p99 {percentile(values, 0.99):8.3f} ms"
+        f"  max {values[-1] if values else float('nan'):8.3f} ms"
+    )
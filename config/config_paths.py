@@ -22,3 +22,4 @@ BASE_DIR = get_base_dir()
 CONFIG_PATH = os.path.join(BASE_DIR, "config", "settings.json")
 STYLE_PATH = os.path.join(BASE_DIR, "resources", "style.qss")
 ENV_PATH = os.path.join(BASE_DIR, ".env")
+EXCHANGE_INFO_PATH = os.path.join(BASE_DIR, "config", "exchange_info.json")
@@ -0,0 +1,221 @@
+import struct
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from core.market_data_table import READ_RETRIES
+
+#  Streaming OHLCV candles in shared memory.
+#
+#  The stream worker folds every trade into 1s, 1m and 5m bars of the symbol's market data
+#  table slot. Each (slot, interval) pair is a fixed-size ring of bars, so memory stays
+#  constant however long the app runs. Readers in any process get NumPy views of the rings
+#  instead of copies or REST kline calls.
+#
+#  Bars exist only for intervals with at least one trade. Closed bars are never modified;
+#  the bar in progress is guarded by a per-ring seqlock (see core/market_data_table.py).
+
+INTERVALS = ("1s", "1m", "5m")
+INTERVAL_MS = {"1s": 1_000, "1m": 60_000, "5m": 300_000}
+# Bars kept per interval: 1 hour of 1s bars, 1 day of 1m bars, 1 week of 5m bars
+DEFAULT_CAPACITIES = {"1s": 3_600, "1m": 1_440, "5m": 2_016}
+
+# buy_volume is the volume of taker buys (buyer is not the maker), sell_volume of taker sells
+BAR_DTYPE = np.dtype([
+    ("open_time", "<i8"),  # ms
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+    ("buy_volume", "<f8"),
+    ("sell_volume", "<f8"),
+    ("trades", "<i8"),
+])
+# The writer packs bars with struct instead of going through NumPy scalars
+BAR = struct.Struct("<q7dq")
+BAR_ITEMSIZE = BAR_DTYPE.itemsize
+
+HEADER = struct.Struct("<II")  # magic, slot count
+CAPACITIES = struct.Struct(f"<{len(INTERVALS)}I")
+HEADER_SIZE = 64
+MAGIC = 0x4852434C  # "HRCL"
+RING_HEADER = struct.Struct("<Qq")  # seq, bars written (including the bar in progress)
+
+
+
+class CandleStore:
+    """Fixed-size OHLCV ring buffers in shared memory, one ring per (slot, interval).
+
+    Slots are the slots of the market data table, so a symbol is found with
+    `MarketDataTable.find_slot`. Only the stream worker writes; any process reads.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        magic, self.slot_count = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory {shm.name} is not a candle store")
+        self.capacities = dict(zip(INTERVALS, CAPACITIES.unpack_from(shm.buf, HEADER.size)))
+
+        # Ring headers: (slot, interval) -> [seq, bars written]
+        self.ring_headers = np.ndarray(
+            (self.slot_count, len(INTERVALS), 2), dtype="<i8", buffer=shm.buf, offset=HEADER_SIZE
+        )
+        offset = HEADER_SIZE + self.ring_headers.nbytes
+
+        # Bars: interval -> array of shape (slots, capacity)
+        self.rings = {}
+        self._bar_offsets = {}  # interval -> byte offset of slot 0, used by the struct writer
+        for interval in INTERVALS:
+            ring = np.ndarray(
+                (self.slot_count, self.capacities[interval]), dtype=BAR_DTYPE, buffer=shm.buf, offset=offset
+            )
+            self.rings[interval] = ring
+            self._bar_offsets[interval] = offset
+            offset += ring.nbytes
+
+        self._writers = {}  # writer state per slot, see `_writer_rings`
+
+    @staticmethod
+    def size(slots: int, capacities: dict) -> int:
+        return (
+            HEADER_SIZE
+            + slots * len(INTERVALS) * RING_HEADER.size
+            + sum(slots * capacities[interval] * BAR_DTYPE.itemsize for interval in INTERVALS)
+        )
+
+    @classmethod
+    def create(cls, slots: int, capacities: dict = DEFAULT_CAPACITIES) -> "CandleStore":
+        """Allocates a zeroed store for `slots` symbols."""
+        shm = shared_memory.SharedMemory(create=True, size=cls.size(slots, capacities))
+        shm.buf[:] = bytes(shm.size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, slots)
+        CAPACITIES.pack_into(shm.buf, HEADER.size, *(capacities[interval] for interval in INTERVALS))
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "CandleStore":
+        """Attaches to a store created by another process."""
+        return cls(shared_memory.SharedMemory(name=name, track=False), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _ring_header_offset(self, slot: int, interval_index: int) -> int:
+        return HEADER_SIZE + (slot * len(INTERVALS) + interval_index) * RING_HEADER.size
+
+    # Writer side (single writer: the stream worker)
+
+    def _writer_rings(self, slot: int) -> list:
+        # Per interval: [interval ms, ring header offset, offset of the slot's bars, capacity,
+        #                bar in progress, seq, bars written], resumed from shared memory
+        rings = []
+        for interval_index, interval in enumerate(INTERVALS):
+            capacity = self.capacities[interval]
+            header_offset = self._ring_header_offset(slot, interval_index)
+            bars_offset = self._bar_offsets[interval] + slot * capacity * BAR_DTYPE.itemsize
+            seq, written = RING_HEADER.unpack_from(self.shm.buf, header_offset)
+            bar = None
+            if written:
+                bar = list(BAR.unpack_from(
+                    self.shm.buf, bars_offset + (written - 1) % capacity * BAR_DTYPE.itemsize
+                ))
+            rings.append([INTERVAL_MS[interval], header_offset, bars_offset, capacity, bar, seq, written])
+        self._writers[slot] = rings
+        return rings
+
+    def reset(self, slot: int) -> None:
+        """Forgets the bars of a slot, e.g. when it is assigned to another symbol."""
+        buf = self.shm.buf
+        for interval_index in range(len(INTERVALS)):
+            offset = self._ring_header_offset(slot, interval_index)
+            seq = RING_HEADER.unpack_from(buf, offset)[0]
+            RING_HEADER.pack_into(buf, offset, seq + 2, 0)
+        self._writers.pop(slot, None)
+
+    def on_trade(self, slot: int, price: float, quantity: float, trade_time: int, is_buyer_maker: bool) -> None:
+        """Folds one trade into the bars of every interval."""
+        buf = self.shm.buf
+        buy_quantity = 0.0 if is_buyer_maker else quantity
+        sell_quantity = quantity if is_buyer_maker else 0.0
+
+        rings = self._writers.get(slot) or self._writer_rings(slot)
+        for ring in rings:
+            interval_ms, header_offset, bars_offset, capacity, bar, seq, written = ring
+            open_time = trade_time - trade_time % interval_ms
+            if bar is None or open_time > bar[0]:
+                # First trade of a new bar
+                bar = [open_time, price, price, price, price, quantity, buy_quantity, sell_quantity, 1]
+                ring[4] = bar
+                written += 1
+                ring[6] = written
+            else:
+                if price > bar[2]:
+                    bar[2] = price
+                elif price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+                bar[5] += quantity
+                bar[6] += buy_quantity
+                bar[7] += sell_quantity
+                bar[8] += 1
+
+            ring[5] = seq + 2
+            RING_HEADER.pack_into(buf, header_offset, seq + 1, written)  # odd: write in progress
+            BAR.pack_into(buf, bars_offset + (written - 1) % capacity * BAR_ITEMSIZE, *bar)
+            RING_HEADER.pack_into(buf, header_offset, seq + 2, written)
+
+    # Reader side (any process)
+
+    def bars_written(self, slot: int, interval: str) -> int:
+        """Number of bars built for the slot so far, including the one in progress."""
+        return int(self.ring_headers[slot, INTERVALS.index(interval), 1])
+
+    def recent(self, slot: int, interval: str, count: int) -> np.ndarray:
+        """Returns up to `count` most recent bars, oldest first, the last one still in progress.
+
+        The result is a view into shared memory unless the range wraps around the end
+        of the ring, in which case the two parts are joined into a copy. The bar in
+        progress may change while it is read; use `current_bar` for a consistent copy.
+        """
+        written = self.bars_written(slot, interval)
+        ring = self.rings[interval][slot]
+        count = min(count, written, len(ring))
+        end = (written - 1) % len(ring) + 1 if written else 0
+        start = end - count
+        if start >= 0:
+            return ring[start:end]
+        return np.concatenate((ring[start:], ring[:end]))
+
+    def current_bar(self, slot: int, interval: str) -> np.void | None:
+        """Returns a consistent copy of the bar in progress, or None if there is none.
+
+        Also None if no consistent copy could be read within READ_RETRIES attempts, e.g.
+        because the stream worker died while writing the bar.
+        """
+        interval_index = INTERVALS.index(interval)
+        header_offset = self._ring_header_offset(slot, interval_index)
+        ring = self.rings[interval][slot]
+        buf = self.shm.buf
+        for _ in range(READ_RETRIES):
+            seq, written = RING_HEADER.unpack_from(buf, header_offset)
+            if seq & 1:
+                continue
+            if not written:
+                return None
+            bar = ring[(written - 1) % len(ring)].copy()
+            if RING_HEADER.unpack_from(buf, header_offset)[0] == seq:
+                return bar
+        return None
+
+    def close(self) -> None:
+        """Detaches from the store; the creating process also frees the memory."""
+        # NumPy views must be released before the shared memory can be closed
+        self.ring_headers = None
+        self.rings = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -1,13 +1,20 @@
 import os
 from dotenv import load_dotenv
 from config.config_paths import ENV_PATH
-from binance.client import Client
+
+#  python-binance is imported inside the functions that create clients: the package loads its
+#  async client, aiohttp and dateparser (~0.8 s), which the startup orchestrator does in a
+#  worker thread after the window is shown (core/startup.py).
 
 
 
 class BinanceClient:
-    def __init__(self):
-        """Initialize Binance client and attempt connection."""
+    def __init__(self, connect: bool = True):
+        """Initialize Binance client and attempt connection.
+
+        With `connect=False` only the keys are loaded; `try_connect` is then called
+        by the startup orchestrator off the GUI thread.
+        """
         self.api_key = None
         self.api_secret = None
         self.client = None
@@ -15,16 +22,20 @@ class BinanceClient:
 
         self.load_keys()
 
-        if self.api_key and self.api_secret:
+        if connect and self.api_key and self.api_secret:
             self.is_connected = self.try_connect()
 
+    @property
+    def has_keys(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
     def load_keys(self) -> None:
         """Load API keys from `.env` file."""
         load_dotenv(dotenv_path=ENV_PATH)
         self.api_key = os.getenv("API_KEY") or None
         self.api_secret = os.getenv("API_SECRET") or None
 
-    def save_keys(self, api_key, api_secret) -> None:
+    def save_keys(self, api_key, api_secret, connect: bool = True) -> None:
         """Save new API keys and update Binance client."""
         with open(ENV_PATH, "w") as env_file:
             env_file.write(f"API_KEY={api_key}\n")
@@ -35,16 +46,45 @@ class BinanceClient:
         self.api_secret = api_secret
 
         # Attempt reconnection with new keys
-        self.is_connected = self.try_connect()
+        if connect:
+            self.is_connected = self.try_connect()
 
     def try_connect(self) -> bool:
-        """Validate API keys and establish Binance connection."""
+        """Validate API keys and establish Binance connection.
+
+        The keys are checked with the futures balance (one signed request of weight 5)
+        instead of the spot account, and without the spot ping of the client constructor.
+        """
         try:
-            self.client = Client(self.api_key, self.api_secret)
-            self.client.get_account()
+            from binance.client import Client
+
+            client = Client(self.api_key, self.api_secret, ping=False)
+            client.futures_account_balance()
+            self.client = client
+            self.is_connected = True
             print("Connection to Binance successful!")
             return True
         except Exception as e:
             self.client = None
+            self.is_connected = False
             print(f"Connection error: {e}")
             return False
+
+
+def create_public_client():
+    """python-binance `Client` without keys for public market data, created without the spot ping."""
+    from binance.client import Client
+
+    return Client(ping=False)
+
+
+def fetch_account_snapshot(api_key: str, api_secret: str) -> list[dict]:
+    """Returns the open futures positions of the account (positionRisk with a non-zero amount)."""
+    from binance.client import Client
+
+    client = Client(api_key, api_secret, ping=False)
+    try:
+        positions = client.futures_position_information()
+    finally:
+        client.close_connection()
+    return [position for position in positions if float(position["positionAmt"]) != 0]
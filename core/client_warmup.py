@@ -1,20 +1,234 @@
+import socket
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 
-def keep_connection_alive(client) -> None:
-    """Maintains an active connection with the Binance API."""
-    while True:
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+from core.rate_limiter import DEFAULT_COST, REST_COSTS
+
+#  Keeps warm connections to the futures REST host, where every order goes.
+#
+#  Each cycle pings the host over `connections` pooled keep-alive sockets of the client's
+#  session at once, so that many connections are open (TLS included) when an order is sent.
+#  If a ping has to open a new socket while the pool was complete, the server closed idle
+#  connections before the cycle: the interval is halved and never grows back past that point.
+#  While every socket is reused it grows step by step, settling just under the idle timeout.
+#  The pings request the server time, so each one is also a clock sample (core/clock_sync.py).
+
+DEFAULT_CONNECTIONS = 2
+DEFAULT_INTERVAL = 30.0  # seconds between cycles at start
+MIN_INTERVAL = 5.0
+MAX_INTERVAL = 240.0
+INTERVAL_STEP = 5.0  # growth per cycle while every connection survives
+IDLE_TIMEOUT_MARGIN = 0.8  # share of a known idle timeout used as interval
+PING_TIMEOUT = 5.0
+STOP_TIMEOUT = 2 * PING_TIMEOUT + 1  # a ping in flight when stopping runs to its connect and read timeouts
+ERROR_DELAY = 60.0  # wait after a failed cycle
+PING_PATH = "/v1/time"  # weight 1 like /v1/ping, and a clock sample
+
+# urllib3 already sets TCP_NODELAY; TCP keepalive makes the kernel notice a dead connection
+# instead of the next order
+SOCKET_OPTIONS = HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+if hasattr(socket, "TCP_KEEPIDLE"):
+    SOCKET_OPTIONS += [(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 30), (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)]
+
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """`requests` adapter applying a `RateLimiter` to every request sent through it."""
+
+    def __init__(self, limiter=None, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.limiter is None:
+            return super().send(request, **kwargs)
+
+        self.limiter.acquire(REST_COSTS.get((request.method, urlsplit(request.url).path), DEFAULT_COST))
+        response = super().send(request, **kwargs)
+        self.limiter.record_headers(response.status_code, response.headers)
+        return response
+
+
+class TunedHTTPAdapter(RateLimitedAdapter):
+    """Rate-limited `requests` adapter whose connections use `SOCKET_OPTIONS`."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        kwargs["socket_options"] = SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+
+def parse_keep_alive_timeout(header: str | None) -> float | None:
+    """Reads the idle timeout from a `Keep-Alive: timeout=5, max=100` response header."""
+    for part in (header or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name.lower() == "timeout" and value.isdigit():
+            return float(value)
+    return None
+
+
+class ConnectionWarmup:
+    """Background keepalive of pooled connections to the futures host, with per-connection RTT.
+
+    Args:
+        client: python-binance `Client`; a tuned adapter is mounted on its session for the host.
+        connections: Number of connections kept open.
+        interval: Initial seconds between cycles, adapted to the server's idle timeout.
+        order_engine: Optional `OrderEngine` whose REST session is pinged every cycle as well.
+        clock: Optional `ClockSync` fed with the server time of every ping.
+        limiter: Optional `RateLimiter` applied to every request of the session to the host.
+    """
+
+    def __init__(
+            self,
+            client,
+            connections: int = DEFAULT_CONNECTIONS,
+            interval: float = DEFAULT_INTERVAL,
+            order_engine=None,
+            clock=None,
+            limiter=None
+    ):
+        self.client = client
+        self.clock = clock
+        self.connections = max(1, connections)
+        self.interval = min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+        self.order_engine = order_engine
+        self.idle_timeout = None  # upper bound learned from closed connections or the Keep-Alive header
+
+        parts = urlsplit(client.FUTURES_URL)
+        self.host = parts.netloc
+        self.ping_url = client.FUTURES_URL + PING_PATH
+        # Room for the kept connections plus concurrent requests of the app
+        client.session.mount(
+            f"{parts.scheme}://{parts.netloc}/",
+            TunedHTTPAdapter(limiter, pool_connections=1, pool_maxsize=max(DEFAULT_POOLSIZE, self.connections))
+        )
+
+        self.rtts = {}  # local port (or "engine") -> RTT in ms of the last ping
+        self.opened = 0  # connections opened after the first cycle, i.e. closed by the server
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._barrier = None  # barrier of the current cycle's pings
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="hermes-warmup", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the cycles; a cycle in progress ends after its requests in flight."""
+        if self._thread is not None:
+            self._stop_event.set()
+            # Pings waiting for each other are released at once
+            barrier = self._barrier
+            if barrier is not None:
+                barrier.abort()
+            self._thread.join(timeout=STOP_TIMEOUT)
+            if self._thread.is_alive():
+                print("Connection warmup did not stop in time, its last cycle is still running")
+            self._thread = None
+
+    def _ping(self, barrier: threading.Barrier) -> tuple[int, float, float | None]:
+        """Pings over one connection; returns (local port, RTT ms, Keep-Alive timeout)."""
+        barrier.wait(PING_TIMEOUT)
+        sent_at = time.time() * 1000
+        start = time.perf_counter()
+        response = self.client.session.get(self.ping_url, timeout=PING_TIMEOUT, stream=True)
+        rtt = (time.perf_counter() - start) * 1000
         try:
-            client.get_server_time()  # Sends periodic requests to keep the session active
-            time.sleep(25)
-        except Exception as e:
-            print(f"Connection maintenance error: {e}")
-            time.sleep(60)  # On failure, waits 60 seconds before retrying
-
-def start_warmup(client) -> None:
-    """Initiates a background thread to keep the Binance API connection alive."""
-    if client:
-        thread = threading.Thread(target=keep_connection_alive, args=(client,), daemon=True)
-        thread.start() # Launches the background process
-    else:
+            response.raise_for_status()
+            port = response.raw.connection.sock.getsockname()[1]
+            # Hold the connection until every ping has one, so each uses a different socket
+            barrier.wait(PING_TIMEOUT)
+            server_time = response.json()["serverTime"]
+        finally:
+            response.close()
+        if self.clock is not None:
+            self.clock.add_sample(sent_at, sent_at + rtt, server_time)
+        return port, rtt, parse_keep_alive_timeout(response.headers.get("Keep-Alive"))
+
+    def cycle(self, executor: ThreadPoolExecutor) -> bool:
+        """Pings over every connection; returns False if a connection was closed since the last cycle."""
+        barrier = self._barrier = threading.Barrier(self.connections)
+        if self._stop_event.is_set():
+            barrier.abort()
+        results = list(executor.map(self._ping, [barrier] * self.connections))
+
+        known = set(self.rtts) - {"engine"}
+        complete = len(known) >= self.connections
+        self.rtts = {port: rtt for port, rtt, _ in results}
+        dropped = complete and any(port not in known for port in self.rtts)
+        if dropped:
+            self.opened += len(set(self.rtts) - known)
+
+        timeouts = [timeout for _, _, timeout in results if timeout]
+        if timeouts:
+            self.idle_timeout = min(timeouts)
+
+        if self.order_engine is not None and not self._stop_event.is_set():
+            engine_rtt = self.order_engine.ping(PING_TIMEOUT)
+            if engine_rtt is not None:
+                self.rtts["engine"] = engine_rtt
+        return not dropped
+
+    def adapt(self, kept: bool) -> None:
+        """Grows the interval while connections survive it, halves it when one was closed."""
+        if kept:
+            self.interval += INTERVAL_STEP
+        else:
+            # Idle connections were closed within the last interval
+            self.idle_timeout = min(self.idle_timeout or self.interval, self.interval)
+            self.interval /= 2
+        if self.idle_timeout:
+            self.interval = min(self.interval, self.idle_timeout * IDLE_TIMEOUT_MARGIN)
+        self.interval = min(max(self.interval, MIN_INTERVAL), MAX_INTERVAL)
+
+    def report(self) -> str:
+        rtts = ", ".join(f"{rtt:.1f}" for rtt in self.rtts.values())
+        report = f"{len(self.rtts)} connections to {self.host}, RTT {rtts} ms, next in {self.interval:.0f} s"
+        if self.clock is not None:
+            report += f", {self.clock.report()}"
+        return report
+
+    def _run(self) -> None:
+        first = True
+        with ThreadPoolExecutor(self.connections, thread_name_prefix="hermes-warmup-ping") as executor:
+            while not self._stop_event.is_set():
+                try:
+                    kept = self.cycle(executor)
+                except Exception as e:
+                    # Pings released by stop() fail with BrokenBarrierError
+                    if self._stop_event.is_set():
+                        break
+                    print(f"Connection maintenance error: {e}")
+                    self._stop_event.wait(ERROR_DELAY)
+                    continue
+
+                if not first:
+                    self.adapt(kept)
+                if first or not kept:
+                    print(f"Connection warmup: {self.report()}")
+                first = False
+                self._stop_event.wait(self.interval)
+
+
+def start_warmup(
+        client,
+        connections: int = DEFAULT_CONNECTIONS,
+        interval: float = DEFAULT_INTERVAL,
+        order_engine=None,
+        clock=None,
+        limiter=None
+):
+    """Starts keeping the futures connections of the client warm; returns the `ConnectionWarmup`."""
+    if not client:
         print("Binance client is not initialized, connection maintenance not started!")
+        return None
+
+    warmup = ConnectionWarmup(client, connections, interval, order_engine, clock, limiter)
+    warmup.start()
+    return warmup
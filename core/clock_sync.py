@@ -0,0 +1,94 @@
+import math
+import threading
+import weakref
+from collections import deque
+
+#  Offset of the futures server clock, estimated NTP-style.
+#
+#  A sample is one server time request: the server clock is assumed to be read at the midpoint
+#  of the round trip, so offset = server time - (sent + received) / 2, wrong by at most half
+#  the RTT. Like the NTP clock filter, the sample with the lowest RTT among the recent ones is
+#  trusted most; the applied offset follows it with exponential smoothing.
+#
+#  Signed requests are valid while server time - timestamp <= recvWindow, so the window only
+#  needs to cover the one-way delay, its jitter and the offset error; it is derived from the
+#  observed RTTs instead of python-binance's fixed 10 s.
+
+SAMPLE_WINDOW = 8  # recent samples the filter chooses from
+RTT_WINDOW = 64  # recent RTTs used for the recvWindow
+SMOOTHING = 0.25  # weight of a new filtered offset
+RECV_WINDOW_MARGIN = 500  # ms on top of the worst observed delay and jitter
+MIN_RECV_WINDOW = 1000
+MAX_RECV_WINDOW = 5000  # upper value recommended by Binance
+
+
+
+class ClockSync:
+    """Smoothed server clock offset and recvWindow, applied to every attached signer.
+
+    Signers are python-binance clients (`timestamp_offset` and `REQUEST_RECVWINDOW`) or
+    objects with `timestamp_offset` and `recv_window` attributes, like `HotIntentCache` and
+    `WsApiSession`. They are held weakly, so replaced clients need not be detached.
+
+    Args:
+        recv_window: Fixed recvWindow in ms; tuned from the RTTs when None.
+    """
+
+    def __init__(self, recv_window: int | None = None):
+        self.fixed_recv_window = recv_window
+        self.offset = None  # ms added to the local clock, None until the first sample
+        self.recv_window = recv_window
+        self.samples = deque(maxlen=SAMPLE_WINDOW)  # (RTT ms, offset ms)
+        self.rtts = deque(maxlen=RTT_WINDOW)
+        self._targets = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    @property
+    def is_synced(self) -> bool:
+        return self.offset is not None
+
+    def add_sample(self, sent_ms: float, received_ms: float, server_ms: float) -> None:
+        """Adds a server time reading taken between two local wall clock readings, in ms."""
+        rtt = max(0.0, received_ms - sent_ms)
+        with self._lock:
+            self.samples.append((rtt, server_ms - (sent_ms + received_ms) / 2))
+            self.rtts.append(rtt)
+
+            # The lowest RTT leaves the least room for asymmetric delays
+            best_rtt, best_offset = min(self.samples)
+            if self.offset is None:
+                self.offset = best_offset
+            else:
+                self.offset += SMOOTHING * (best_offset - self.offset)
+
+            if self.fixed_recv_window is None:
+                jitter = max(self.rtts) - min(self.rtts)
+                window = max(self.rtts) + 2 * jitter + best_rtt / 2 + RECV_WINDOW_MARGIN
+                window = math.ceil(window / 100) * 100
+                self.recv_window = min(max(window, MIN_RECV_WINDOW), MAX_RECV_WINDOW)
+
+            targets = list(self._targets)
+        for target in targets:
+            self._apply(target)
+
+    def attach(self, target) -> None:
+        """Applies the clock to a signer now and after every sample."""
+        if target is None:
+            return
+        with self._lock:
+            self._targets.add(target)
+        self._apply(target)
+
+    def _apply(self, target) -> None:
+        if self.offset is not None:
+            target.timestamp_offset = self.offset
+        if self.recv_window:
+            if hasattr(target, "REQUEST_RECVWINDOW"):
+                target.REQUEST_RECVWINDOW = self.recv_window
+            else:
+                target.recv_window = self.recv_window
+
+    def report(self) -> str:
+        if self.offset is None:
+            return "clock not synced"
+        return f"clock offset {self.offset:+.1f} ms, recvWindow {self.recv_window} ms"
@@ -0,0 +1,47 @@
+import asyncio
+import threading
+
+
+
+class AsyncLoopThread:
+    """Runs a persistent asyncio event loop in a dedicated background thread.
+
+    Coroutines are submitted from any thread (usually the Qt main thread)
+    and run on this loop without blocking the caller.
+    """
+
+    def __init__(self, name: str = "hermes-event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        # The loop keeps only weak references to tasks, so submitted work is held here until done
+        self._futures = set()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self) -> None:
+        """Starts the event loop thread."""
+        if not self._thread.is_alive():
+            self._thread.start()
+
+    def submit(self, coro):
+        """Schedules a coroutine on the loop and returns a `concurrent.futures.Future`."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    async def _shutdown(self) -> None:
+        """Cancels the remaining tasks, so they can clean up, and stops the loop."""
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.loop.stop()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stops the event loop and waits for the thread to finish."""
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+            self._thread.join(timeout)
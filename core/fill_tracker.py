@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+
+class FillTracker:
+    """Delivers order fill confirmations from the user data stream to the order path.
+
+    The user data stream pushes an ORDER_TRADE_UPDATE event the moment the exchange
+    fills an order. The tracker keeps the most recent fills, so an event that arrives
+    before `futures_create_order` has even returned is not lost.
+    """
+
+    def __init__(self, max_recent: int = 256):
+        self._lock = threading.Lock()
+        self._fills = OrderedDict()  # orderId -> average fill price
+        self._waiters = {}  # orderId -> threading.Event
+        self.max_recent = max_recent
+
+        # Set by the user data listener while its WebSocket is connected
+        self.is_streaming = False
+
+    def on_order_update(self, order: dict) -> None:
+        """Handles the 'o' payload of an ORDER_TRADE_UPDATE event."""
+        if order.get("X") != "FILLED":
+            return
+
+        order_id = order["i"]
+        with self._lock:
+            self._fills[order_id] = float(order["ap"])
+            # Keep only the latest fills to bound memory usage
+            if len(self._fills) > self.max_recent:
+                self._fills.popitem(last=False)
+            waiter = self._waiters.get(order_id)
+
+        # Wake up the order path waiting for this order
+        if waiter:
+            waiter.set()
+
+    def get_fill(self, order_id: int) -> float | None:
+        """Returns the average fill price if the fill event was already received."""
+        with self._lock:
+            return self._fills.get(order_id)
+
+    def wait_for_fill(
+            self,
+            order_id: int,
+            timeout: float,
+            poll=None,
+            poll_interval: float = 0.5
+    ) -> float | None:
+        """
+        Blocks until the fill event for `order_id` arrives or the timeout expires.
+
+        Args:
+            order_id (int): Exchange order ID to wait for.
+            timeout (float): Maximum waiting time in seconds.
+            poll (callable | None): Optional REST fallback returning the fill price or None.
+                It is called once per `poll_interval` while no event has arrived.
+            poll_interval (float): Seconds between fallback polls.
+
+        Returns:
+            float | None: Average fill price, or None if the order was not filled in time.
+        """
+        with self._lock:
+            price = self._fills.get(order_id)
+            if price is not None:
+                return price
+            waiter = self._waiters.setdefault(order_id, threading.Event())
+
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+
+                # Sleep until the event arrives, waking up only for the slow fallback poll
+                if waiter.wait(min(poll_interval, remaining)):
+                    return self.get_fill(order_id)
+
+                if poll is not None:
+                    price = poll()
+                    if price is not None:
+                        return price
+        finally:
+            with self._lock:
+                self._waiters.pop(order_id, None)
@@ -0,0 +1,104 @@
+import gzip
+import os
+import queue
+import threading
+import time
+
+#  Raw stream frame recording.
+#
+#  File format: gzip, one frame per line as "<local receive time, epoch ns> <raw frame>".
+#  Binance frames are compact JSON without newlines. Every session appends a new gzip
+#  member, so a file keeps growing across runs and is still read as a single stream.
+
+FLUSH_INTERVAL = 0.5  # seconds between batched writes
+MAX_BATCH = 10_000  # frames written at most per batch
+
+
+
+def read_frames(path: str):
+    """Yields (receive time in epoch ns, raw frame bytes) from a recording.
+
+    A recording cut short by a crash is read up to its last complete frame.
+    """
+    with gzip.open(path, "rb") as f:
+        try:
+            for line in f:
+                timestamp, _, frame = line.rstrip(b"\n").partition(b" ")
+                if frame:
+                    yield int(timestamp), frame
+        except (EOFError, gzip.BadGzipFile):
+            return
+
+
+class FrameRecorder:
+    """Appends raw frames with their receive time to a compressed file.
+
+    `record` only puts the frame on a queue, so the receive loop never waits for
+    compression or disk; a writer thread writes the frames in batches. If the file
+    cannot be written, recording stops and `record` drops the frames.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frames = 0
+        self._queue = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._file = None
+        self.is_recording = False
+
+    def start(self) -> bool:
+        """Opens the file and starts the writer; False if the file cannot be opened."""
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = gzip.open(self.path, "ab")
+        except OSError as e:
+            print(f"Stream frames are not recorded, cannot open {self.path}: {e}")
+            return False
+        self.is_recording = True
+        self._thread = threading.Thread(target=self._write_loop, name="hermes-frame-recorder", daemon=True)
+        self._thread.start()
+        print(f"Recording stream frames to {self.path}")
+        return True
+
+    def record(self, frame: bytes) -> None:
+        """Queues a frame received just now."""
+        if self.is_recording:
+            self._queue.put((time.time_ns(), frame))
+
+    def _drain(self, f) -> None:
+        lines = []
+        try:
+            while len(lines) < MAX_BATCH:
+                timestamp, frame = self._queue.get_nowait()
+                lines.append(b"%d %s\n" % (timestamp, frame))
+        except queue.Empty:
+            pass
+        if lines:
+            f.write(b"".join(lines))
+            # Sync flush: frames written so far stay readable if the app is killed
+            f.flush()
+            self.frames += len(lines)
+
+    def _write_loop(self) -> None:
+        try:
+            with self._file as f:
+                while not self._stop_event.wait(FLUSH_INTERVAL):
+                    self._drain(f)
+                # Write whatever arrived before the stop
+                while not self._queue.empty():
+                    self._drain(f)
+        except OSError as e:
+            # Disk full, file removed, ...: stop queueing frames nobody will write
+            self.is_recording = False
+            print(f"Stream frame recording stopped, cannot write {self.path}: {e}")
+            while not self._queue.empty():
+                self._queue.get_nowait()
+
+    def stop(self) -> None:
+        """Writes the queued frames and closes the file."""
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+            print(f"Recorded {self.frames} stream frames")
@@ -2,24 +2,62 @@ import sys
 import multiprocessing
 import json
 import os
+import time
 
 from PyQt5 import QtWidgets, QtCore, QtGui
-from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QLineEdit
 from ui.hermes_ui import Ui_MainWindow
 from ui.customTitleBar import CustomTitleBar
 from ui.ui_helpers import flash_input_error, toggle_secret_key_visibility
-from core.client_binance import BinanceClient
-from core.client_warmup import start_warmup
-from core.websockets_listener import run_listener
+from core.client_binance import BinanceClient, create_public_client, fetch_account_snapshot
+from core.clock_sync import ClockSync
+from core.rate_limiter import RateLimiter
+from core.startup import StartupOrchestrator, StartupTimeline
+from core.fill_tracker import FillTracker
+from core.order_engine import OrderEngine
+from core.hot_intent import HotIntentCache
+from core.latency import DEFAULT_CAPACITY, STAGE_QUANTITY, LatencyRecorder
+from core.ws_api_client import (
+    WsApiOrderClient,
+    ORDER_TRANSPORT_REST,
+    ORDER_TRANSPORT_WS,
+    FUTURES_WS_API_URL
+)
+from core.user_data_stream import UserDataStream, feed_fill_tracker
+from core.position_book import PositionBook
+from core.protective_orders import UNPROTECTED_ALERT_AFTER, ProtectiveOrderManager
+from core.market_data_table import MarketDataTable
+from core.candles import CandleStore
+from core.order_book import OrderBookFeed
+from core.price_notifier import PriceUpdateNotifier, create_notify_channel
+from core.websockets_listener import (
+    run_stream_worker,
+    DECODER_AUTO,
+    FUTURES_STREAM_URL,
+    CMD_SUBSCRIBE,
+    CMD_UNSUBSCRIBE,
+    CMD_STOP
+)
 from core.binance_utils import is_valid_symbol, get_quantity_precision, get_price_precision
-from core.place_order import place_market_order, close_position_by_order_id
+from core.symbol_registry import SymbolRegistry
+from core.quantizer import build_quantizer
+from core.place_order import (
+    close_position,
+    close_live_positions,
+    is_price_stale,
+    EXECUTION_MODE_SEQUENTIAL,
+    MAX_PRICE_AGE_MS,
+    STALE_PRICE_REPRICE
+)
 from config.config_paths import CONFIG_PATH, STYLE_PATH
 
+RATE_LIMIT_REFRESH_MS = 1000  # status bar refresh of the rate limit usage
+EXCHANGE_INFO_RETRY_MS = 5000  # delay before a failed exchange info download is tried again
+
 
 
 class HermesMainWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    def __init__(self, timeline: StartupTimeline | None = None):
         super().__init__()
 
         # Initialize UI components
@@ -29,6 +67,11 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         # Indicates whether the app is closing; set to False initially.
         self.closing = False
 
+        # Startup milestones; the network part of the startup runs in background threads
+        self.timeline = timeline if timeline is not None else StartupTimeline()
+        self.startup = StartupOrchestrator(self.timeline)
+        self.startup.signals.task_done.connect(self.on_startup_task)
+
         # Load and apply custom styles
         self.load_styles()
 
@@ -86,8 +129,64 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         )
 
 
-        # Initialize Binance client for API communication
-        self.binance_client = BinanceClient()
+        # Load configuration settings from config/settings.json
+        self.settings = self.load_settings()
+
+        # Order transport: "rest" or "ws" (WebSocket API session)
+        self.order_transport = self.settings.get("order_transport", ORDER_TRANSPORT_REST)
+        self.ws_api_url = self.settings.get("ws_api_url", FUTURES_WS_API_URL)
+        self.ws_order_client = None
+
+        # Pre-built, pre-signed entry payloads (REST transport only)
+        self.hot_intent = None
+
+        # Initialize Binance client for API communication; the keys are checked by the startup
+        self.binance_client = BinanceClient(connect=False)
+
+        # Server clock offset and recvWindow of every signed request, sampled by the warmup
+        self.clock = ClockSync(recv_window=self.settings.get("recv_window", None))
+
+        # Request weight and order rate limits shared by every session to the futures API
+        self.rate_limiter = RateLimiter(self.clock)
+        self.rate_limit_timer = QtCore.QTimer(self)
+        self.rate_limit_timer.timeout.connect(self.show_rate_limits)
+        self.rate_limit_timer.start(RATE_LIMIT_REFRESH_MS)
+
+        # Keeps pooled connections to the futures host warm between orders
+        self.warmup = None
+
+        # Futures exchange info indexed by symbol, restored from the on-disk snapshot
+        self.symbol_registry = SymbolRegistry()
+        self.symbol_registry.load_snapshot()
+
+        # Receives fill events from the user data stream for the order path
+        self.fill_tracker = FillTracker()
+
+        # Asynchronous order engine running on its own event-loop thread
+        self.order_engine = OrderEngine(self.fill_tracker, clock=self.clock, limiter=self.rate_limiter)
+        self.order_engine.signals.order_placed.connect(self.on_order_placed)
+        self.order_engine.signals.order_failed.connect(self.on_order_failed)
+
+        # Account events of the user data stream, on the order engine's loop so that subscribers
+        # can submit orders without a thread hop; started once the keys are checked
+        self.user_data = UserDataStream(loop_thread=self.order_engine.loop_thread)
+        feed_fill_tracker(self.user_data, self.fill_tracker)
+
+        # Live positions and open orders: seeded by the startup snapshot, kept current by the
+        # user data stream and reconciled over REST
+        self.position_book = PositionBook(self.clock)
+        self.position_book.attach(self.user_data)
+
+        # Stop-loss / take-profit pairs of the entries: the sibling of a filled leg is canceled,
+        # failed placements are retried, and a position left without a stop-loss raises an alert
+        self.protective_orders = ProtectiveOrderManager(
+            self.order_engine.loop_thread,
+            lambda: self.order_engine.client,
+            alert_after=self.settings.get("unprotected_alert_s", UNPROTECTED_ALERT_AFTER)
+        )
+        self.protective_orders.attach(self.user_data)
+        self.protective_orders.signals.unprotected.connect(self.on_position_unprotected)
+        self.protective_orders.start()
 
         # Populate API key fields if stored in .env file
         self.ui.apiKeyLineEdit.setText(
@@ -97,26 +196,20 @@ class HermesMainWindow(QtWidgets.QMainWindow):
             self.binance_client.api_secret if self.binance_client.api_secret else ""
         )
 
-        # Automatically check connection status upon startup
+        # Not connected until the background credential check succeeds
         self.refresh_connection_status()
 
         # Connect the "Connect" button to manual API authentication
         self.ui.connectButton.clicked.connect(self.manual_connect)
 
-        #  Trigger warmup process if Binance client is already connected
-        if self.binance_client.is_connected:
-            start_warmup(self.binance_client.client)
-
-
         # Symbol
-        # Load configuration settings from config/settings.json
-        self.settings = self.load_settings()
         self.symbol = self.settings.get("symbol", "")
 
         # Define precision variables for trading calculations
         self.precision = None
         self.use_decimal = None
         self.price_precision = None
+        self.quantizer = None
 
         # Insert the saved symbol into the input field
         self.ui.symbolLineEdit.setText(self.symbol)
@@ -124,15 +217,22 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         # Set initial connection status to "Disconnected"
         self.update_pair_status(False)
 
-        # Create shared memory variables for price tracking
-        self.price_value = multiprocessing.Value("d", 0.0)
-        self.event = multiprocessing.Event()
+        # Shared memory market data table written by the stream worker, one slot per symbol
+        self.market_data = MarketDataTable.create()
+        # 1s/1m/5m OHLCV bars of the same slots, built by the worker from the trade stream
+        self.candles = CandleStore.create(slots=self.market_data.slot_count)
         self.ws_process = None
+        self.stream_commands = None  # sending end of the stream worker command channel
+        self.stream_issues = (0, 0)  # reconnects and missed trades last shown in the status bar
+
+        # The worker wakes the GUI through a socket pair, at most one update per frame
+        self.notify_receiver, self.notify_sender = create_notify_channel()
+        self.price_notifier = PriceUpdateNotifier(self.notify_receiver, self.market_data, parent=self)
+        self.price_notifier.updated.connect(self.on_market_data)
+        self.waiting_for_price = False
 
-        # Set up a timer to monitor `self.event` at a 100ms interval
-        self.check_event_timer: QTimer = QTimer()
-        self.check_event_timer.setInterval(100)
-        self.check_event_timer.timeout.connect(self.check_event)
+        # Local order book of the active symbol, used to size orders at their expected fill price
+        self.order_book = OrderBookFeed() if self.settings.get("order_book", True) else None
 
         # Automatically activate WebSocket listener if a symbol exists
         self.auto_activate_symbol()
@@ -145,8 +245,21 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         self.usd = self.settings.get("usd", None)
         self.st_percentage = self.settings.get("st_percentage", None)
         self.tp_percentage = self.settings.get("tp_percentage", None)
+
+        # Order execution mode: "sequential" or "result_batch" (see core/place_order.py)
+        self.execution_mode = self.settings.get("execution_mode", EXECUTION_MODE_SEQUENTIAL)
+        # Staleness guard: older streamed prices are re-fetched ("reprice") or refused ("refuse")
+        self.max_price_age_ms = self.settings.get("max_price_age_ms", MAX_PRICE_AGE_MS)
+        self.stale_price_action = self.settings.get("stale_price_action", STALE_PRICE_REPRICE)
         self.populate_saved_inputs()
 
+        # Per-stage order latency; exported on exit and/or served on a local endpoint
+        self.latency = LatencyRecorder(self.settings.get("latency_capacity", DEFAULT_CAPACITY))
+        self.latency_export_path = self.settings.get("latency_export_path", None)
+        latency_endpoint_port = self.settings.get("latency_endpoint_port", None)
+        if latency_endpoint_port:
+            self.latency.serve(latency_endpoint_port)
+
         # Update values when input fields lose focus
         self.ui.usdLineEdit.editingFinished.connect(self.update_usd)
         self.ui.st_percentageLineEdit.editingFinished.connect(self.update_st_percentage)
@@ -160,6 +273,11 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         self.ui.sellButton.clicked.connect(lambda: self.place_order("SELL"))
         self.ui.closePositionButton.clicked.connect(self.close_position)
 
+        # Prepare the hot intent payloads; price updates keep them in sync (see on_market_data)
+        self.update_hot_intent()
+
+        # Credential check, exchange info and account snapshot, without blocking the window
+        self.start_background_startup()
 
 
     def place_order(self, side: str) -> None:
@@ -171,13 +289,38 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         # Validate the symbol before proceeding
         if not self.symbol:
             return
-
-        # Retrieve the latest price value
-        price = self.price_value.value
-
-        # Execute the market order
-        order_id = place_market_order(
-            client=self.binance_client.client,
+        # Orders only go through the async engine: a blocking REST order would freeze the GUI
+        # for the whole fill wait, and the engine connects shortly after the window is shown
+        if not self.order_engine.is_ready:
+            print(f"{side} order not placed: the order engine is still connecting")
+            self.ui.statusbar.showMessage("Order engine is connecting, try again in a moment")
+            return
+        latency_trace = self.latency.begin()
+
+        # Retrieve the latest price value and how long ago it was received; without a readable
+        # snapshot the price counts as stale, so it is re-fetched or refused
+        snapshot = self.market_data.read(self.symbol)
+        price = snapshot.last_price if snapshot else 0.0
+        price_age_ms = snapshot.price_age_ms if snapshot else float("inf")
+        price_is_stale = is_price_stale(price_age_ms, self.max_price_age_ms)
+
+        # Size the order at the VWAP the local book expects instead of the last trade price
+        if self.order_book is not None and self.usd and not price_is_stale:
+            estimate = self.order_book.estimate_fill(self.symbol, side, self.usd, self.max_price_age_ms)
+            if estimate is not None and estimate.filled_usd >= self.usd:
+                print(f"Expected VWAP {estimate.vwap:.8g}, slippage {estimate.slippage_bps:.2f} bps")
+                price = estimate.vwap
+
+        # Only the timestamp and signature are added to the prepared payload,
+        # a stale price goes through the regular path to be re-priced or refused
+        hot_order = None
+        if self.hot_intent is not None and not price_is_stale:
+            signed_body = self.hot_intent.stamp(side, price)
+            if signed_body is not None:
+                hot_order = (self.hot_intent.quantity, signed_body)
+                latency_trace.mark(STAGE_QUANTITY)
+
+        self.order_engine.submit_market_order(
             symbol=self.symbol,
             side=side,
             amount_usd=self.usd,
@@ -186,26 +329,84 @@ class HermesMainWindow(QtWidgets.QMainWindow):
             st_percentage=self.st_percentage,
             tp_percentage=self.tp_percentage,
             price=price,
-            use_decimal=self.use_decimal
+            use_decimal=self.use_decimal,
+            execution_mode=self.execution_mode,
+            hot_order=hot_order,
+            quantizer=self.quantizer,
+            price_age_ms=price_age_ms,
+            max_price_age_ms=self.max_price_age_ms,
+            stale_price_action=self.stale_price_action,
+            latency_trace=latency_trace,
+            protection=self.protective_orders
         )
-        # Store the last order ID if the order was successful
-        if order_id:
-            self.last_order_id = order_id
+
+    def on_order_placed(self, symbol: str, order_id: int) -> None:
+        """Stores the ID of an order placed by the async engine."""
+        print(f"Order {order_id} placed for {symbol}")
+        self.last_order_id = order_id
+
+    def on_order_failed(self, symbol: str, side: str) -> None:
+        """Reports an order the async engine could not place."""
+        print(f"{side} order for {symbol} failed")
+
+    def on_position_unprotected(self, symbol: str, order_id: int, reason: str) -> None:
+        """Warns that the position of an entry has been without a stop-loss for too long."""
+        QtWidgets.QApplication.beep()
+        self.ui.statusbar.showMessage(f"UNPROTECTED {symbol} position (order {order_id}): {reason}")
+
+    def position_book_is_live(self) -> bool:
+        """True while the position book is current: snapshot applied and the user data stream up.
+
+        While the stream is down or reconnecting, fills are missed until the next snapshot.
+        """
+        return self.position_book.is_synced and self.user_data.is_connected
 
     def close_position(self) -> None:
-        """Closes the last open position if an order ID exists."""
+        """Closes the position in the active symbol; with Shift held, every open position.
 
-        if not self.last_order_id:
+        With a live position book the close is a single request of the size in the book.
+        Otherwise, or if the book has no position (the fill of an entry may not have arrived
+        yet), the size is looked up over REST first.
+        """
+        if QtWidgets.QApplication.keyboardModifiers() & QtCore.Qt.ShiftModifier:
+            self.close_all_positions()
+            return
+        if not self.symbol:
             return
 
-        #Execute position closure using the stored order ID
-        close_position_by_order_id(
-            client=self.binance_client.client,
-            symbol=self.symbol,
-            order_id=self.last_order_id
-        )
-        # Clear the last order ID after successful closure
-        self.last_order_id = None
+        position = self.position_book.position(self.symbol) if self.position_book_is_live() else None
+        if position is None:
+            self.close_live_positions(self.symbol)
+        elif self.order_engine.is_ready:
+            self.order_engine.submit_close_positions([(position.symbol, position.amount)])
+        else:
+            close_position(self.order_client(), position.symbol, position.amount)
+
+    def close_all_positions(self) -> None:
+        """Closes every open position of the account, all symbols at once."""
+        if not self.position_book_is_live():
+            self.close_live_positions(None)
+            return
+        positions = [(position.symbol, position.amount) for position in self.position_book.positions()]
+        if not positions:
+            print("No open positions")
+            return
+        if self.order_engine.is_ready:
+            self.order_engine.submit_close_positions(positions)
+        else:
+            for symbol, amount in positions:
+                close_position(self.order_client(), symbol, amount)
+
+    def close_live_positions(self, symbol: str | None) -> None:
+        """Closes the position in `symbol` (all if None) at the size positionRisk reports now."""
+        rest_client = self.binance_client.client
+        if rest_client is None:
+            print("Binance client is not connected, position not closed")
+            return
+        if self.order_engine.is_ready:
+            self.order_engine.submit_close_live_positions(rest_client, symbol)
+        else:
+            close_live_positions(self.order_client(), rest_client, symbol)
 
     def update_precision_flags(self, precision: int | None) -> None:
         #If precision is defined and greater than 3, enable decimal usage
@@ -216,25 +417,30 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         if not self.symbol:
             self.precision = None
             self.price_precision = None
+            self.quantizer = None
             return
 
-        # Retrieve precision values from Binance API
+        # Retrieve precision values from the symbol registry
         self.precision = get_quantity_precision(
-            self.binance_client.client,
+            self.symbol_registry,
             self.symbol
         )
         self.price_precision = get_price_precision(
-            self.binance_client.client,
+            self.symbol_registry,
             self.symbol
         )
 
         # Update precision flags based on retrieved values
         self.update_precision_flags(self.precision)
 
+        # Compile the exact integer quantizer from the symbol filters
+        self.quantizer = build_quantizer(self.symbol_registry, self.symbol)
+
         # Log precision details for debugging purposes
         print(f"Quantity precision for {self.symbol} = {self.precision}")
         print(f"Price precision for {self.symbol} = {self.price_precision}")
         print(f"Decimal mode: {'ON' if self.use_decimal else 'OFF'}")
+        print(f"Quantizer: {'ON' if self.quantizer else 'OFF'}")
 
     def populate_saved_inputs(self) -> None:
         """Populates input fields with saved values, if available."""
@@ -259,6 +465,7 @@ class HermesMainWindow(QtWidgets.QMainWindow):
                 raise ValueError("USD must be positive")
             self.usd = value # Store valid USD amount
             self.save_settings("usd", self.usd)  # Save to settings file
+            self.update_hot_intent()
         except ValueError:
             flash_input_error(self.ui.usdLineEdit)
 
@@ -272,6 +479,7 @@ class HermesMainWindow(QtWidgets.QMainWindow):
 
             self.st_percentage = value  # Store valid stop-loss percentage
             self.save_settings("st_percentage", self.st_percentage)  # Save to settings file
+            self.update_hot_intent()
         except ValueError:
             flash_input_error(self.ui.st_percentageLineEdit)
 
@@ -285,6 +493,7 @@ class HermesMainWindow(QtWidgets.QMainWindow):
 
             self.tp_percentage = value  # Store valid take-profit percentage
             self.save_settings("tp_percentage", self.tp_percentage)  # Save to settings file
+            self.update_hot_intent()
         except ValueError:
             flash_input_error(self.ui.tp_percentageLineEdit)
 
@@ -318,7 +527,12 @@ class HermesMainWindow(QtWidgets.QMainWindow):
             print("Error! Binance client is not connected.")
             return False
 
-        if not is_valid_symbol(self.binance_client.client, symbol):
+        # Download exchange info only if no snapshot was available
+        if not self.symbol_registry.ensure_loaded(self.binance_client.client):
+            print("Error! Exchange info is not available.")
+            return False
+
+        if not is_valid_symbol(self.symbol_registry, symbol):
             print(f"Error! Trading pair {symbol} does not exist.")
             flash_input_error(self.ui.symbolLineEdit)
             return False
@@ -326,28 +540,76 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         return True
 
     def start_waiting_for_price(self) -> None:
-        """Clears the event flag and starts the price check timer."""
-        self.event.clear()
-        self.check_event_timer.start()
+        """Activates the pair on the first price update of the current symbol."""
+        self.waiting_for_price = True
         print("Waiting for the first price update...")
+        # The symbol may already have a price if it did not change
+        self.check_event()
+
+    def current_price(self) -> float:
+        """Returns the last trade price of the current symbol, or 0.0 if none was received yet."""
+        snapshot = self.market_data.read(self.symbol) if self.symbol else None
+        return snapshot.last_price if snapshot else 0.0
+
+    def recent_candles(self, interval: str, count: int):
+        """Returns the most recent `interval` bars of the current symbol (see core/candles.py)."""
+        slot = self.market_data.find_slot(self.symbol) if self.symbol else None
+        if slot is None:
+            return None
+        return self.candles.recent(slot, interval, count)
+
+    def on_market_data(self) -> None:
+        """Handles a coalesced batch of market data updates pushed by the stream worker."""
+        self.check_event()
+        self.refresh_hot_intent()
+        # A reconnect or a trade gap is shown right away, not on the next status bar refresh
+        metrics = self.market_data.read_metrics()
+        if (metrics.reconnects, metrics.missed_trades) != self.stream_issues:
+            self.show_rate_limits()
+
+    def stream_status(self) -> str | None:
+        """Status bar text of the stream worker connection, None while it never dropped."""
+        metrics = self.market_data.read_metrics()
+        self.stream_issues = (metrics.reconnects, metrics.missed_trades)
+        if self.ws_process is None:
+            return None
+        # The worker publishes nothing while it is down, so the outage is timed here
+        if metrics.disconnected_since:
+            outage_s = (time.monotonic_ns() - metrics.disconnected_since) / 1e9
+            return f"STREAM DISCONNECTED for {outage_s:.0f} s (reconnects: {metrics.reconnects})"
+        if metrics.reconnects or metrics.missed_trades:
+            return (
+                f"Stream reconnects: {metrics.reconnects}, downtime: {metrics.downtime_ms / 1000:.1f} s, "
+                f"missed trades: {metrics.missed_trades}"
+            )
+        return None
 
     def check_event(self) -> None:
-        """Checks if the price update event is triggered and handles activation."""
-        if self.event.is_set():
-            self.check_event_timer.stop()
+        """Checks if the first price of the current symbol has arrived and handles activation."""
+        # Updates of other symbols also wake the GUI, so the current symbol must have a price
+        if self.waiting_for_price and self.current_price() > 0:
+            self.waiting_for_price = False
             print("Price updated! Switching status to Activated")
             self.update_pair_status(True)  # Update the trading pair status
+            if self.timeline.mark("first_price"):
+                self.check_ready()
 
     def auto_activate_symbol(self) -> None:
-        """Automatically starts the WebSocket and waits for the first price update."""
-        # Validate the symbol before proceeding
-        if not self.validate_symbol(self.symbol):
+        """Automatically starts the WebSocket and waits for the first price update.
+
+        Market data is public, so the stream does not wait for the credential check. Without
+        an exchange info snapshot the symbol is validated once the download completes.
+        """
+        if not self.symbol:
+            print("Symbol not provided! Listener will not start.")
+            return
+
+        if len(self.symbol_registry) and not is_valid_symbol(self.symbol_registry, self.symbol):
+            print(f"Error! Trading pair {self.symbol} does not exist.")
             return
 
         # Update quantity and price precision
         self.update_precision()
-        # Clear the event flag to prevent false event.wait() triggers
-        self.event.clear()
         print(f"Auto-starting WebSocket for {self.symbol}")
         # Start the WebSocket listener
         self.start_listener()
@@ -367,7 +629,7 @@ class HermesMainWindow(QtWidgets.QMainWindow):
                 "and setting status to 'Disconnected'."
             )
             self.stop_listener()
-            self.event.clear()
+            self.waiting_for_price = False
             self.update_pair_status(False)
             return
 
@@ -375,7 +637,7 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         if new_symbol != self.symbol:
             print(f"Restarting WebSocket for {new_symbol}")
             self.stop_listener()
-            self.event.clear()
+            self.waiting_for_price = False
             print("Setting status to Disconnected")
             self.update_pair_status(False)
 
@@ -386,6 +648,7 @@ class HermesMainWindow(QtWidgets.QMainWindow):
             self.symbol = new_symbol
             self.save_settings("symbol", self.symbol)
             self.update_precision()
+            self.update_hot_intent()
             self.start_listener()
 
         # Begin non-blocking price monitoring
@@ -402,39 +665,66 @@ class HermesMainWindow(QtWidgets.QMainWindow):
                 QtGui.QPixmap(":/icons/disconected_pair.png")
             )
 
+    def start_stream_worker(self) -> None:
+        """Starts the long-lived stream worker process if it is not running yet."""
+        if self.ws_process and self.ws_process.is_alive():
+            return
+
+        command_receiver, self.stream_commands = multiprocessing.Pipe(duplex=False)
+        self.ws_process = multiprocessing.Process(
+            target=run_stream_worker,
+            args=(
+                command_receiver,
+                self.market_data.name,
+                self.notify_sender,
+                self.settings.get("stream_decoder", DECODER_AUTO),
+                self.candles.name,
+                # A local replay server (benchmarks/replay_server.py) can stand in for the exchange
+                self.settings.get("stream_url", FUTURES_STREAM_URL),
+                # Opt-in raw frame recording, e.g. "recordings/stream.frames.gz"
+                self.settings.get("record_frames_path", None)
+            ),
+            daemon=True
+        )
+        self.ws_process.start()
+        print("Stream worker started")
+
     def start_listener(self) -> None:
-        """Starts the WebSocket listener in a separate process
+        """Subscribes the stream worker to the current symbol
         and updates status upon receiving the first price update.
         """
         print(f"Starting WebSocket for {self.symbol}...")
         # Set status to "Disconnected" until WebSocket receives the first price update
         self.update_pair_status(False)
 
-        # Launch WebSocket listener in a separate process
-        self.ws_process = multiprocessing.Process(
-            target=run_listener,
-            args=(self.symbol, self.price_value, self.event)
-        )
-        self.ws_process.start()
+        # One persistent connection: switching symbols is a single SUBSCRIBE message
+        self.start_stream_worker()
+        self.stream_commands.send((CMD_SUBSCRIBE, self.symbol))
+        self.track_order_book()
 
         print("WebSocket started successfully!")
 
     def stop_listener(self) -> None:
-        """Stops the WebSocket listener if it is running."""
+        """Unsubscribes from the current symbol; stops the stream worker when closing."""
         if self.ws_process:
             print("Stopping current WebSocket...")
 
-            # Terminate and clean up the WebSocket process
-            self.ws_process.terminate()
-            self.ws_process.join()
-            self.ws_process = None
-
-            # Update status based on closing condition
             if not self.closing:
+                self.stream_commands.send((CMD_UNSUBSCRIBE, self.symbol))
+                if self.order_book is not None:
+                    self.order_book.stop_tracking()
                 print("Skipping update_pair_status(False)— "
                       "status will be updated externally")
-            else:
-                self.update_pair_status(False)
+                return
+
+            # Let the worker close its connection, terminate it only if it does not exit
+            self.stream_commands.send((CMD_STOP,))
+            self.ws_process.join(timeout=2)
+            if self.ws_process.is_alive():
+                self.ws_process.terminate()
+                self.ws_process.join()
+            self.ws_process = None
+            self.update_pair_status(False)
 
     def closeEvent(self, event) -> None:
         """Handles application shutdown by stopping
@@ -443,9 +733,44 @@ class HermesMainWindow(QtWidgets.QMainWindow):
         self.closing = True
         print("Shutting down...")
 
+        # Drop startup tasks that have not started yet
+        self.startup.shutdown()
+
         # Stop WebSocket listener if it is running
         self.stop_listener()
 
+        # The worker is stopped, free the wake-up channel and the market data table
+        self.price_notifier.close()
+        self.notify_sender.close()
+        self.market_data.close()
+        self.candles.close()
+
+        # Stop the exchange info refresh and connection warmup threads
+        self.symbol_registry.stop_background_refresh()
+        if self.warmup is not None:
+            self.warmup.stop()
+
+        # Stop the order book stream
+        if self.order_book is not None:
+            self.order_book.stop()
+
+        # Stop the user data stream, the position snapshots and the protective order jobs, then close the
+        # order engine session and the loop they share
+        self.user_data.stop()
+        self.position_book.stop_reconcile()
+        self.protective_orders.stop()
+        self.order_engine.stop()
+        if self.ws_order_client:
+            self.ws_order_client.close()
+
+        # Keep the order latency of the session
+        if self.latency_export_path:
+            try:
+                self.latency.export(self.latency_export_path)
+            except OSError as e:
+                print(f"Unable to export order latency: {e}")
+        self.latency.stop()
+
         # Properly close the application
         event.accept()
         sys.exit(0)
@@ -465,9 +790,198 @@ class HermesMainWindow(QtWidgets.QMainWindow):
             print("API keys are missing")
             return
 
-        self.binance_client.save_keys(api_key, api_secret)
+        # The keys are checked in the background, see on_connection_checked
+        self.binance_client.save_keys(api_key, api_secret, connect=False)
+        self.startup.run("connect", self.binance_client.try_connect)
+
+    def start_background_startup(self) -> None:
+        """Runs the credential check, exchange info download and account snapshot in parallel."""
+        if self.binance_client.has_keys:
+            self.startup.run("connect", self.binance_client.try_connect)
+            # Server time before the request, so that events after it win over the snapshot
+            self.account_requested_at = self.position_book.now()
+            self.startup.run(
+                "account", fetch_account_snapshot, self.binance_client.api_key, self.binance_client.api_secret
+            )
+
+        # Exchange info is public; with a snapshot on disk nothing has to be downloaded first
+        if len(self.symbol_registry):
+            self.timeline.mark("exchange_info")
+        else:
+            self.load_exchange_info()
+
+    def load_exchange_info(self) -> None:
+        """Downloads exchange info in the background, unless the registry was filled meanwhile
+        (e.g. by the background refresh, which does not notify the window)."""
+        if self.closing:
+            return
+        self.startup.run("exchange_info", lambda: self.symbol_registry.ensure_loaded(create_public_client()))
+
+    def on_startup_task(self, name: str, result, error) -> None:
+        """Handles the result of a background startup task in the GUI thread."""
+        if self.closing:
+            return
+        if error is not None:
+            print(f"Startup task '{name}' failed: {error}")
+
+        if name == "connect":
+            self.on_connection_checked()
+        elif name == "exchange_info":
+            if result:
+                self.timeline.mark("exchange_info")
+                self.on_exchange_info_loaded()
+            else:
+                # Without trading rules, quantities and prices could not be rounded
+                QtCore.QTimer.singleShot(EXCHANGE_INFO_RETRY_MS, self.load_exchange_info)
+        elif name == "account" and error is None:
+            self.position_book.apply_snapshot(result, None, self.account_requested_at)
+            self.timeline.mark("account")
+            print(f"Account snapshot: {len(result)} open positions")
+        self.check_ready()
+
+    def on_connection_checked(self) -> None:
+        """Starts everything that needs valid keys once the credential check is done."""
         self.refresh_connection_status()
 
+        # The warm connections belong to the replaced client
+        self.restart_warmup()
+        if not self.binance_client.is_connected:
+            return
+        self.timeline.mark("connected")
+
+        self.symbol_registry.start_background_refresh(self.binance_client.client)
+        # A new listen key for the (possibly new) account
+        self.user_data.start(self.binance_client.client)
+        self.position_book.start_reconcile(self.binance_client.client, self.order_engine.loop_thread)
+
+        # (Re)open the order sessions with the current keys
+        self.connect_order_transport()
+        self.update_hot_intent()
+        self.track_order_book()
+
+    def on_exchange_info_loaded(self) -> None:
+        """Validates the symbol the stream was started for and loads its trading rules."""
+        if not self.symbol:
+            return
+
+        if not is_valid_symbol(self.symbol_registry, self.symbol):
+            print(f"Error! Trading pair {self.symbol} does not exist.")
+            self.stop_listener()
+            self.waiting_for_price = False
+            self.update_pair_status(False)
+            return
+
+        self.update_precision()
+        self.update_hot_intent()
+
+    def check_ready(self) -> None:
+        """Marks the app ready to trade once it is connected, knows the symbol rules and has a price."""
+        if all(name in self.timeline.milestones for name in ("connected", "exchange_info", "first_price")):
+            if self.timeline.mark("ready"):
+                print(self.timeline.report())
+
+    def showEvent(self, event) -> None:
+        """Records when the window first appeared."""
+        super().showEvent(event)
+        self.timeline.mark("window_shown")
+
+    def restart_warmup(self) -> None:
+        """Stops the connection warmup and starts it again for the current client, if connected."""
+        if self.warmup is not None:
+            self.warmup.stop()
+            self.warmup = None
+
+        if self.binance_client.is_connected:
+            # Imported once connected: requests is loaded by python-binance by then
+            from core.client_warmup import DEFAULT_CONNECTIONS, DEFAULT_INTERVAL, start_warmup
+
+            self.clock.attach(self.binance_client.client)
+            self.warmup = start_warmup(
+                self.binance_client.client,
+                connections=self.settings.get("warmup_connections", DEFAULT_CONNECTIONS),
+                interval=self.settings.get("warmup_interval", DEFAULT_INTERVAL),
+                order_engine=self.order_engine,
+                clock=self.clock,
+                limiter=self.rate_limiter  # applied to the client's session by the warmup's adapter
+            )
+
+    def connect_order_transport(self) -> None:
+        """Opens the order sessions for the configured transport (REST or WebSocket API)."""
+        api_key = self.binance_client.api_key
+        api_secret = self.binance_client.api_secret
+
+        self.order_engine.connect(
+            api_key,
+            api_secret,
+            transport=self.order_transport,
+            ws_api_url=self.ws_api_url
+        )
+
+        if self.ws_order_client:
+            self.ws_order_client.close()
+            self.ws_order_client = None
+        if self.order_transport == ORDER_TRANSPORT_WS:
+            self.ws_order_client = WsApiOrderClient(api_key, api_secret, self.ws_api_url, self.rate_limiter)
+            self.clock.attach(self.ws_order_client.session)
+
+        # Pre-signed payloads are sent through the REST session of the order engine
+        self.hot_intent = None
+        if self.order_transport == ORDER_TRANSPORT_REST:
+            self.hot_intent = HotIntentCache(
+                api_secret,
+                recv_window=self.binance_client.client.REQUEST_RECVWINDOW
+            )
+            self.clock.attach(self.hot_intent)
+
+    def track_order_book(self) -> None:
+        """Starts maintaining the local order book of the current symbol."""
+        # REST snapshots are downloaded with the Binance client
+        if self.order_book is not None and self.symbol and self.binance_client.client:
+            self.order_book.track(self.binance_client.client, self.symbol)
+
+    def update_hot_intent(self) -> None:
+        """Points the hot intent cache at the current symbol and order settings."""
+        if self.hot_intent is None:
+            return
+
+        self.hot_intent.configure(
+            symbol=self.symbol,
+            amount_usd=self.usd,
+            precision=self.precision,
+            use_decimal=self.use_decimal,
+            st_percentage=self.st_percentage,
+            tp_percentage=self.tp_percentage,
+            quantizer=self.quantizer
+        )
+        self.refresh_hot_intent()
+
+    def refresh_hot_intent(self) -> None:
+        """Rebuilds the hot intent payloads if the price has changed."""
+        if self.hot_intent is not None:
+            self.hot_intent.refresh(self.current_price())
+
+    def order_client(self):
+        """Returns the client used by the synchronous order functions."""
+        if self.ws_order_client:
+            return self.ws_order_client
+        return self.binance_client.client
+
+    def show_rate_limits(self) -> None:
+        """Shows the current request weight and order count usage in the status bar.
+
+        Stream outages, reconnects and missed trades are shown in front of it. A position
+        without a stop-loss is shown instead, for as long as it lasts.
+        """
+        stream = self.stream_status()
+        unprotected = self.protective_orders.unprotected()
+        if unprotected:
+            self.ui.statusbar.showMessage(
+                "UNPROTECTED: " + ", ".join(f"{symbol} ({reason})" for symbol, _, reason in unprotected)
+            )
+            return
+        report = self.rate_limiter.report()
+        self.ui.statusbar.showMessage(f"{stream} | {report}" if stream else report)
+
     def update_connection_status(self, is_connected: bool) -> None:
         """Updates the connection status label and applies appropriate styling."""
         if is_connected:
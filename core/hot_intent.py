@@ -0,0 +1,138 @@
+import hashlib
+import hmac
+import time
+
+from core.place_order import calculate_quantity_from_price, format_decimal
+
+ORDER_ENDPOINT = "/v1/order"
+FORM_HEADERS = {"Content-Type": "application/x-www-form-urlencoded"}
+
+
+
+class HotIntentCache:
+    """Ready-to-send BUY and SELL entry payloads for the active symbol.
+
+    Quantity and the serialized order parameters are rebuilt whenever the price,
+    symbol, USD amount or SL/TP settings change, so a click only appends the
+    timestamp and signature to a prepared string and sends it.
+    """
+
+    def __init__(self, api_secret: str, recv_window: int | None = None):
+        # HMAC key setup is done once; each signature starts from a copy of this state
+        self._hmac = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+        self.timestamp_offset = 0  # milliseconds added to the local clock (see core/clock_sync.py)
+        self.recv_window = recv_window
+
+        self.symbol = None
+        self.amount_usd = None
+        self.precision = None
+        self.use_decimal = False
+        self.quantizer = None
+        self.st_percentage = None
+        self.tp_percentage = None
+
+        self.price = None
+        self.quantity = None
+        self._payloads = {}  # side -> serialized parameters without timestamp and signature
+
+    def configure(
+            self,
+            symbol: str,
+            amount_usd: float | None,
+            precision: int | None,
+            use_decimal: bool,
+            st_percentage: float | None,
+            tp_percentage: float | None,
+            quantizer=None
+    ) -> None:
+        """Sets the order intent; payloads are rebuilt on the next price update."""
+        self.symbol = symbol
+        self.amount_usd = amount_usd
+        self.precision = precision
+        self.use_decimal = bool(use_decimal)
+        self.quantizer = quantizer
+        self.st_percentage = st_percentage
+        self.tp_percentage = tp_percentage
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drops the prepared payloads."""
+        self.price = None
+        self.quantity = None
+        self._payloads = {}
+
+    def refresh(self, price: float) -> bool:
+        """Rebuilds the payloads for a new price. Returns True if they are ready to send."""
+        if price == self.price and self._payloads:
+            return True
+
+        if not self.symbol or not self.amount_usd or price <= 0:
+            self.invalidate()
+            return False
+
+        quantity = calculate_quantity_from_price(
+            amount_usd=self.amount_usd,
+            price=price,
+            precision=self.precision,
+            use_decimal=self.use_decimal,
+            quantizer=self.quantizer
+        )
+        if quantity is None:
+            self.invalidate()
+            return False
+
+        # Most price moves do not change the quantity: the payloads stay valid
+        if quantity == self.quantity and self._payloads:
+            self.price = price
+            return True
+
+        self.invalidate()
+
+        # Fixed-point like to_batch_order: str() of a small float would be rejected (1e-05)
+        quantity_param = format_decimal(quantity) if isinstance(quantity, float) else quantity
+        # Parameters are plain ASCII, so the form body needs no URL encoding
+        for side in ("BUY", "SELL"):
+            self._payloads[side] = (
+                f"newOrderRespType=RESULT&quantity={quantity_param}"
+                f"&side={side}&symbol={self.symbol}&type=MARKET"
+            )
+        self.price = price
+        self.quantity = quantity
+        return True
+
+    def stamp(self, side: str, price: float) -> str | None:
+        """Returns the signed request body for `side`, rebuilding it first if the price moved."""
+        if not self.refresh(price):
+            return None
+
+        # Offset and recvWindow are read per click: the clock sync updates them from another thread
+        recv_window = f"&recvWindow={self.recv_window}" if self.recv_window else ""
+        payload = (
+            f"{self._payloads[side]}{recv_window}"
+            f"&timestamp={int(time.time() * 1000 + self.timestamp_offset)}"
+        )
+        signer = self._hmac.copy()
+        signer.update(payload.encode())
+        return f"{payload}&signature={signer.hexdigest()}"
+
+
+def send_hot_order(client, body: str) -> dict:
+    """Sends a pre-signed order body through the python-binance `Client` HTTP session."""
+    client.response = client.session.post(
+        client.FUTURES_URL + ORDER_ENDPOINT,
+        data=body,
+        headers=FORM_HEADERS,
+        timeout=client.REQUEST_TIMEOUT
+    )
+    return client._handle_response(client.response)
+
+
+async def send_hot_order_async(client, body: str) -> dict:
+    """Sends a pre-signed order body through the `AsyncClient` HTTP session."""
+    async with client.session.post(
+        client.FUTURES_URL + ORDER_ENDPOINT,
+        data=body,
+        headers=FORM_HEADERS
+    ) as response:
+        client.response = response
+        return await client._handle_response(response)
@@ -0,0 +1,226 @@
+import array
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+#  Per-stage latency of every order.
+#
+#  Each click gets one row in a preallocated ring of monotonic timestamps (ns), one column per
+#  stage. Marking a stage is a single array store, cheap enough to stay on in production.
+#  Histograms are only built when a summary is requested.
+
+STAGES = ("click", "quantity", "sent", "ack", "fill", "sl_ack", "tp_ack")
+(
+    STAGE_CLICK,  # order button pressed
+    STAGE_QUANTITY,  # quantity computed / hot payload stamped
+    STAGE_SENT,  # market order handed to the HTTP or WebSocket client
+    STAGE_ACK,  # market order response received
+    STAGE_FILL,  # fill confirmed (RESULT response, user data stream or poll)
+    STAGE_SL_ACK,  # stop-loss acknowledged
+    STAGE_TP_ACK,  # take-profit acknowledged
+) = range(len(STAGES))
+STAGE_COUNT = len(STAGES)
+
+# Reported intervals: name -> (from stage, to stage)
+INTERVALS = {
+    "click-to-quantity": (STAGE_CLICK, STAGE_QUANTITY),
+    "quantity-to-sent": (STAGE_QUANTITY, STAGE_SENT),
+    "sent-to-ack": (STAGE_SENT, STAGE_ACK),
+    "click-to-ack": (STAGE_CLICK, STAGE_ACK),
+    "click-to-fill": (STAGE_CLICK, STAGE_FILL),
+    "fill-to-sl-ack": (STAGE_FILL, STAGE_SL_ACK),
+    "fill-to-tp-ack": (STAGE_FILL, STAGE_TP_ACK),
+}
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+
+DEFAULT_CAPACITY = 4096  # orders kept in the ring
+# Histogram resolution: every power-of-two range is split into 2 ** (SUB_BUCKET_BITS - 1) buckets,
+# so a value is known within 1/64 (~1.6%) at any magnitude, like HdrHistogram with 2 digits
+SUB_BUCKET_BITS = 7
+
+EMPTY_ROW = array.array("q", bytes(8 * STAGE_COUNT))
+monotonic_ns = time.monotonic_ns
+
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond values in the style of HdrHistogram."""
+
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self):
+        # Enough buckets for any 64-bit value
+        self.counts = [0] * ((64 - SUB_BUCKET_BITS + 2) << (SUB_BUCKET_BITS - 1))
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket_index(value: int) -> int:
+        if value < 1 << SUB_BUCKET_BITS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+    @staticmethod
+    def bucket_upper_bound(index: int) -> int:
+        """Highest value counted in a bucket."""
+        if index < 1 << SUB_BUCKET_BITS:
+            return index
+        shift = (index >> (SUB_BUCKET_BITS - 1)) - 1
+        sub_bucket = index - (shift << (SUB_BUCKET_BITS - 1))
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        value = max(0, value)
+        self.counts[self.bucket_index(value)] += 1
+        self.total += 1
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> int:
+        """Returns the value below which `fraction` of the recorded values fall."""
+        if not self.total:
+            return 0
+        rank = max(1, round(fraction * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_upper_bound(index), self.max)
+        return self.max
+
+
+class LatencyTrace:
+    """Stage timestamps of one order: a view on its row of the recorder's ring."""
+
+    __slots__ = ("timestamps", "base", "order_ids", "row")
+
+    def __init__(self, recorder: "LatencyRecorder", row: int):
+        self.timestamps = recorder.timestamps
+        self.base = row * STAGE_COUNT
+        self.order_ids = recorder.order_ids
+        self.row = row
+
+    def mark(self, stage: int) -> None:
+        """Records that the order reached `stage` now."""
+        self.timestamps[self.base + stage] = monotonic_ns()
+
+    def set_order_id(self, order_id: int) -> None:
+        self.order_ids[self.row] = order_id
+
+
+class LatencyRecorder:
+    """Preallocated ring of per-order stage timestamps with histogram summaries and export."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.timestamps = array.array("q", bytes(8 * capacity * STAGE_COUNT))
+        self.order_ids = array.array("q", bytes(8 * capacity))
+        self._orders = itertools.count()  # thread-safe increment under the GIL
+        self._server = None
+
+    def begin(self) -> LatencyTrace:
+        """Starts the trace of a new order at the click stage."""
+        clicked_at = monotonic_ns()
+        row = next(self._orders) % self.capacity
+        base = row * STAGE_COUNT
+        self.timestamps[base:base + STAGE_COUNT] = EMPTY_ROW
+        self.timestamps[base] = clicked_at
+        self.order_ids[row] = 0
+        return LatencyTrace(self, row)
+
+    def rows(self) -> list[tuple[int, list]]:
+        """Returns (order ID, stage timestamps) of the recorded orders, oldest first."""
+        timestamps = self.timestamps
+        rows = []
+        for row in range(self.capacity):
+            base = row * STAGE_COUNT
+            if timestamps[base]:
+                rows.append((self.order_ids[row], timestamps[base:base + STAGE_COUNT].tolist()))
+        rows.sort(key=lambda item: item[1][STAGE_CLICK])
+        return rows
+
+    def histograms(self) -> dict:
+        """Builds one histogram per interval over the orders in the ring."""
+        histograms = {name: LatencyHistogram() for name in INTERVALS}
+        protected = LatencyHistogram()
+        for _, stamps in self.rows():
+            for name, (start, end) in INTERVALS.items():
+                if stamps[start] and stamps[end]:
+                    histograms[name].record(stamps[end] - stamps[start])
+            # Protected once the last of the protective orders placed is acknowledged
+            acked = [stamp for stamp in (stamps[STAGE_SL_ACK], stamps[STAGE_TP_ACK]) if stamp]
+            if acked:
+                protected.record(max(acked) - stamps[STAGE_CLICK])
+        histograms["click-to-protected"] = protected
+        return histograms
+
+    def summary(self) -> dict:
+        """Count, percentiles and maximum of every interval, in milliseconds."""
+        summary = {}
+        for name, histogram in self.histograms().items():
+            summary[name] = {"count": histogram.total}
+            for fraction in PERCENTILES:
+                summary[name][f"p{fraction * 100:g}"] = histogram.percentile(fraction) / 1e6
+            summary[name]["max"] = histogram.max / 1e6
+        return summary
+
+    def recent(self, count: int = 100) -> list[dict]:
+        """The latest orders with each reached stage in ms after the click."""
+        traces = []
+        for order_id, stamps in self.rows()[-count:]:
+            clicked_at = stamps[STAGE_CLICK]
+            trace = {"order_id": order_id or None}
+            for stage, name in enumerate(STAGES[1:], start=1):
+                trace[name] = (stamps[stage] - clicked_at) / 1e6 if stamps[stage] else None
+            traces.append(trace)
+        return traces
+
+    def report(self) -> dict:
+        return {"generated_at": int(time.time() * 1000), "summary": self.summary(), "recent": self.recent()}
+
+    def export(self, path: str) -> None:
+        """Writes the summary and the latest traces to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"Order latency report written to {path}")
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> bool:
+        """Serves the report as JSON on a local HTTP endpoint, e.g. http://127.0.0.1:<port>/latency.
+
+        Returns False, and the app runs without the endpoint, if the port cannot be bound.
+        """
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path not in ("/", "/latency"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(recorder.report()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args) -> None:
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            # Port in use, e.g. by a second instance of the app
+            print(f"Order latency endpoint not started on {host}:{port}: {e}")
+            return False
+        threading.Thread(target=self._server.serve_forever, name="hermes-latency-endpoint", daemon=True).start()
+        print(f"Order latency endpoint: http://{host}:{port}/latency")
+        return True
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,260 @@
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import NamedTuple
+
+#  Lock-free market data table in shared memory.
+#
+#  Layout: a 64-byte header (wake-up flag, stream metrics) followed by fixed 128-byte
+#  (two cache line) slots, one per subscribed symbol.
+#  Each slot is protected by a seqlock: the single writer (the stream worker) makes the
+#  sequence odd, writes the fields and makes it even again. Readers retry until they
+#  see the same even sequence before and after copying the fields, so they always get
+#  a consistent snapshot and the writer never waits for a reader. A writer killed in the
+#  middle of a write leaves its slot odd for good, so readers give up after READ_RETRIES.
+
+HEADER = struct.Struct("<II")  # magic, slot count
+NOTIFY = struct.Struct("<I")  # 1 while a wake-up for the UI is in flight
+NOTIFY_OFFSET = HEADER.size
+# connected, reconnects, total downtime (ns), missed trades, disconnected since (monotonic ns, 0 if connected)
+METRICS = struct.Struct("<IQQQq")
+METRICS_OFFSET = 16
+HEADER_SIZE = 64
+MAGIC = 0x48524D53  # "HRMS"
+
+SEQ = struct.Struct("<Q")
+SYMBOL = struct.Struct("<16s")
+QUOTE = struct.Struct("<dd")  # best bid, best ask
+TIMES = struct.Struct("<qq")  # event time (ms), receive time (monotonic ns)
+TRADE = struct.Struct("<dqqq")  # last price, event time, receive time, trade receive time
+# seq, symbol, bid, ask, last price, event time, receive time, trade receive time
+SLOT = struct.Struct("<Q16sddd3q")
+SLOT_SIZE = 128
+
+SYMBOL_OFFSET = SEQ.size
+QUOTE_OFFSET = SYMBOL_OFFSET + SYMBOL.size
+LAST_PRICE_OFFSET = QUOTE_OFFSET + QUOTE.size
+EVENT_TIME_OFFSET = LAST_PRICE_OFFSET + 8
+
+DEFAULT_SLOTS = 16
+READ_RETRIES = 10_000  # seqlock attempts before a read gives up (a write takes well under 1 µs)
+
+
+
+class MarketSnapshot(NamedTuple):
+    """Consistent copy of one symbol slot."""
+    symbol: str
+    last_price: float
+    bid: float
+    ask: float
+    event_time: int  # exchange event time of the last update, ms
+    recv_time: int  # local receive time of the last update, time.monotonic_ns()
+    trade_recv_time: int  # local receive time of the last trade
+    seq: int  # number of completed writes to the slot, times two
+
+    @property
+    def age_ms(self) -> float:
+        """Milliseconds since the last update was received (inf if there was none)."""
+        if not self.recv_time:
+            return float("inf")
+        return (time.monotonic_ns() - self.recv_time) / 1e6
+
+    @property
+    def price_age_ms(self) -> float:
+        """Milliseconds since `last_price` was received (inf if there was no trade)."""
+        if not self.trade_recv_time:
+            return float("inf")
+        return (time.monotonic_ns() - self.trade_recv_time) / 1e6
+
+
+class StreamMetrics(NamedTuple):
+    """Health of the stream worker connection."""
+    connected: bool
+    reconnects: int
+    downtime_ns: int  # completed outages
+    missed_trades: int  # trade IDs skipped by the stream, mostly during outages
+    disconnected_since: int  # time.monotonic_ns() of the current outage, 0 while connected
+
+    @property
+    def downtime_ms(self) -> float:
+        """Total time without a connection, including the current outage."""
+        downtime_ns = self.downtime_ns
+        if self.disconnected_since:
+            downtime_ns += time.monotonic_ns() - self.disconnected_since
+        return downtime_ns / 1e6
+
+
+class MarketDataTable:
+    """Shared-memory table of the latest market data per symbol.
+
+    The UI process creates the table and passes `name` to the stream worker, which
+    attaches to it and publishes. Any process can read snapshots without locks.
+    `recv_time` uses the monotonic clock, which is system-wide, so ages can be
+    compared across processes.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.buf = shm.buf
+        self.owner = owner
+        _, self.slot_count = HEADER.unpack_from(self.buf, 0)
+        self._slot_cache = {}  # symbol -> slot index, filled by readers on lookup
+
+    @classmethod
+    def create(cls, slots: int = DEFAULT_SLOTS) -> "MarketDataTable":
+        """Allocates a new zeroed table."""
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + slots * SLOT_SIZE)
+        shm.buf[:] = bytes(shm.size)
+        HEADER.pack_into(shm.buf, 0, MAGIC, slots)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "MarketDataTable":
+        """Attaches to a table created by another process."""
+        # The creating process owns the segment; the attaching one must not unlink it on exit
+        shm = shared_memory.SharedMemory(name=name, track=False)
+        magic, _ = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory {name} is not a market data table")
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * SLOT_SIZE
+
+    # Writer side (single writer: the stream worker)
+
+    def _begin_write(self, offset: int) -> int:
+        seq = SEQ.unpack_from(self.buf, offset)[0] + 1
+        SEQ.pack_into(self.buf, offset, seq)  # odd: write in progress
+        return seq
+
+    def _end_write(self, offset: int, seq: int) -> None:
+        SEQ.pack_into(self.buf, offset, seq + 1)  # even: slot consistent again
+
+    def assign_slot(self, symbol: str) -> int | None:
+        """Returns the slot of a symbol, claiming and clearing a free one if needed."""
+        encoded = symbol.upper().encode()
+        free_slot = None
+        for slot in range(self.slot_count):
+            stored = SYMBOL.unpack_from(self.buf, self._offset(slot) + SYMBOL_OFFSET)[0]
+            if stored.rstrip(b"\0") == encoded:
+                return slot
+            if free_slot is None and not stored.strip(b"\0"):
+                free_slot = slot
+
+        if free_slot is None:
+            print(f"Market data table is full, {symbol} is not published")
+            return None
+
+        offset = self._offset(free_slot)
+        seq = self._begin_write(offset)
+        SLOT.pack_into(self.buf, offset, seq, encoded, 0.0, 0.0, 0.0, 0, 0, 0)
+        self._end_write(offset, seq)
+        return free_slot
+
+    def release_slot(self, slot: int) -> None:
+        """Clears a slot so it can be reused for another symbol."""
+        offset = self._offset(slot)
+        seq = self._begin_write(offset)
+        SLOT.pack_into(self.buf, offset, seq, b"", 0.0, 0.0, 0.0, 0, 0, 0)
+        self._end_write(offset, seq)
+
+    def publish_trade(self, slot: int, price: float, event_time: int, recv_time: int) -> None:
+        """Stores the last trade price of a slot."""
+        offset = self._offset(slot)
+        seq = self._begin_write(offset)
+        TRADE.pack_into(self.buf, offset + LAST_PRICE_OFFSET, price, event_time, recv_time, recv_time)
+        self._end_write(offset, seq)
+
+    def publish_quote(self, slot: int, bid: float, ask: float, event_time: int, recv_time: int) -> None:
+        """Stores the best bid and ask of a slot."""
+        offset = self._offset(slot)
+        seq = self._begin_write(offset)
+        QUOTE.pack_into(self.buf, offset + QUOTE_OFFSET, bid, ask)
+        TIMES.pack_into(self.buf, offset + EVENT_TIME_OFFSET, event_time, recv_time)
+        self._end_write(offset, seq)
+
+    def mark_notify_pending(self) -> bool:
+        """Flags that the UI has unread updates. Returns True if it was not flagged yet,
+        i.e. the caller has to send a wake-up; while the flag is set bursts cost nothing.
+        """
+        if NOTIFY.unpack_from(self.buf, NOTIFY_OFFSET)[0]:
+            return False
+        NOTIFY.pack_into(self.buf, NOTIFY_OFFSET, 1)
+        return True
+
+    def write_metrics(self, metrics: StreamMetrics) -> None:
+        """Publishes the connection health of the stream worker."""
+        METRICS.pack_into(self.buf, METRICS_OFFSET, *metrics)
+
+    # Reader side (any process)
+
+    def read_metrics(self) -> StreamMetrics:
+        """Returns the connection health of the stream worker (fields may be one update apart)."""
+        connected, *values = METRICS.unpack_from(self.buf, METRICS_OFFSET)
+        return StreamMetrics(bool(connected), *values)
+
+    def clear_notify_pending(self) -> None:
+        """Re-arms wake-ups. Must be called after draining the wake-up channel, so no update is missed."""
+        NOTIFY.pack_into(self.buf, NOTIFY_OFFSET, 0)
+
+    def read_slot(self, slot: int) -> MarketSnapshot | None:
+        """Returns a consistent snapshot of a slot, retrying while a write is in progress.
+
+        Returns None if no consistent snapshot could be read within READ_RETRIES attempts,
+        e.g. because the stream worker died while writing the slot.
+        """
+        offset = self._offset(slot)
+        buf = self.buf
+        for _ in range(READ_RETRIES):
+            seq_before = SEQ.unpack_from(buf, offset)[0]
+            if seq_before & 1:
+                continue
+            values = SLOT.unpack_from(buf, offset)
+            if SEQ.unpack_from(buf, offset)[0] == seq_before:
+                _, symbol, bid, ask, last_price, event_time, recv_time, trade_recv_time = values
+                return MarketSnapshot(
+                    symbol.rstrip(b"\0").decode(), last_price, bid, ask,
+                    event_time, recv_time, trade_recv_time, seq_before
+                )
+        return None
+
+    def find_slot(self, symbol: str) -> int | None:
+        """Returns the slot currently holding `symbol`, or None."""
+        symbol = symbol.upper()
+        for slot in range(self.slot_count):
+            snapshot = self.read_slot(slot)
+            if snapshot is not None and snapshot.symbol == symbol:
+                self._slot_cache[symbol] = slot
+                return slot
+        self._slot_cache.pop(symbol, None)
+        return None
+
+    def read(self, symbol: str) -> MarketSnapshot | None:
+        """Returns the latest snapshot of `symbol`, or None if it is not in the table or cannot be read."""
+        symbol = symbol.upper()
+        slot = self._slot_cache.get(symbol)
+        if slot is not None:
+            snapshot = self.read_slot(slot)
+            # The cached slot is only trusted while it still holds the symbol
+            if snapshot is not None and snapshot.symbol == symbol:
+                return snapshot
+
+        slot = self.find_slot(symbol)
+        if slot is None:
+            return None
+        snapshot = self.read_slot(slot)
+        # The slot may have been reassigned between lookup and read
+        return snapshot if snapshot is not None and snapshot.symbol == symbol else None
+
+    def close(self) -> None:
+        """Detaches from the table; the creating process also frees the memory."""
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,278 @@
+import asyncio
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import NamedTuple
+
+import websockets
+
+from core.event_loop import AsyncLoopThread
+from core.websockets_listener import reconnect_delay
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+#  Local L2 order book of the active symbol, kept in sync with the diff-depth stream.
+#  Sync procedure (Binance futures): buffer the stream, download a REST snapshot, drop events
+#  older than the snapshot, then apply events whose `pu` equals the previous `u`. Any gap
+#  triggers a new snapshot while the stream keeps being buffered.
+
+FUTURES_DEPTH_STREAM_URL = "wss://fstream.binance.com/ws/{stream}"
+DEPTH_STREAM_SPEED = "100ms"  # fastest diff-depth update speed on futures
+DEPTH_LIMIT = 1000  # levels per side in the REST snapshot
+MAX_LEVELS = 1000  # levels kept per side; far levels from the diff stream are trimmed
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+
+def depth_stream(symbol: str) -> str:
+    """Returns the name of the diff-depth stream of a symbol, e.g. 'btcusdt@depth@100ms'."""
+    return f"{symbol.lower()}@depth@{DEPTH_STREAM_SPEED}"
+
+
+class FillEstimate(NamedTuple):
+    """Expected execution of a market order walking the book."""
+    vwap: float
+    quantity: float
+    worst_price: float  # price of the deepest level reached
+    slippage_bps: float  # VWAP distance from the best price, in basis points (positive = worse)
+    filled_usd: float  # below the requested amount if the book is not deep enough
+
+
+class BookSide:
+    """Price levels of one side in sorted parallel arrays.
+
+    Keys are stored ascending with the best level last: bid keys are prices, ask keys
+    are negated prices. Most updates touch levels near the top, so inserts and deletes
+    only move the short tail of the arrays.
+    """
+
+    __slots__ = ("sign", "keys", "quantities")
+
+    def __init__(self, is_bid: bool):
+        self.sign = 1.0 if is_bid else -1.0
+        self.keys = []
+        self.quantities = []
+
+    def load(self, levels) -> None:
+        """Replaces all levels with [price, quantity] string pairs from a snapshot."""
+        sign = self.sign
+        pairs = sorted((sign * float(price), float(quantity)) for price, quantity in levels)
+        self.keys = [key for key, _ in pairs]
+        self.quantities = [quantity for _, quantity in pairs]
+
+    def update(self, levels) -> None:
+        """Applies [price, quantity] string pairs; a zero quantity removes the level."""
+        keys = self.keys
+        quantities = self.quantities
+        sign = self.sign
+        for price, quantity in levels:
+            key = sign * float(price)
+            quantity = float(quantity)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                if quantity:
+                    quantities[i] = quantity
+                else:
+                    del keys[i]
+                    del quantities[i]
+            elif quantity:
+                keys.insert(i, key)
+                quantities.insert(i, quantity)
+
+        excess = len(keys) - MAX_LEVELS
+        if excess > 0:
+            del keys[:excess]
+            del quantities[:excess]
+
+    def best(self) -> float | None:
+        return self.sign * self.keys[-1] if self.keys else None
+
+    def walk(self, amount_usd: float) -> FillEstimate | None:
+        """Consumes levels from the top until `amount_usd` is spent."""
+        keys = self.keys
+        if not keys or amount_usd <= 0:
+            return None
+        quantities = self.quantities
+        sign = self.sign
+
+        remaining = amount_usd
+        quantity = 0.0
+        price = best = sign * keys[-1]
+        for i in range(len(keys) - 1, -1, -1):
+            price = sign * keys[i]
+            level_usd = price * quantities[i]
+            if level_usd >= remaining:
+                quantity += remaining / price
+                remaining = 0.0
+                break
+            quantity += quantities[i]
+            remaining -= level_usd
+
+        filled_usd = amount_usd - remaining
+        vwap = filled_usd / quantity
+        # Buying above the best ask or selling below the best bid is a cost
+        slippage_bps = (best - vwap) / best * 1e4 * sign
+        return FillEstimate(vwap, quantity, price, slippage_bps, filled_usd)
+
+
+class OrderBook:
+    """Local L2 book of one symbol. Written by the feed loop thread, read by the GUI thread."""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol.upper()
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id = 0
+        self.synced = False
+        self.updated_at = 0  # time.monotonic_ns() of the last applied update
+        self.resyncs = 0
+        self._lock = threading.Lock()
+
+    def load_snapshot(self, snapshot: dict) -> None:
+        """Loads a REST depth snapshot; the book is synced by the next matching diff event."""
+        with self._lock:
+            self.bids.load(snapshot["bids"])
+            self.asks.load(snapshot["asks"])
+            self.last_update_id = snapshot["lastUpdateId"]
+            self.synced = False
+
+    def apply_diff(self, event: dict) -> bool:
+        """Applies a diff-depth event. Returns False if a gap was detected and a new snapshot is needed."""
+        last_update_id = self.last_update_id
+        if event["u"] < last_update_id:
+            # Already contained in the snapshot
+            return True
+        if self.synced:
+            if event["pu"] != last_update_id:
+                return self._lose_sync()
+        elif event["U"] > last_update_id:
+            # The snapshot is older than the buffered stream
+            return self._lose_sync()
+
+        with self._lock:
+            self.bids.update(event["b"])
+            self.asks.update(event["a"])
+            self.last_update_id = event["u"]
+            self.synced = True
+            self.updated_at = time.monotonic_ns()
+        return True
+
+    def _lose_sync(self) -> bool:
+        with self._lock:
+            self.synced = False
+            self.resyncs += 1
+        return False
+
+    def is_fresh(self, max_age_ms: float | None = None) -> bool:
+        """True if the book is synced and, with a limit, was updated recently enough."""
+        if not self.synced:
+            return False
+        return max_age_ms is None or (time.monotonic_ns() - self.updated_at) / 1e6 <= max_age_ms
+
+    def best_bid_ask(self) -> tuple[float | None, float | None]:
+        with self._lock:
+            return self.bids.best(), self.asks.best()
+
+    def estimate_fill(self, side: str, amount_usd: float) -> FillEstimate | None:
+        """Expected VWAP and slippage of a market order of `amount_usd` on `side` (BUY or SELL)."""
+        with self._lock:
+            book_side = self.asks if side == "BUY" else self.bids
+            return book_side.walk(amount_usd)
+
+
+class OrderBookFeed:
+    """Keeps the `OrderBook` of the active symbol in sync on its own event-loop thread.
+
+    REST snapshots are downloaded with the python-binance `Client` in a worker thread,
+    while the diff-depth stream keeps being buffered.
+    """
+
+    def __init__(self, url: str = FUTURES_DEPTH_STREAM_URL):
+        self.url = url
+        self.book = None
+        self.loop_thread = AsyncLoopThread(name="hermes-order-book")
+        self.loop_thread.start()
+        self._future = None
+
+    def track(self, client, symbol: str) -> None:
+        """Starts maintaining the book of `symbol`, replacing the previous one."""
+        self.stop_tracking()
+        self.book = OrderBook(symbol)
+        self._future = self.loop_thread.submit(self._run(client, self.book))
+
+    def stop_tracking(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self.book = None
+
+    def estimate_fill(
+            self,
+            symbol: str,
+            side: str,
+            amount_usd: float,
+            max_age_ms: float | None = None
+    ) -> FillEstimate | None:
+        """Walks the local book of `symbol`, or returns None if it is not tracked or not in sync."""
+        book = self.book
+        if book is None or book.symbol != symbol.upper() or not book.is_fresh(max_age_ms):
+            return None
+        return book.estimate_fill(side, amount_usd)
+
+    def stop(self) -> None:
+        self.stop_tracking()
+        self.loop_thread.stop()
+
+    async def _run(self, client, book: OrderBook) -> None:
+        url = self.url.format(stream=depth_stream(book.symbol))
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(url) as ws:
+                    print(f"Order book stream connected for {book.symbol}")
+                    attempt = 0
+                    await self._sync(ws, client, book)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Order book stream error: {e}")
+            book.synced = False
+            await asyncio.sleep(reconnect_delay(attempt))
+            attempt += 1
+
+    async def _sync(self, ws, client, book: OrderBook) -> None:
+        events = asyncio.Queue()
+
+        async def read_stream() -> None:
+            try:
+                async for message in ws:
+                    events.put_nowait(loads(message))
+            finally:
+                # Wakes the applier up when the connection ends
+                events.put_nowait(None)
+
+        reader = asyncio.create_task(read_stream())
+        try:
+            while True:
+                # The stream is buffered by the reader while the snapshot downloads
+                snapshot = await asyncio.to_thread(
+                    client.futures_order_book, symbol=book.symbol, limit=DEPTH_LIMIT
+                )
+                book.load_snapshot(snapshot)
+
+                while True:
+                    event = await events.get()
+                    if event is None:
+                        # Raises the connection error, if any, so the caller reconnects
+                        await reader
+                        return
+                    if not book.apply_diff(event):
+                        print(f"Order book of {book.symbol} out of sync, reloading snapshot")
+                        break
+        finally:
+            reader.cancel()
@@ -0,0 +1,182 @@
+import time
+
+from PyQt5 import QtCore
+
+from core.event_loop import AsyncLoopThread
+from core.ws_api_client import (
+    WsApiSession,
+    ORDER_TRANSPORT_REST,
+    ORDER_TRANSPORT_WS,
+    FUTURES_WS_API_URL
+)
+from core.place_order_async import (
+    place_market_order_async,
+    close_positions_async,
+    close_live_positions_async
+)
+
+#  python-binance and aiohttp are imported when the session is opened, on the engine thread,
+#  so that importing this module does not load them before the window is shown.
+
+# Idle seconds before aiohttp closes a pooled connection (15 s by default), kept above the
+# interval of the connection warmup so the order session stays warm between orders
+KEEPALIVE_TIMEOUT = 300.0
+
+
+
+class OrderEngineSignals(QtCore.QObject):
+    """Qt signals used to deliver order results back to the GUI thread."""
+    order_placed = QtCore.pyqtSignal(str, int)  # symbol, order ID
+    order_failed = QtCore.pyqtSignal(str, str)  # symbol, side
+    position_closed = QtCore.pyqtSignal(str, int)  # symbol, order ID
+    ready_changed = QtCore.pyqtSignal(bool)
+
+
+class OrderEngine:
+    """Asynchronous order execution engine.
+
+    Owns a single `AsyncClient` (one persistent HTTP session) living on a dedicated
+    event-loop thread. The GUI submits order intents without blocking and receives
+    results through Qt signals, which are delivered in the GUI thread.
+    """
+
+    def __init__(self, fill_tracker=None, clock=None, limiter=None):
+        self.fill_tracker = fill_tracker
+        self.clock = clock  # core/clock_sync.ClockSync applied to every session
+        self.limiter = limiter  # core/rate_limiter.RateLimiter applied to every request
+        self.signals = OrderEngineSignals()
+        self.loop_thread = AsyncLoopThread(name="hermes-order-engine")
+        self.loop_thread.start()
+        self.client = None
+
+    @property
+    def is_ready(self) -> bool:
+        """True once the async client session is open."""
+        return self.client is not None
+
+    def connect(
+            self,
+            api_key: str,
+            api_secret: str,
+            transport: str = ORDER_TRANSPORT_REST,
+            ws_api_url: str = FUTURES_WS_API_URL
+    ) -> None:
+        """Opens the client session in the background, replacing any previous one.
+
+        With the "ws" transport orders go through one WebSocket API session instead of REST.
+        """
+        self.loop_thread.submit(self._connect(api_key, api_secret, transport, ws_api_url))
+
+    async def _connect(self, api_key: str, api_secret: str, transport: str, ws_api_url: str) -> None:
+        await self._close_client()
+        try:
+            if transport == ORDER_TRANSPORT_WS:
+                client = WsApiSession(api_key, api_secret, ws_api_url, self.limiter)
+                await client.connect()
+            else:
+                import aiohttp
+                from binance.async_client import AsyncClient
+
+                session_params = {"connector": aiohttp.TCPConnector(keepalive_timeout=KEEPALIVE_TIMEOUT)}
+                if self.limiter is not None:
+                    session_params["trace_configs"] = [self.limiter.trace_config()]
+                # The constructor instead of `AsyncClient.create`, which pings the spot API and reads
+                # its time; the futures host is warmed and the clock offset is set by ClockSync
+                client = AsyncClient(api_key, api_secret, session_params=session_params)
+            if self.clock is not None:
+                self.clock.attach(client)
+            self.client = client
+            print(f"Order engine connected ({transport})")
+        except Exception as e:
+            self.client = None
+            print(f"Order engine connection error: {e}")
+        self.signals.ready_changed.emit(self.is_ready)
+
+    async def _close_client(self) -> None:
+        if self.client is not None:
+            client, self.client = self.client, None
+            await client.close_connection()
+
+    def submit_market_order(self, symbol: str, side: str, **order_params) -> None:
+        """Submits a market order intent; the result arrives via `order_placed`/`order_failed`."""
+        future = self.loop_thread.submit(place_market_order_async(
+            client=self.client,
+            symbol=symbol,
+            side=side,
+            fill_tracker=self.fill_tracker,
+            **order_params
+        ))
+
+        def on_done(done_future) -> None:
+            try:
+                order_id = done_future.result()
+            except Exception as e:
+                print(f"Order engine error: {e}")
+                order_id = None
+
+            if order_id:
+                self.signals.order_placed.emit(symbol, order_id)
+            else:
+                self.signals.order_failed.emit(symbol, side)
+
+        future.add_done_callback(on_done)
+
+    def submit_close_live_positions(self, rest_client, symbol: str | None = None) -> None:
+        """Closes the positions at the size positionRisk reports now, of `symbol` or all.
+
+        For when the position book may be stale; every close arrives via `position_closed`.
+        """
+        future = self.loop_thread.submit(close_live_positions_async(self.client, rest_client, symbol))
+
+        def on_done(done_future) -> None:
+            try:
+                closes = done_future.result()
+            except Exception as e:
+                print(f"Order engine error: {e}")
+                closes = []
+            for position_symbol, order_id in closes:
+                self.signals.position_closed.emit(position_symbol, order_id or 0)
+
+        future.add_done_callback(on_done)
+
+    def submit_close_positions(self, positions: list[tuple[str, float]]) -> None:
+        """Closes positions of known size (symbol, signed amount) concurrently, one request each.
+
+        Every close arrives via `position_closed`, with order ID 0 if it failed.
+        """
+        future = self.loop_thread.submit(close_positions_async(self.client, positions))
+
+        def on_done(done_future) -> None:
+            try:
+                order_ids = done_future.result()
+            except Exception as e:
+                print(f"Order engine error: {e}")
+                order_ids = [None] * len(positions)
+            for (symbol, _), order_id in zip(positions, order_ids):
+                self.signals.position_closed.emit(symbol, order_id or 0)
+
+        future.add_done_callback(on_done)
+
+    async def _ping(self) -> float | None:
+        client = self.client
+        if client is None or isinstance(client, WsApiSession):
+            return None
+        start = time.perf_counter()
+        await client.futures_ping()
+        return (time.perf_counter() - start) * 1000
+
+    def ping(self, timeout: float) -> float | None:
+        """Pings the futures host over the REST session; returns the RTT in ms, or None without one."""
+        try:
+            return self.loop_thread.submit(self._ping()).result(timeout=timeout)
+        except Exception as e:
+            print(f"Order engine ping error: {e}")
+            return None
+
+    def stop(self) -> None:
+        """Closes the HTTP session and stops the event-loop thread."""
+        try:
+            self.loop_thread.submit(self._close_client()).result(timeout=2)
+        except Exception as e:
+            print(f"Order engine shutdown error: {e}")
+        self.loop_thread.stop()
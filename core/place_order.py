@@ -1,26 +1,102 @@
 import time
-from binance.enums import ORDER_TYPE_MARKET, TIME_IN_FORCE_GTC
 from decimal import Decimal, ROUND_DOWN, getcontext
 
+from core.latency import STAGE_ACK, STAGE_FILL, STAGE_QUANTITY, STAGE_SENT, STAGE_SL_ACK, STAGE_TP_ACK
+
 #  IMPORTANT: Using simple functions instead of a class
 #  Reason: Performance testing showed that calling class methods is ~7% slower than calling regular functions.
 #  If maximum speed for order execution is required, using simple functions is preferable.
 #  If code structure becomes more important in the future, switching to a class is possible, but at the cost of some performance.
 
+# Execution modes of `place_market_order`
+# "sequential": create, wait for the fill, then SL and TP one after another (4+ round-trips)
+# "result_batch": create with a RESULT response, then SL and TP in one batch (2 round-trips)
+EXECUTION_MODE_SEQUENTIAL = "sequential"
+EXECUTION_MODE_RESULT_BATCH = "result_batch"
+
+FILL_TIMEOUT = 60  # seconds
+# Delay between REST status polls when no user data stream is available
+POLL_INTERVAL = 0.01  # seconds
+# Delay between REST status polls used only as a safety net next to the user data stream
+FALLBACK_POLL_INTERVAL = 0.5  # seconds
+
+# Staleness guard: a streamed price older than MAX_PRICE_AGE_MS is not used to size an order.
+# "refuse": the order is not placed; "reprice": the price is fetched over REST first.
+MAX_PRICE_AGE_MS = 2000
+STALE_PRICE_REFUSE = "refuse"
+STALE_PRICE_REPRICE = "reprice"
+
+# Same values as binance.enums, which cannot be imported without loading the whole binance
+# package (async client, aiohttp, dateparser) before the window is shown
+ORDER_TYPE_MARKET = "MARKET"
+TIME_IN_FORCE_GTC = "GTC"
+
+# Protective orders of an entry, as followed by core/protective_orders.py
+LEG_STOP_LOSS = "sl"
+LEG_TAKE_PROFIT = "tp"
+PROTECTIVE_ORDER_NAMES = {LEG_STOP_LOSS: "Stop-loss", LEG_TAKE_PROFIT: "Take-profit"}
+
+
+
+def format_decimal(value: float) -> str:
+    """Fixed-point form of a quantity or price; str() of a small float would be in scientific notation."""
+    return f"{value:.8f}".rstrip("0").rstrip(".") or "0"
+
 
+def is_price_stale(price_age_ms: float | None, max_price_age_ms: float | None) -> bool:
+    """True if the age of the streamed price is known and above the limit."""
+    return price_age_ms is not None and max_price_age_ms is not None and price_age_ms > max_price_age_ms
+
+
+def fresh_price(
+        client,
+        symbol: str,
+        price: float,
+        price_age_ms: float | None = None,
+        max_price_age_ms: float | None = MAX_PRICE_AGE_MS,
+        stale_price_action: str = STALE_PRICE_REPRICE
+) -> float | None:
+    """Returns a price recent enough to size an order, or None if the order must be refused.
+
+    Args:
+        price (float): Last streamed price.
+        price_age_ms (float | None): Age of that price; None when unknown (no guard).
+        max_price_age_ms (float | None): Maximum accepted age; None disables the guard.
+        stale_price_action (str): "refuse" or "reprice" when the price is too old.
+    """
+    if not is_price_stale(price_age_ms, max_price_age_ms):
+        return price
+
+    print(f"Price of {symbol} is {price_age_ms:.0f} ms old (limit {max_price_age_ms} ms)")
+    if stale_price_action == STALE_PRICE_REFUSE:
+        print("Order refused: stale price")
+        return None
+
+    try:
+        return float(client.futures_symbol_ticker(symbol=symbol)["price"])
+    except Exception as e:
+        print(f"Unable to re-price {symbol}, order refused: {e}")
+        return None
 
 
 def calculate_quantity_from_price(
     amount_usd: float,
     price: float,
     precision: int | None,
-    use_decimal: bool = False
-) -> float | None:
+    use_decimal: bool = False,
+    quantizer=None
+) -> float | str | None:
     """
     Calculates the number of coins
     based on a given USD amount and precision.
+
+    With a symbol quantizer (core/quantizer.py) the quantity is computed exactly
+    in scaled integers, checked against the exchange filters and returned as a string.
     """
 
+    if quantizer is not None:
+        return quantizer.quantity_for_usd(amount_usd, price)
+
     if price <= 0:
         print("Invalid price.")
         return None
@@ -61,10 +137,23 @@ def get_executed_price(client, symbol: str, order_id: int) -> float | None:
         return None
 
 
-def market_order(client, symbol: str, side: str, quantity: float | int):
-    """Places a market order and waits for its execution."""
+def market_order(
+        client,
+        symbol: str,
+        side: str,
+        quantity: float | int,
+        fill_tracker=None,
+        latency_trace=None
+):
+    """Places a market order and waits for its execution.
+
+    If a fill tracker fed by the user data stream is given, the fill is confirmed
+    by the ORDER_TRADE_UPDATE event and REST polling is kept only as a slow fallback.
+    """
     # Attempt to create a market order
     try:
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_SENT)
         order = client.futures_create_order(
             symbol=symbol,
             side=side,  # "BUY" or "SELL"
@@ -78,23 +167,25 @@ def market_order(client, symbol: str, side: str, quantity: float | int):
 
     # Retrieve order ID for tracking
     order_id = order['orderId']
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_ACK)
+        latency_trace.set_order_id(order_id)
 
     # Wait for the order to be fully executed
-    executed_price = None
-    start_time = time.time()
-    timeout = 60  # seconds
-
-    while executed_price is None and time.time() - start_time < timeout:
-        executed_price = get_executed_price(
+    if fill_tracker is not None:
+        executed_price = wait_for_fill_event(
+            client=client,
+            symbol=symbol,
+            order_id=order_id,
+            fill_tracker=fill_tracker
+        )
+    else:
+        executed_price = poll_executed_price(
             client=client,
             symbol=symbol,
             order_id=order_id
         )
 
-        # Retry if not yet filled
-        if executed_price is None:
-            time.sleep(0.01)
-
     # Cancel the order and close any filled portions to ensure a clean exit
     if executed_price is None:
         rescue_order_after_timeout(
@@ -104,19 +195,65 @@ def market_order(client, symbol: str, side: str, quantity: float | int):
         )
         return None, order_id
 
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_FILL)
     return executed_price, order_id
 
 
-def stop_loss_order(
-        client,
+def poll_executed_price(client, symbol: str, order_id: int) -> float | None:
+    """Polls the order status via REST until it is filled or the timeout expires."""
+    executed_price = None
+    start_time = time.time()
+
+    while executed_price is None and time.time() - start_time < FILL_TIMEOUT:
+        executed_price = get_executed_price(
+            client=client,
+            symbol=symbol,
+            order_id=order_id
+        )
+
+        # Retry if not yet filled
+        if executed_price is None:
+            time.sleep(POLL_INTERVAL)
+
+    return executed_price
+
+
+def wait_for_fill_event(client, symbol: str, order_id: int, fill_tracker) -> float | None:
+    """Waits for the fill event from the user data stream with a slow REST fallback."""
+
+    def poll() -> float | None:
+        try:
+            return get_executed_price(client=client, symbol=symbol, order_id=order_id)
+        except Exception as e:
+            print(f"Error polling order status: {e}")
+            return None
+
+    # Without a live stream there is nothing to wait for, so poll at full speed
+    poll_interval = (
+        FALLBACK_POLL_INTERVAL if fill_tracker.is_streaming else POLL_INTERVAL
+    )
+
+    return fill_tracker.wait_for_fill(
+        order_id=order_id,
+        timeout=FILL_TIMEOUT,
+        poll=poll,
+        poll_interval=poll_interval
+    )
+
+
+def build_stop_loss_params(
         symbol: str,
         side: str,
         executed_price: float,
         st_percentage: float,
-        quantity: float,
-        price_precision: int
-) -> None:
-    """Places a stop-loss order based on the executed price."""
+        quantity: float | str,
+        price_precision: int,
+        quantizer=None
+) -> dict | None:
+    """Builds the parameters of a stop-loss order based on the executed price.
+    Returns None if the quantizer rejects the stop price.
+    """
 
     # Calculate stop-loss price based on the executed price and percentage
     stop_loss_percentage = st_percentage / 100
@@ -126,32 +263,37 @@ def stop_loss_order(
         else executed_price * (1 + stop_loss_percentage)
     )
 
-    try:
-        # Place stop-loss order
-        client.futures_create_order(
-            symbol=symbol,
-            side="SELL" if side == "BUY" else "BUY",
-            type="STOP_MARKET",
-            stopPrice=round(stop_price, price_precision),
-            quantity=quantity,
-            timeInForce=TIME_IN_FORCE_GTC,
-            reduceOnly=True
-        )
+    stop_price = (
+        quantizer.format_price(stop_price)
+        if quantizer is not None
+        else round(stop_price, price_precision)
+    )
+    if stop_price is None:
+        return None
 
-    except Exception:
-        pass
+    return {
+        "symbol": symbol,
+        "side": "SELL" if side == "BUY" else "BUY",
+        "type": "STOP_MARKET",
+        "stopPrice": stop_price,
+        "quantity": quantity,
+        "timeInForce": TIME_IN_FORCE_GTC,
+        "reduceOnly": True,
+    }
 
 
-def take_profit_order(
-        client,
+def build_take_profit_params(
         symbol: str,
         side: str,
         executed_price: float,
         tp_percentage: float,
-        quantity: float,
-        price_precision: int
-) -> None:
-    """Places a take-profit order based on the executed price."""
+        quantity: float | str,
+        price_precision: int,
+        quantizer=None
+) -> dict | None:
+    """Builds the parameters of a take-profit limit order based on the executed price.
+    Returns None if the quantizer rejects the limit price.
+    """
 
     # Calculate take_profit price based on the executed price and percentage
     take_profit_percentage = tp_percentage / 100
@@ -161,20 +303,306 @@ def take_profit_order(
         else executed_price * (1 - take_profit_percentage)
     )
 
+    take_profit_price = (
+        quantizer.format_price(take_profit_price)
+        if quantizer is not None
+        else round(take_profit_price, price_precision)
+    )
+    if take_profit_price is None:
+        return None
+
+    return {
+        "symbol": symbol,
+        "side": "SELL" if side == "BUY" else "BUY",
+        "type": "LIMIT",
+        "price": take_profit_price,
+        "quantity": quantity,
+        "timeInForce": TIME_IN_FORCE_GTC,
+        "reduceOnly": True,
+    }
+
+
+def stop_loss_order(
+        client,
+        symbol: str,
+        side: str,
+        executed_price: float,
+        st_percentage: float,
+        quantity: float | str,
+        price_precision: int,
+        quantizer=None,
+        latency_trace=None,
+        params: dict | None = None,
+        order_id: int | None = None,
+        protection=None
+) -> None:
+    """Places a stop-loss order based on the executed price.
+
+    `params` are used as they are if given (already tagged by the protective order manager).
+    The outcome is reported to `protection` for the entry `order_id`, so a failure is retried.
+    """
+
+    if params is None:
+        params = build_stop_loss_params(
+            symbol=symbol,
+            side=side,
+            executed_price=executed_price,
+            st_percentage=st_percentage,
+            quantity=quantity,
+            price_precision=price_precision,
+            quantizer=quantizer
+        )
+    if params is None:
+        return
+
+    try:
+        # Place stop-loss order
+        response = client.futures_create_order(**params)
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_SL_ACK)
+    except Exception as e:
+        report_protective_order(protection, order_id, LEG_STOP_LOSS, error=e)
+        return
+    report_protective_order(protection, order_id, LEG_STOP_LOSS, response=response)
+
+
+def take_profit_order(
+        client,
+        symbol: str,
+        side: str,
+        executed_price: float,
+        tp_percentage: float,
+        quantity: float | str,
+        price_precision: int,
+        quantizer=None,
+        latency_trace=None,
+        params: dict | None = None,
+        order_id: int | None = None,
+        protection=None
+) -> None:
+    """Places a take-profit order based on the executed price.
+
+    `params` are used as they are if given (already tagged by the protective order manager).
+    The outcome is reported to `protection` for the entry `order_id`, so a failure is retried.
+    """
+
+    if params is None:
+        params = build_take_profit_params(
+            symbol=symbol,
+            side=side,
+            executed_price=executed_price,
+            tp_percentage=tp_percentage,
+            quantity=quantity,
+            price_precision=price_precision,
+            quantizer=quantizer
+        )
+    if params is None:
+        return
+
     try:
         # Create a limit order to take profit
-        client.futures_create_order(
+        response = client.futures_create_order(**params)
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_TP_ACK)
+    except Exception as e:
+        report_protective_order(protection, order_id, LEG_TAKE_PROFIT, error=e)
+        return
+    report_protective_order(protection, order_id, LEG_TAKE_PROFIT, response=response)
+
+
+def report_protective_order(protection, order_id: int | None, leg: str, response=None, error=None) -> None:
+    """Hands the outcome of a stop-loss or take-profit to the protective order manager.
+
+    Without a manager, a failure is only printed.
+
+    Args:
+        protection: `ProtectiveOrderManager` following the entry, or None.
+        order_id: Order ID of the entry.
+        leg: LEG_STOP_LOSS or LEG_TAKE_PROFIT.
+        response: Response of the accepted order.
+        error: Exception, or the entry of a batch response with an error code.
+    """
+    if protection is None or order_id is None:
+        if error is not None:
+            message = error.get("msg") if isinstance(error, dict) else error
+            print(f"{PROTECTIVE_ORDER_NAMES[leg]} order error: {message}")
+        return
+    if error is not None:
+        protection.failed(order_id, leg, error)
+    else:
+        protection.placed(order_id, leg, response["orderId"])
+
+
+def build_protective_params(
+        symbol: str,
+        side: str,
+        executed_price: float,
+        st_percentage: float,
+        tp_percentage: float,
+        quantity: float | str,
+        price_precision: int,
+        quantizer=None,
+        order_id: int | None = None,
+        protection=None
+) -> list[tuple[str, int, dict]]:
+    """(leg, latency stage, parameters) of the stop-loss and take-profit of an entry.
+
+    Orders rejected locally by the quantizer are left out. With a protective order manager,
+    the entry is registered first and the parameters carry the client order IDs it follows.
+    """
+    stop_loss_params = build_stop_loss_params(
+        symbol=symbol,
+        side=side,
+        executed_price=executed_price,
+        st_percentage=st_percentage,
+        quantity=quantity,
+        price_precision=price_precision,
+        quantizer=quantizer
+    )
+    take_profit_params = build_take_profit_params(
+        symbol=symbol,
+        side=side,
+        executed_price=executed_price,
+        tp_percentage=tp_percentage,
+        quantity=quantity,
+        price_precision=price_precision,
+        quantizer=quantizer
+    )
+    if protection is not None and order_id is not None:
+        stop_loss_params, take_profit_params = protection.track(
+            symbol, order_id, stop_loss_params, take_profit_params
+        )
+    return [
+        (leg, stage, params)
+        for leg, stage, params in (
+            (LEG_STOP_LOSS, STAGE_SL_ACK, stop_loss_params),
+            (LEG_TAKE_PROFIT, STAGE_TP_ACK, take_profit_params),
+        )
+        if params is not None
+    ]
+
+
+def to_batch_order(params: dict) -> dict:
+    """Converts order parameters to the string form expected by `batchOrders`."""
+    return {
+        key: (
+            ("true" if value else "false") if isinstance(value, bool)
+            else format_decimal(value) if isinstance(value, float)
+            else str(value)
+        )
+        for key, value in params.items()
+    }
+
+
+def market_order_result(
+        client,
+        symbol: str,
+        side: str,
+        quantity: float | int,
+        fill_tracker=None,
+        latency_trace=None
+):
+    """
+    Places a market order asking for the RESULT response,
+    which already carries the final status and `avgPrice` of a filled market order.
+    Waits for the fill only if the order was not filled by the time of the response.
+    """
+    start = time.perf_counter()
+    try:
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_SENT)
+        order = client.futures_create_order(
             symbol=symbol,
-            side="SELL" if side == "BUY" else "BUY",
-            type="LIMIT",
-            price=round(take_profit_price, price_precision),
+            side=side,  # "BUY" or "SELL"
+            type=ORDER_TYPE_MARKET,
             quantity=quantity,
-            timeInForce=TIME_IN_FORCE_GTC,
-            reduceOnly=True
+            newOrderRespType="RESULT"
         )
+    except Exception as e:
+        print(f"Error placing order: {e}")
+        return None, None
+    print(f"[timing] create order (RESULT): {(time.perf_counter() - start) * 1000:.1f} ms")
 
-    except Exception:
-        pass
+    order_id = order['orderId']
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_ACK)
+        latency_trace.set_order_id(order_id)
+    if order.get('status') == 'FILLED':
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_FILL)
+        return float(order['avgPrice']), order_id
+
+    # Rare case: the matching engine did not finish before responding
+    start = time.perf_counter()
+    if fill_tracker is not None:
+        executed_price = wait_for_fill_event(client, symbol, order_id, fill_tracker)
+    else:
+        executed_price = poll_executed_price(client, symbol, order_id)
+    print(f"[timing] wait for fill: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if executed_price is None:
+        rescue_order_after_timeout(
+            client=client,
+            symbol=symbol,
+            order_id=order_id
+        )
+        return None, order_id
+
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_FILL)
+    return executed_price, order_id
+
+
+def protective_orders_batch(
+        client,
+        symbol: str,
+        side: str,
+        executed_price: float,
+        st_percentage: float,
+        tp_percentage: float,
+        quantity: float | str,
+        price_precision: int,
+        quantizer=None,
+        latency_trace=None,
+        order_id: int | None = None,
+        protection=None
+) -> None:
+    """Places stop-loss and take-profit together in a single batch request."""
+
+    orders = build_protective_params(
+        symbol=symbol,
+        side=side,
+        executed_price=executed_price,
+        st_percentage=st_percentage,
+        tp_percentage=tp_percentage,
+        quantity=quantity,
+        price_precision=price_precision,
+        quantizer=quantizer,
+        order_id=order_id,
+        protection=protection
+    )
+    if not orders:
+        return
+    batch = [to_batch_order(params) for _, _, params in orders]
+
+    start = time.perf_counter()
+    try:
+        results = client.futures_place_batch_order(batchOrders=batch)
+    except Exception as e:
+        print(f"Error placing SL/TP batch: {e}")
+        for leg, _, _ in orders:
+            report_protective_order(protection, order_id, leg, error=e)
+        return
+    print(f"[timing] SL/TP batch: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # The batch endpoint reports errors per order instead of failing the request
+    for (leg, stage, _), result in zip(orders, results):
+        if "code" in result:
+            report_protective_order(protection, order_id, leg, error=result)
+            continue
+        if latency_trace is not None:
+            latency_trace.mark(stage)
+        report_protective_order(protection, order_id, leg, response=result)
 
 
 def place_market_order(
@@ -187,44 +615,133 @@ def place_market_order(
         st_percentage: float,
         tp_percentage: float,
         price: float,
-        use_decimal: bool
+        use_decimal: bool,
+        fill_tracker=None,
+        execution_mode: str = EXECUTION_MODE_SEQUENTIAL,
+        quantizer=None,
+        price_age_ms: float | None = None,
+        max_price_age_ms: float | None = MAX_PRICE_AGE_MS,
+        stale_price_action: str = STALE_PRICE_REPRICE,
+        latency_trace=None,
+        protection=None
 ) -> int | None:
-    """Places a market order and sets stop-loss and take-profit levels."""
+    """Places a market order and sets stop-loss and take-profit levels.
+
+    If a symbol quantizer is given, quantity and prices are quantized exactly
+    and orders the exchange would refuse are rejected before any network call.
+    A price older than `max_price_age_ms` is refused or re-fetched (see `fresh_price`).
+    `latency_trace` (core/latency.py), if given, records the time of every stage.
+    `protection` (core/protective_orders.py), if given, keeps SL and TP one-cancels-the-other
+    and retries the one that failed.
+    """
+
+    price = fresh_price(client, symbol, price, price_age_ms, max_price_age_ms, stale_price_action)
+    if price is None:
+        return None
 
     quantity = calculate_quantity_from_price(
         amount_usd=amount_usd,
         price=price,
         precision=precision,
-        use_decimal=use_decimal
+        use_decimal=use_decimal,
+        quantizer=quantizer
     )
 
     if quantity is None:
         return None
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_QUANTITY)
 
-    executed_price, order_id = market_order(client, symbol, side, quantity)
+    if execution_mode == EXECUTION_MODE_RESULT_BATCH:
+        start = time.perf_counter()
+        executed_price, order_id = market_order_result(
+            client=client,
+            symbol=symbol,
+            side=side,
+            quantity=quantity,
+            fill_tracker=fill_tracker,
+            latency_trace=latency_trace
+        )
+        if executed_price is None:
+            return None
 
-    if executed_price is None:
-        return None
+        protective_orders_batch(
+            client=client,
+            symbol=symbol,
+            side=side,
+            executed_price=executed_price,
+            st_percentage=st_percentage,
+            tp_percentage=tp_percentage,
+            quantity=quantity,
+            price_precision=price_precision,
+            quantizer=quantizer,
+            latency_trace=latency_trace,
+            order_id=order_id,
+            protection=protection
+        )
+        print(f"[timing] click to protected position: {(time.perf_counter() - start) * 1000:.1f} ms")
+        return order_id
 
-    stop_loss_order(
+    executed_price, order_id = market_order(
         client=client,
         symbol=symbol,
         side=side,
-        executed_price=executed_price,
-        st_percentage=st_percentage,
         quantity=quantity,
-        price_precision=price_precision
+        fill_tracker=fill_tracker,
+        latency_trace=latency_trace
     )
 
-    take_profit_order(
-        client=client,
-        symbol=symbol,
-        side=side,
-        executed_price=executed_price,
-        tp_percentage=tp_percentage,
-        quantity=quantity,
-        price_precision=price_precision
-    )
+    if executed_price is None:
+        return None
+
+    # Built for both orders at once, so that the manager registers them as a pair
+    legs = {
+        leg: params
+        for leg, _, params in build_protective_params(
+            symbol=symbol,
+            side=side,
+            executed_price=executed_price,
+            st_percentage=st_percentage,
+            tp_percentage=tp_percentage,
+            quantity=quantity,
+            price_precision=price_precision,
+            quantizer=quantizer,
+            order_id=order_id,
+            protection=protection
+        )
+    }
+
+    if LEG_STOP_LOSS in legs:
+        stop_loss_order(
+            client=client,
+            symbol=symbol,
+            side=side,
+            executed_price=executed_price,
+            st_percentage=st_percentage,
+            quantity=quantity,
+            price_precision=price_precision,
+            quantizer=quantizer,
+            latency_trace=latency_trace,
+            params=legs[LEG_STOP_LOSS],
+            order_id=order_id,
+            protection=protection
+        )
+
+    if LEG_TAKE_PROFIT in legs:
+        take_profit_order(
+            client=client,
+            symbol=symbol,
+            side=side,
+            executed_price=executed_price,
+            tp_percentage=tp_percentage,
+            quantity=quantity,
+            price_precision=price_precision,
+            quantizer=quantizer,
+            latency_trace=latency_trace,
+            params=legs[LEG_TAKE_PROFIT],
+            order_id=order_id,
+            protection=protection
+        )
 
     return order_id
 
@@ -256,6 +773,64 @@ def close_position_by_order_id(client, symbol: str, order_id: int) -> None:
         print(f"Error closing position: {e}")
 
 
+def build_close_position_params(symbol: str, amount: float) -> dict:
+    """Builds the reduce-only market order closing a position of signed size `amount`."""
+    return {
+        "symbol": symbol,
+        "side": "SELL" if amount > 0 else "BUY",
+        "type": ORDER_TYPE_MARKET,
+        "quantity": format_decimal(abs(amount)),
+        "reduceOnly": True,
+    }
+
+
+def fetch_position_amounts(client, symbol: str | None = None) -> list[tuple[str, float]]:
+    """(symbol, signed amount) of the open positions over REST (positionRisk), of `symbol` or all."""
+    positions = (
+        client.futures_position_information(symbol=symbol)
+        if symbol else client.futures_position_information()
+    )
+    return [
+        (position["symbol"], float(position["positionAmt"]))
+        for position in positions
+        if float(position["positionAmt"]) and position.get("positionSide", "BOTH") == "BOTH"
+    ]
+
+
+def close_position(client, symbol: str, amount: float) -> int | None:
+    """Closes a position of known live size with a single request; returns the order ID.
+
+    The size comes from the position book (core/position_book.py), so there is no order
+    lookup before the close and partial closes or several entries are accounted for.
+    """
+    params = build_close_position_params(symbol, amount)
+    try:
+        response = client.futures_create_order(**params)
+        print(f"Position in {symbol} closed ({params['side']} {params['quantity']})")
+        return response["orderId"]
+    except Exception as e:
+        print(f"Error closing position in {symbol}: {e}")
+        return None
+
+
+def close_live_positions(client, rest_client, symbol: str | None = None) -> list[int | None]:
+    """Closes the positions at the size the exchange reports now, for when the position book may be stale.
+
+    Args:
+        client: Client sending the closes.
+        rest_client: python-binance `Client` for the positionRisk lookup.
+        symbol: Symbol to close, or None for every open position.
+    """
+    try:
+        positions = fetch_position_amounts(rest_client, symbol)
+    except Exception as e:
+        print(f"Error looking up positions: {e}")
+        return []
+    if not positions:
+        print(f"No open position in {symbol}" if symbol else "No open positions")
+    return [close_position(client, position_symbol, amount) for position_symbol, amount in positions]
+
+
 def rescue_order_after_timeout(client, symbol: str, order_id: int) -> None:
     """
     Attempts to cancel the remaining part of an unfilled order
@@ -0,0 +1,396 @@
+import asyncio
+import time
+
+from core.hot_intent import send_hot_order_async
+from core.latency import STAGE_ACK, STAGE_FILL, STAGE_QUANTITY, STAGE_SENT, STAGE_SL_ACK
+from core.place_order import (
+    FILL_TIMEOUT,
+    POLL_INTERVAL,
+    FALLBACK_POLL_INTERVAL,
+    EXECUTION_MODE_RESULT_BATCH,
+    MAX_PRICE_AGE_MS,
+    ORDER_TYPE_MARKET,
+    STALE_PRICE_REFUSE,
+    STALE_PRICE_REPRICE,
+    is_price_stale,
+    calculate_quantity_from_price,
+    build_protective_params,
+    build_close_position_params,
+    fetch_position_amounts,
+    report_protective_order,
+    to_batch_order,
+)
+
+#  Async counterparts of the order functions in core/place_order.py.
+#  They run on the order engine event loop (core/order_engine.py) with python-binance's AsyncClient,
+#  so the Qt main thread never waits for REST round-trips and independent calls run concurrently.
+
+
+
+async def fresh_price_async(
+        client,
+        symbol: str,
+        price: float,
+        price_age_ms: float | None = None,
+        max_price_age_ms: float | None = MAX_PRICE_AGE_MS,
+        stale_price_action: str = STALE_PRICE_REPRICE
+) -> float | None:
+    """Async version of `fresh_price`: returns a usable price or None to refuse the order."""
+    if not is_price_stale(price_age_ms, max_price_age_ms):
+        return price
+
+    print(f"Price of {symbol} is {price_age_ms:.0f} ms old (limit {max_price_age_ms} ms)")
+    if stale_price_action == STALE_PRICE_REFUSE:
+        print("Order refused: stale price")
+        return None
+
+    try:
+        return float((await client.futures_symbol_ticker(symbol=symbol))["price"])
+    except Exception as e:
+        print(f"Unable to re-price {symbol}, order refused: {e}")
+        return None
+
+
+async def get_executed_price_async(client, symbol: str, order_id: int) -> float | None:
+    """Returns the average execution price if the order is filled."""
+    order_status = await client.futures_get_order(symbol=symbol, orderId=order_id)
+
+    if order_status['status'] == 'FILLED':
+        return float(order_status['avgPrice'])
+    else:
+        return None
+
+
+async def wait_for_fill_async(client, symbol: str, order_id: int, fill_tracker) -> float | None:
+    """Waits for the order fill from the user data stream or, without it, by REST polling."""
+    loop = asyncio.get_running_loop()
+
+    if fill_tracker is None:
+        deadline = time.monotonic() + FILL_TIMEOUT
+        while time.monotonic() < deadline:
+            executed_price = await get_executed_price_async(client, symbol, order_id)
+            if executed_price is not None:
+                return executed_price
+            await asyncio.sleep(POLL_INTERVAL)
+        return None
+
+    def poll() -> float | None:
+        # Called from the waiting worker thread, the REST call itself runs on the loop
+        future = asyncio.run_coroutine_threadsafe(
+            get_executed_price_async(client, symbol, order_id), loop
+        )
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Error polling order status: {e}")
+            return None
+
+    poll_interval = (
+        FALLBACK_POLL_INTERVAL if fill_tracker.is_streaming else POLL_INTERVAL
+    )
+
+    # The tracker blocks on a threading.Event, so it waits in a worker thread
+    return await asyncio.to_thread(
+        fill_tracker.wait_for_fill,
+        order_id,
+        FILL_TIMEOUT,
+        poll,
+        poll_interval
+    )
+
+
+async def market_order_async(
+        client,
+        symbol: str,
+        side: str,
+        quantity: float | int,
+        fill_tracker=None,
+        signed_body: str | None = None,
+        latency_trace=None
+):
+    """Places a market order with a RESULT response and waits for the fill if needed.
+
+    A pre-signed request body from the hot intent cache is sent as is, skipping
+    parameter serialization and signing.
+    """
+    try:
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_SENT)
+        if signed_body is not None:
+            order = await send_hot_order_async(client, signed_body)
+        else:
+            order = await client.futures_create_order(
+                symbol=symbol,
+                side=side,  # "BUY" or "SELL"
+                type=ORDER_TYPE_MARKET,
+                quantity=quantity,
+                newOrderRespType="RESULT"
+            )
+    except Exception as e:
+        print(f"Error placing order: {e}")
+        return None, None
+
+    order_id = order['orderId']
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_ACK)
+        latency_trace.set_order_id(order_id)
+    if order.get('status') == 'FILLED':
+        if latency_trace is not None:
+            latency_trace.mark(STAGE_FILL)
+        return float(order['avgPrice']), order_id
+
+    executed_price = await wait_for_fill_async(client, symbol, order_id, fill_tracker)
+
+    if executed_price is None:
+        await rescue_order_after_timeout_async(client, symbol, order_id)
+        return None, order_id
+
+    if latency_trace is not None:
+        latency_trace.mark(STAGE_FILL)
+    return executed_price, order_id
+
+
+async def create_protective_order_async(
+        client,
+        leg: str,
+        params: dict,
+        latency_trace=None,
+        stage: int = STAGE_SL_ACK,
+        order_id: int | None = None,
+        protection=None
+) -> None:
+    """Places a single reduce-only protective order and reports the outcome."""
+    try:
+        response = await client.futures_create_order(**params)
+        if latency_trace is not None:
+            latency_trace.mark(stage)
+    except Exception as e:
+        report_protective_order(protection, order_id, leg, error=e)
+        return
+    report_protective_order(protection, order_id, leg, response=response)
+
+
+async def protective_orders_async(
+        client,
+        symbol: str,
+        side: str,
+        executed_price: float,
+        st_percentage: float,
+        tp_percentage: float,
+        quantity: float | str,
+        price_precision: int,
+        execution_mode: str,
+        quantizer=None,
+        latency_trace=None,
+        order_id: int | None = None,
+        protection=None
+) -> None:
+    """Places stop-loss and take-profit either as one batch or as two concurrent requests.
+
+    With a protective order manager, the pair of the entry `order_id` is registered with it
+    before it is sent and every outcome is reported to it.
+    """
+    orders = build_protective_params(
+        symbol=symbol,
+        side=side,
+        executed_price=executed_price,
+        st_percentage=st_percentage,
+        tp_percentage=tp_percentage,
+        quantity=quantity,
+        price_precision=price_precision,
+        quantizer=quantizer,
+        order_id=order_id,
+        protection=protection
+    )
+    if not orders:
+        return
+
+    if execution_mode == EXECUTION_MODE_RESULT_BATCH:
+        try:
+            results = await client.futures_place_batch_order(
+                batchOrders=[to_batch_order(params) for _, _, params in orders]
+            )
+        except Exception as e:
+            print(f"Error placing SL/TP batch: {e}")
+            for leg, _, _ in orders:
+                report_protective_order(protection, order_id, leg, error=e)
+            return
+        for (leg, stage, _), result in zip(orders, results):
+            if "code" in result:
+                report_protective_order(protection, order_id, leg, error=result)
+                continue
+            if latency_trace is not None:
+                latency_trace.mark(stage)
+            report_protective_order(protection, order_id, leg, response=result)
+        return
+
+    # SL and TP do not depend on each other, so both requests are in flight at once
+    await asyncio.gather(*(
+        create_protective_order_async(client, leg, params, latency_trace, stage, order_id, protection)
+        for leg, stage, params in orders
+    ))
+
+
+async def place_market_order_async(
+        client,
+        symbol: str,
+        side: str,
+        amount_usd: int | float,
+        precision: int | None,
+        price_precision: int,
+        st_percentage: float,
+        tp_percentage: float,
+        price: float,
+        use_decimal: bool,
+        fill_tracker=None,
+        execution_mode: str = EXECUTION_MODE_RESULT_BATCH,
+        hot_order: tuple[float | str, str] | None = None,
+        quantizer=None,
+        price_age_ms: float | None = None,
+        max_price_age_ms: float | None = MAX_PRICE_AGE_MS,
+        stale_price_action: str = STALE_PRICE_REPRICE,
+        latency_trace=None,
+        protection=None
+) -> int | None:
+    """Places a market order and sets stop-loss and take-profit levels.
+
+    `hot_order` is an optional (quantity, signed request body) pair prepared
+    by the hot intent cache for this click; it is only passed for a fresh price.
+    A price older than `max_price_age_ms` is refused or re-fetched first.
+    `latency_trace` (core/latency.py), if given, records the time of every stage.
+    `protection` (core/protective_orders.py), if given, follows the SL/TP pair of the entry.
+    """
+    start = time.perf_counter()
+
+    if hot_order is not None:
+        quantity, signed_body = hot_order
+    else:
+        signed_body = None
+        price = await fresh_price_async(
+            client, symbol, price, price_age_ms, max_price_age_ms, stale_price_action
+        )
+        if price is None:
+            return None
+        quantity = calculate_quantity_from_price(
+            amount_usd=amount_usd,
+            price=price,
+            precision=precision,
+            use_decimal=use_decimal,
+            quantizer=quantizer
+        )
+
+    if quantity is None:
+        return None
+    # With a hot order the quantity stage was already marked when the payload was stamped
+    if latency_trace is not None and hot_order is None:
+        latency_trace.mark(STAGE_QUANTITY)
+
+    executed_price, order_id = await market_order_async(
+        client=client,
+        symbol=symbol,
+        side=side,
+        quantity=quantity,
+        fill_tracker=fill_tracker,
+        signed_body=signed_body,
+        latency_trace=latency_trace
+    )
+
+    if executed_price is None:
+        return None
+
+    await protective_orders_async(
+        client=client,
+        symbol=symbol,
+        side=side,
+        executed_price=executed_price,
+        st_percentage=st_percentage,
+        tp_percentage=tp_percentage,
+        quantity=quantity,
+        price_precision=price_precision,
+        execution_mode=execution_mode,
+        quantizer=quantizer,
+        latency_trace=latency_trace,
+        order_id=order_id,
+        protection=protection
+    )
+    print(f"[timing] click to protected position: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    return order_id
+
+
+async def close_position_by_order_id_async(client, symbol: str, order_id: int) -> None:
+    """Closes position by placing a market order in the reverse direction."""
+    try:
+        order_info = await client.futures_get_order(symbol=symbol, orderId=order_id)
+        side = order_info['side']
+        quantity = float(order_info['executedQty'])
+
+        if quantity == 0:
+            print("Order has not been executed or quantity is zero")
+            return
+
+        # Determine the closing order side (opposite direction)
+        close_side = "SELL" if side == "BUY" else "BUY"
+        await client.futures_create_order(
+            symbol=symbol,
+            side=close_side,
+            type=ORDER_TYPE_MARKET,
+            quantity=quantity,
+            reduceOnly=True
+        )
+        print(f"Position for order {order_id} closed ({close_side})")
+
+    except Exception as e:
+        print(f"Error closing position: {e}")
+
+
+async def close_position_async(client, symbol: str, amount: float) -> int | None:
+    """Async counterpart of `close_position`: one reduce-only market order of the live size."""
+    params = build_close_position_params(symbol, amount)
+    try:
+        response = await client.futures_create_order(**params)
+        print(f"Position in {symbol} closed ({params['side']} {params['quantity']})")
+        return response["orderId"]
+    except Exception as e:
+        print(f"Error closing position in {symbol}: {e}")
+        return None
+
+
+async def close_positions_async(client, positions: list[tuple[str, float]]) -> list[int | None]:
+    """Closes several positions at once; returns the order ID of each close, None if it failed."""
+    return await asyncio.gather(*(close_position_async(client, symbol, amount) for symbol, amount in positions))
+
+
+async def close_live_positions_async(client, rest_client, symbol: str | None = None) -> list[tuple[str, int | None]]:
+    """Async counterpart of `close_live_positions`; returns (symbol, order ID or None) of every close.
+
+    The lookup goes over the REST `Client` in a worker thread, as the order client may be a
+    WebSocket API session.
+    """
+    try:
+        positions = await asyncio.to_thread(fetch_position_amounts, rest_client, symbol)
+    except Exception as e:
+        print(f"Error looking up positions: {e}")
+        return []
+    if not positions:
+        print(f"No open position in {symbol}" if symbol else "No open positions")
+        return []
+    order_ids = await close_positions_async(client, positions)
+    return [(position_symbol, order_id) for (position_symbol, _), order_id in zip(positions, order_ids)]
+
+
+async def rescue_order_after_timeout_async(client, symbol: str, order_id: int) -> None:
+    """
+    Attempts to cancel the remaining part of an unfilled order
+    and close the executed portion.
+    """
+    try:
+        await client.futures_cancel_order(symbol=symbol, orderId=order_id)
+        print("Remaining order canceled.")
+    except Exception as e:
+        print(
+            f"Unable to cancel the order"
+            f"(it may already be filled or canceled): {e}"
+        )
+
+    await close_position_by_order_id_async(client, symbol, order_id)
@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from typing import NamedTuple
+
+from core.user_data_stream import EVENT_ACCOUNT_UPDATE, EVENT_CONNECTION, EVENT_ORDER_UPDATE
+
+#  Positions and open orders of the account, kept in memory.
+#
+#  The user data stream keeps the book current: ACCOUNT_UPDATE carries the new size of every
+#  position that changed, ORDER_TRADE_UPDATE every order that was placed, filled or canceled.
+#  REST snapshots (positionRisk and openOrders) repair whatever the stream missed; they run
+#  periodically and right after every reconnect of the stream.
+#
+#  A snapshot can be older than events that arrived while it was downloading. Entries are
+#  stamped with the server time of their last change, and a snapshot only replaces entries
+#  that are older than its request. Closed positions and orders stay in the book as such until
+#  a later snapshot, so an old snapshot cannot bring them back. Positions are one-way mode
+#  (position side BOTH), like the reduce-only orders of the app.
+
+RECONCILE_INTERVAL = 60.0  # seconds between REST snapshots
+OPEN_ORDER_STATUSES = ("NEW", "PARTIALLY_FILLED")
+
+
+
+class Position(NamedTuple):
+    symbol: str
+    amount: float  # signed: > 0 long, < 0 short, 0 closed
+    entry_price: float
+    unrealized_profit: float
+    updated_at: float  # server time in ms of the last change
+
+
+class OpenOrder(NamedTuple):
+    symbol: str
+    order_id: int
+    client_order_id: str
+    side: str
+    order_type: str
+    status: str
+    quantity: float
+    filled_quantity: float
+    price: float
+    stop_price: float
+    reduce_only: bool
+    close_position: bool
+    updated_at: float
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in OPEN_ORDER_STATUSES
+
+
+def position_from_rest(data: dict, updated_at: float) -> Position:
+    """Position from a positionRisk entry."""
+    return Position(
+        data["symbol"], float(data["positionAmt"]), float(data["entryPrice"]),
+        float(data.get("unRealizedProfit", 0)), updated_at
+    )
+
+
+def order_from_rest(data: dict, updated_at: float) -> OpenOrder:
+    """Open order from an openOrders entry."""
+    return OpenOrder(
+        data["symbol"], data["orderId"], data.get("clientOrderId", ""), data["side"], data["type"],
+        data["status"], float(data["origQty"]), float(data.get("executedQty", 0)), float(data.get("price", 0)),
+        float(data.get("stopPrice", 0)), bool(data.get("reduceOnly", False)),
+        bool(data.get("closePosition", False)), updated_at
+    )
+
+
+class PositionBook:
+    """Live positions and open orders of the account, fed by the user data stream.
+
+    Args:
+        clock: Optional `ClockSync`, so that local times compare with the server's event times.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._positions = {}  # symbol -> Position, closed ones included until the next snapshot
+        self._orders = {}  # order ID -> OpenOrder, closed ones included until the next snapshot
+        self.is_synced = False  # True once a position snapshot was applied
+        self.corrections = 0  # entries a snapshot had to repair
+        self._wake = None
+        self._future = None
+
+    def now(self) -> float:
+        """Server time estimate in ms."""
+        offset = self.clock.offset if self.clock is not None and self.clock.is_synced else 0.0
+        return time.time() * 1000 + offset
+
+    def position(self, symbol: str) -> Position | None:
+        """The open position in `symbol`, or None if there is none."""
+        with self._lock:
+            position = self._positions.get(symbol.upper())
+        return position if position is not None and position.amount else None
+
+    def positions(self) -> list[Position]:
+        with self._lock:
+            return [position for position in self._positions.values() if position.amount]
+
+    def open_orders(self, symbol: str | None = None) -> list[OpenOrder]:
+        with self._lock:
+            orders = list(self._orders.values())
+        return [order for order in orders if order.is_open and (symbol is None or order.symbol == symbol.upper())]
+
+    # User data stream
+
+    def attach(self, stream) -> None:
+        """Subscribes the book to a `UserDataStream`."""
+        stream.subscribe(EVENT_ORDER_UPDATE, self.on_order_update)
+        stream.subscribe(EVENT_ACCOUNT_UPDATE, self.on_account_update)
+        stream.subscribe(EVENT_CONNECTION, self.on_connection)
+
+    def on_order_update(self, update) -> None:
+        order = OpenOrder(
+            update.symbol, update.order_id, update.client_order_id, update.side, update.original_type,
+            update.status, update.quantity, update.filled_quantity, update.price, update.stop_price,
+            update.reduce_only, update.close_position, update.event_time
+        )
+        with self._lock:
+            self._orders[order.order_id] = order
+
+    def on_account_update(self, update) -> None:
+        with self._lock:
+            for position in update.positions:
+                if position.position_side != "BOTH":
+                    continue
+                self._positions[position.symbol] = Position(
+                    position.symbol, position.amount, position.entry_price, position.unrealized_profit,
+                    update.event_time
+                )
+
+    def on_connection(self, connected: bool) -> None:
+        # Events sent while the stream was down are lost
+        if connected:
+            self.request_reconcile()
+
+    # REST snapshots
+
+    def apply_snapshot(self, positions: list[dict] | None, orders: list[dict] | None, requested_at: float) -> int:
+        """Replaces the entries older than the snapshot; returns the number of entries it corrected.
+
+        Args:
+            positions: positionRisk entries, or None to keep the positions.
+            orders: openOrders entries, or None to keep the orders.
+            requested_at: Server time in ms at which the snapshot was requested (or earlier).
+        """
+        corrected = 0
+        with self._lock:
+            if positions is not None:
+                fresh = {data["symbol"]: position_from_rest(data, requested_at) for data in positions}
+                for symbol in set(self._positions) | set(fresh):
+                    local = self._positions.get(symbol)
+                    if local is not None and local.updated_at > requested_at:
+                        continue  # changed by an event after the snapshot was requested
+                    remote = fresh.get(symbol, Position(symbol, 0.0, 0.0, 0.0, requested_at))
+                    if (local.amount if local is not None else 0.0) != remote.amount:
+                        corrected += 1
+                    self._positions[symbol] = remote
+                # Closed entries older than the snapshot cannot be brought back by a later one
+                self._positions = {
+                    symbol: position for symbol, position in self._positions.items()
+                    if position.amount or position.updated_at > requested_at
+                }
+
+            if orders is not None:
+                fresh = {data["orderId"]: order_from_rest(data, requested_at) for data in orders}
+                for order_id in set(self._orders) | set(fresh):
+                    local = self._orders.get(order_id)
+                    if local is not None and local.updated_at > requested_at:
+                        continue
+                    remote = fresh.get(order_id)
+                    if remote is None:
+                        # No longer open on the exchange
+                        corrected += local.is_open
+                        del self._orders[order_id]
+                        continue
+                    if local is None or (local.status, local.filled_quantity) != (remote.status, remote.filled_quantity):
+                        corrected += 1
+                    self._orders[order_id] = remote
+                self._orders = {
+                    order_id: order for order_id, order in self._orders.items()
+                    if order.is_open or order.updated_at > requested_at
+                }
+
+            # Differences in the first snapshot are the state from before the app started
+            if not self.is_synced:
+                corrected = 0
+            self.is_synced = self.is_synced or positions is not None
+            self.corrections += corrected
+        return corrected
+
+    async def reconcile(self, client) -> None:
+        """Downloads positions and open orders with `client` (python-binance `Client`) and applies them."""
+        requested_at = self.now()
+        positions, orders = await asyncio.gather(
+            asyncio.to_thread(client.futures_position_information),
+            asyncio.to_thread(client.futures_get_open_orders)
+        )
+        corrected = self.apply_snapshot(positions, orders, requested_at)
+        if corrected:
+            print(f"Position book: {corrected} entries corrected from REST")
+
+    def start_reconcile(self, client, loop_thread, interval: float = RECONCILE_INTERVAL) -> None:
+        """Reconciles now and every `interval` seconds on `loop_thread`, replacing any previous client."""
+        self.stop_reconcile()
+        self._future = loop_thread.submit(self._reconcile_loop(client, interval))
+
+    def stop_reconcile(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def request_reconcile(self) -> None:
+        """Wakes the reconcile loop up for a snapshot now."""
+        wake = self._wake
+        if wake is not None:
+            wake[0].call_soon_threadsafe(wake[1].set)
+
+    async def _reconcile_loop(self, client, interval: float) -> None:
+        wake = asyncio.Event()
+        self._wake = (asyncio.get_running_loop(), wake)
+        try:
+            while True:
+                wake.clear()
+                try:
+                    await self.reconcile(client)
+                except Exception as e:
+                    print(f"Position book snapshot error: {e}")
+                try:
+                    await asyncio.wait_for(wake.wait(), interval)
+                except TimeoutError:
+                    pass
+        finally:
+            self._wake = None
+
+    def report(self) -> str:
+        positions = ", ".join(f"{p.symbol} {p.amount:g}" for p in self.positions()) or "no positions"
+        return f"Position book: {positions}, {len(self.open_orders())} open orders, {self.corrections} corrections"
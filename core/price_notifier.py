@@ -0,0 +1,66 @@
+import socket
+import time
+
+from PyQt5 import QtCore
+
+FRAME_INTERVAL_MS = 16  # ~60 updates per second at most
+
+
+
+def create_notify_channel() -> tuple:
+    """Creates the wake-up channel between the stream worker and the UI.
+
+    Returns:
+        tuple: (receiver, sender) non-blocking sockets; the sender is passed to the worker.
+    """
+    receiver, sender = socket.socketpair()
+    receiver.setblocking(False)
+    sender.setblocking(False)
+    return receiver, sender
+
+
+class PriceUpdateNotifier(QtCore.QObject):
+    """Delivers market data updates into the Qt event loop as soon as they are published.
+
+    The stream worker writes one byte to the channel per batch of updates (see
+    `MarketDataTable.mark_notify_pending`). A `QSocketNotifier` wakes the GUI thread,
+    and bursts are coalesced so `updated` is emitted at most once per frame.
+    The main thread sleeps while nothing changes.
+    """
+    updated = QtCore.pyqtSignal()
+
+    def __init__(self, receiver: socket.socket, table, frame_interval_ms: int = FRAME_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.receiver = receiver
+        self.table = table
+        self.frame_interval_ms = frame_interval_ms
+        self._last_emit = 0.0
+
+        self._frame_timer = QtCore.QTimer(self)
+        self._frame_timer.setSingleShot(True)
+        self._frame_timer.timeout.connect(self._emit_frame)
+
+        self._notifier = QtCore.QSocketNotifier(receiver.fileno(), QtCore.QSocketNotifier.Read, self)
+        self._notifier.activated.connect(self._on_readable)
+
+    def _on_readable(self) -> None:
+        # Drain first, then re-arm: an update published in between is read by the coming frame
+        try:
+            while self.receiver.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+        self.table.clear_notify_pending()
+
+        if not self._frame_timer.isActive():
+            elapsed_ms = (time.monotonic() - self._last_emit) * 1000
+            self._frame_timer.start(max(0, int(self.frame_interval_ms - elapsed_ms)))
+
+    def _emit_frame(self) -> None:
+        self._last_emit = time.monotonic()
+        self.updated.emit()
+
+    def close(self) -> None:
+        self._notifier.setEnabled(False)
+        self._frame_timer.stop()
+        self.receiver.close()
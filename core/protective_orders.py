@@ -0,0 +1,468 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+
+from PyQt5 import QtCore
+
+from core.place_order import LEG_STOP_LOSS, LEG_TAKE_PROFIT, PROTECTIVE_ORDER_NAMES
+from core.user_data_stream import EVENT_ACCOUNT_UPDATE, EVENT_ORDER_UPDATE
+
+#  Stop-loss and take-profit of each entry, kept one-cancels-the-other.
+#
+#  Futures have no OCO orders: the SL (STOP_MARKET) and the TP (LIMIT) of an entry are two
+#  independent reduce-only orders. Both are tagged with a client order ID made of the entry's
+#  order ID and the leg, so that the user data stream tells which entry an update belongs to.
+#  When one leg fills, the other is canceled; when the position of the symbol is closed (by a
+#  leg, Close Position or a liquidation), every leg still on the book is canceled.
+#
+#  Cancels and failed placements are jobs of one priority queue on the order engine's loop.
+#  Due jobs run one at a time, cancels first (a leftover reduce-only order would trade against
+#  the next position of the symbol), then stop-losses, then take-profits. A failed job is
+#  retried with backoff, except for rejections a retry of the same request cannot fix. An entry
+#  whose stop-loss is not on the book after `alert_after` seconds is reported as unprotected.
+
+CLIENT_ORDER_ID_PREFIX = "hp-"  # followed by "<entry order ID>-<leg>"
+
+# Job priorities, the lowest runs first
+PRIORITY_CANCEL = 0
+PRIORITY_STOP_LOSS = 1
+PRIORITY_TAKE_PROFIT = 2
+LEG_PRIORITIES = {LEG_STOP_LOSS: PRIORITY_STOP_LOSS, LEG_TAKE_PROFIT: PRIORITY_TAKE_PROFIT}
+
+JOB_PLACE = "place"
+JOB_CANCEL = "cancel"
+
+RETRY_DELAYS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0)  # seconds before each retry, the last one repeats
+MAX_ATTEMPTS = 10
+UNPROTECTED_ALERT_AFTER = 3.0  # seconds without a stop-loss on the book before an alert
+CHECK_INTERVAL = 0.5  # seconds between checks for unprotected entries
+
+# Leg states
+PENDING = "pending"  # being placed, or waiting for a retry
+LIVE = "live"  # on the book
+CANCELING = "canceling"
+FILLED = "filled"
+CLOSED = "closed"  # canceled, expired, or rejected because the position is gone
+FAILED = "failed"  # placement given up
+
+# Error codes of the exchange
+UNKNOWN_ORDER = -2011  # cancel of an order that is not open
+ORDER_WOULD_TRIGGER = -2021  # the stop price is already crossed
+REDUCE_ONLY_REJECTED = -2022  # nothing left to reduce
+DUPLICATE_CLIENT_ORDER_ID = -4116  # an open order has this client order ID already
+# Bad parameters, precision, tick size, notional: the same request is rejected again
+FINAL_REJECTIONS = (ORDER_WOULD_TRIGGER, -1102, -1111, -1121, -4003, -4014, -4164)
+
+TERMINAL_STATUSES = ("CANCELED", "EXPIRED", "EXPIRED_IN_MATCH", "REJECTED")
+
+
+
+def client_order_id(entry_order_id: int, leg: str) -> str:
+    return f"{CLIENT_ORDER_ID_PREFIX}{entry_order_id}-{leg}"
+
+
+def parse_client_order_id(value: str) -> tuple[int, str] | None:
+    """(entry order ID, leg) of a protective order's client order ID, None for other orders."""
+    if not value.startswith(CLIENT_ORDER_ID_PREFIX):
+        return None
+    entry_order_id, _, leg = value[len(CLIENT_ORDER_ID_PREFIX):].partition("-")
+    if not entry_order_id.isdigit() or leg not in LEG_PRIORITIES:
+        return None
+    return int(entry_order_id), leg
+
+
+def error_code(error) -> int | None:
+    """Exchange error code of an exception or of a rejected batch entry."""
+    if isinstance(error, dict):
+        return error.get("code")
+    return getattr(error, "code", None)
+
+
+def describe_error(error) -> str:
+    return error.get("msg", str(error)) if isinstance(error, dict) else str(error)
+
+
+def retry_delay(attempts: int) -> float:
+    return RETRY_DELAYS[min(attempts, len(RETRY_DELAYS)) - 1]
+
+
+class ProtectionSignals(QtCore.QObject):
+    """Alerts of the protective order manager, delivered in the GUI thread."""
+    unprotected = QtCore.pyqtSignal(str, int, str)  # symbol, entry order ID, reason
+
+
+class ProtectiveLeg:
+    """The stop-loss or the take-profit of an entry."""
+
+    __slots__ = ("leg", "params", "order_id", "state", "attempts", "error")
+
+    def __init__(self, leg: str, params: dict):
+        self.leg = leg
+        self.params = params
+        self.order_id = None
+        self.state = PENDING
+        self.attempts = 0  # failed requests of the current job
+        self.error = None  # last error, for the alert
+
+    @property
+    def name(self) -> str:
+        return PROTECTIVE_ORDER_NAMES[self.leg]
+
+
+class ProtectedEntry:
+    """The protective orders of one entry order."""
+
+    __slots__ = ("symbol", "order_id", "legs", "done", "unprotected_since", "alerted")
+
+    def __init__(self, symbol: str, order_id: int, now: float):
+        self.symbol = symbol
+        self.order_id = order_id
+        self.legs = {}  # leg -> ProtectiveLeg
+        self.done = False  # a leg filled or the position is closed
+        self.unprotected_since = now
+        self.alerted = False
+
+    @property
+    def is_finished(self) -> bool:
+        return self.done and all(leg.state in (FILLED, CLOSED, FAILED) for leg in self.legs.values())
+
+    def unprotected_reason(self) -> str | None:
+        """Why the position of the entry has no stop-loss on the book, None if it has one."""
+        stop_loss = self.legs.get(LEG_STOP_LOSS)
+        if stop_loss is None:
+            return "no stop-loss"
+        if stop_loss.state == LIVE:
+            return None
+        if stop_loss.state == PENDING:
+            return "stop-loss not placed yet" + (f" ({stop_loss.error})" if stop_loss.error else "")
+        if stop_loss.state == FAILED:
+            return f"stop-loss failed ({stop_loss.error})"
+        return "stop-loss canceled"
+
+
+class ProtectiveOrderManager:
+    """Keeps the SL/TP pairs of the entries one-cancels-the-other and retries what failed.
+
+    Args:
+        loop_thread: `AsyncLoopThread` of the order engine; jobs and stream events run on it.
+        client_source: Returns the client to send jobs with (the order engine's async client),
+            or None while there is none.
+        alert_after: Seconds an entry may be without a stop-loss on the book before an alert.
+    """
+
+    def __init__(self, loop_thread, client_source, alert_after: float = UNPROTECTED_ALERT_AFTER):
+        self.loop_thread = loop_thread
+        self.client_source = client_source
+        self.alert_after = alert_after
+        self.signals = ProtectionSignals()
+        self._lock = threading.Lock()
+        self._entries = {}  # entry order ID -> ProtectedEntry
+        self._jobs = []  # heap of (due, priority, sequence, job, entry order ID, leg)
+        self._sequence = itertools.count()
+        self._wake = None
+        self._future = None
+
+        self.siblings_canceled = 0
+        self.retries = 0  # placements that succeeded after a failure
+        self.alerts = 0
+
+    # Order path
+
+    def track(
+            self,
+            symbol: str,
+            entry_order_id: int,
+            stop_loss_params: dict | None,
+            take_profit_params: dict | None
+    ) -> tuple[dict | None, dict | None]:
+        """Registers the protective orders of an entry before they are sent.
+
+        Returns the parameters with the client order IDs the manager follows them by.
+        """
+        entry = ProtectedEntry(symbol, entry_order_id, time.monotonic())
+        tagged = []
+        for leg, params in ((LEG_STOP_LOSS, stop_loss_params), (LEG_TAKE_PROFIT, take_profit_params)):
+            if params is not None:
+                params = dict(params, newClientOrderId=client_order_id(entry_order_id, leg))
+                entry.legs[leg] = ProtectiveLeg(leg, params)
+            tagged.append(params)
+        with self._lock:
+            self._entries[entry_order_id] = entry
+        return tagged[0], tagged[1]
+
+    def placed(self, entry_order_id: int, leg: str, order_id: int) -> None:
+        """Reports an accepted protective order."""
+        with self._lock:
+            protective = self._leg(entry_order_id, leg)
+            if protective is None:
+                return
+            protective.order_id = order_id
+            if protective.state == PENDING:
+                self._set_live(entry_order_id, protective)
+
+    def failed(self, entry_order_id: int, leg: str, error) -> None:
+        """Reports a rejected or failed protective order; it is retried unless that cannot help."""
+        with self._lock:
+            entry = self._entries.get(entry_order_id)
+            protective = entry.legs.get(leg) if entry is not None else None
+            if protective is None or protective.state != PENDING:
+                return
+            protective.attempts += 1
+            protective.error = describe_error(error)
+            code = error_code(error)
+
+            if code == DUPLICATE_CLIENT_ORDER_ID:
+                # An earlier attempt reached the book although its response was lost
+                protective.state = LIVE
+            elif code == REDUCE_ONLY_REJECTED:
+                print(f"{protective.name} of order {entry_order_id} not needed: no position left")
+                protective.state = CLOSED
+                entry.done = True
+            elif code in FINAL_REJECTIONS or protective.attempts >= MAX_ATTEMPTS:
+                print(f"{protective.name} of order {entry_order_id} given up: {protective.error}")
+                protective.state = FAILED
+            else:
+                delay = retry_delay(protective.attempts)
+                print(f"{protective.name} of order {entry_order_id} failed ({protective.error}), retry in {delay:g} s")
+                self._push_job(delay, LEG_PRIORITIES[leg], JOB_PLACE, entry_order_id, leg)
+            self._drop_if_finished(entry)
+
+    # User data stream
+
+    def attach(self, stream) -> None:
+        """Subscribes the manager to a `UserDataStream`."""
+        stream.subscribe(EVENT_ORDER_UPDATE, self.on_order_update)
+        stream.subscribe(EVENT_ACCOUNT_UPDATE, self.on_account_update)
+
+    def on_order_update(self, update) -> None:
+        parsed = parse_client_order_id(update.client_order_id)
+        if parsed is None:
+            return
+        entry_order_id, leg = parsed
+        with self._lock:
+            entry = self._entries.get(entry_order_id)
+            protective = entry.legs.get(leg) if entry is not None else None
+            if protective is None:
+                return
+            protective.order_id = update.order_id
+            status = update.status
+
+            if status == "FILLED":
+                protective.state = FILLED
+                entry.done = True
+                for sibling in entry.legs.values():
+                    if sibling is not protective and self._cancel(entry, sibling):
+                        self.siblings_canceled += 1
+                        print(f"{protective.name} of order {entry_order_id} filled, canceling the {sibling.name.lower()}")
+            elif status in TERMINAL_STATUSES:
+                if protective.state not in (CANCELING, FILLED) and not entry.done:
+                    print(f"{protective.name} of order {entry_order_id} {status.lower()} by the exchange or by hand")
+                if protective.state != FILLED:
+                    protective.state = CLOSED
+            elif protective.state == PENDING:
+                self._set_live(entry_order_id, protective)
+            elif protective.state == CLOSED and entry.done:
+                # Accepted after its cancel was answered "unknown order"
+                protective.state = LIVE
+                self._cancel(entry, protective)
+            self._drop_if_finished(entry)
+
+    def on_account_update(self, update) -> None:
+        closed = {
+            position.symbol for position in update.positions
+            if position.position_side == "BOTH" and not position.amount
+        }
+        if not closed:
+            return
+        with self._lock:
+            for entry in list(self._entries.values()):
+                if entry.symbol not in closed:
+                    continue
+                entry.done = True
+                for protective in entry.legs.values():
+                    self._cancel(entry, protective)
+                self._drop_if_finished(entry)
+
+    # Jobs
+
+    def _leg(self, entry_order_id: int, leg: str) -> ProtectiveLeg | None:
+        entry = self._entries.get(entry_order_id)
+        return entry.legs.get(leg) if entry is not None else None
+
+    def _set_live(self, entry_order_id: int, protective: ProtectiveLeg) -> None:
+        """Marks a pending leg as on the book; the lock must be held."""
+        protective.state = LIVE
+        if protective.attempts:
+            self.retries += 1
+            print(f"{protective.name} of order {entry_order_id} placed after {protective.attempts} failures")
+        protective.attempts = 0
+        protective.error = None
+
+    def _cancel(self, entry: ProtectedEntry, protective: ProtectiveLeg) -> bool:
+        """Queues the cancel of a leg that is or may be on the book; the lock must be held."""
+        if protective.state not in (PENDING, LIVE):
+            return False
+        protective.state = CANCELING
+        protective.attempts = 0
+        self._push_job(0.0, PRIORITY_CANCEL, JOB_CANCEL, entry.order_id, protective.leg)
+        return True
+
+    def _push_job(self, delay: float, priority: int, job: str, entry_order_id: int, leg: str) -> None:
+        """Queues a job; the lock must be held."""
+        heapq.heappush(
+            self._jobs, (time.monotonic() + delay, priority, next(self._sequence), job, entry_order_id, leg)
+        )
+        if self._wake is not None:
+            self._wake[0].call_soon_threadsafe(self._wake[1].set)
+
+    def _drop_if_finished(self, entry: ProtectedEntry) -> None:
+        if entry.is_finished:
+            self._entries.pop(entry.order_id, None)
+
+    def _due_jobs(self, now: float) -> tuple[list[tuple], float | None]:
+        """Removes the due jobs from the queue, the most urgent first; also returns when the next is due."""
+        with self._lock:
+            due = []
+            while self._jobs and self._jobs[0][0] <= now:
+                due.append(heapq.heappop(self._jobs))
+            next_due = self._jobs[0][0] if self._jobs else None
+        due.sort(key=lambda job: (job[1], job[2]))
+        return [job[3:] for job in due], next_due
+
+    async def _run_job(self, job: str, entry_order_id: int, leg: str) -> None:
+        with self._lock:
+            entry = self._entries.get(entry_order_id)
+            protective = entry.legs.get(leg) if entry is not None else None
+            # Jobs overtaken by an event are dropped
+            if protective is None or protective.state != (PENDING if job == JOB_PLACE else CANCELING):
+                return
+            symbol, params = entry.symbol, protective.params
+
+        client = self.client_source()
+        if job == JOB_PLACE:
+            try:
+                if client is None:
+                    raise ConnectionError("order engine not connected")
+                response = await client.futures_create_order(**params)
+            except Exception as e:
+                self.failed(entry_order_id, leg, e)
+            else:
+                self.placed(entry_order_id, leg, response["orderId"])
+            return
+
+        try:
+            if client is None:
+                raise ConnectionError("order engine not connected")
+            await client.futures_cancel_order(symbol=symbol, origClientOrderId=params["newClientOrderId"])
+        except Exception as e:
+            self._cancel_failed(entry_order_id, leg, e)
+        else:
+            self._canceled(entry_order_id, leg)
+
+    def _canceled(self, entry_order_id: int, leg: str) -> None:
+        with self._lock:
+            entry = self._entries.get(entry_order_id)
+            protective = entry.legs.get(leg) if entry is not None else None
+            if protective is None:
+                return
+            if protective.state == CANCELING:
+                protective.state = CLOSED
+            self._drop_if_finished(entry)
+
+    def _cancel_failed(self, entry_order_id: int, leg: str, error) -> None:
+        if error_code(error) == UNKNOWN_ORDER:
+            # Filled, canceled or never accepted; an acceptance after this is canceled on its event
+            self._canceled(entry_order_id, leg)
+            return
+        with self._lock:
+            entry = self._entries.get(entry_order_id)
+            protective = entry.legs.get(leg) if entry is not None else None
+            if protective is None or protective.state != CANCELING:
+                return
+            protective.attempts += 1
+            if protective.attempts >= MAX_ATTEMPTS:
+                print(f"Cancel of the {protective.name.lower()} of order {entry_order_id} given up: {error}")
+                protective.state = FAILED
+                self._drop_if_finished(entry)
+                return
+            delay = retry_delay(protective.attempts)
+            print(f"Cancel of the {protective.name.lower()} of order {entry_order_id} failed ({error}), retry in {delay:g} s")
+            self._push_job(delay, PRIORITY_CANCEL, JOB_CANCEL, entry_order_id, leg)
+
+    # Unprotected positions
+
+    def _check_unprotected(self, now: float) -> None:
+        alerts = []
+        with self._lock:
+            for entry in self._entries.values():
+                reason = None if entry.done else entry.unprotected_reason()
+                if reason is None:
+                    if entry.alerted and not entry.done:
+                        print(f"Position of order {entry.order_id} in {entry.symbol} is protected again")
+                    entry.unprotected_since = None
+                    entry.alerted = False
+                    continue
+                if entry.unprotected_since is None:
+                    entry.unprotected_since = now
+                if not entry.alerted and now - entry.unprotected_since >= self.alert_after:
+                    entry.alerted = True
+                    alerts.append((entry.symbol, entry.order_id, reason))
+        for symbol, entry_order_id, reason in alerts:
+            self.alerts += 1
+            print(f"WARNING: position of order {entry_order_id} in {symbol} is unprotected: {reason}")
+            self.signals.unprotected.emit(symbol, entry_order_id, reason)
+
+    def unprotected(self) -> list[tuple[str, int, str]]:
+        """(symbol, entry order ID, reason) of the entries an alert was raised for."""
+        with self._lock:
+            return [
+                (entry.symbol, entry.order_id, entry.unprotected_reason() or "")
+                for entry in self._entries.values() if entry.alerted
+            ]
+
+    # Worker
+
+    def start(self) -> None:
+        """Starts the job queue and the unprotected position check on the loop thread."""
+        if self._future is None:
+            self._future = self.loop_thread.submit(self._run())
+
+    def stop(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    async def _run(self) -> None:
+        wake = asyncio.Event()
+        self._wake = (asyncio.get_running_loop(), wake)
+        try:
+            while True:
+                wake.clear()
+                jobs, next_due = self._due_jobs(time.monotonic())
+                for job in jobs:
+                    try:
+                        await self._run_job(*job)
+                    except Exception as e:
+                        print(f"Protective order job error: {e}")
+                self._check_unprotected(time.monotonic())
+
+                timeout = CHECK_INTERVAL
+                if next_due is not None:
+                    timeout = min(timeout, max(next_due - time.monotonic(), 0.0))
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout)
+                except TimeoutError:
+                    pass
+        finally:
+            self._wake = None
+
+    def report(self) -> str:
+        with self._lock:
+            entries = len(self._entries)
+            jobs = len(self._jobs)
+        return (
+            f"Protective orders: {entries} entries, {jobs} queued jobs, {self.siblings_canceled} siblings canceled, "
+            f"{self.retries} retried, {self.alerts} alerts"
+        )
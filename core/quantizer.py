@@ -0,0 +1,167 @@
+#  Tick-exact order quantization in scaled integers.
+#  All exchange rules (stepSize, tickSize, minQty, minNotional, ...) are converted once per symbol
+#  into integers counted in the smallest unit of their scale. On the order path only integer
+#  arithmetic is used: no Decimal objects, no context changes and no float rounding that could
+#  round a quantity up past the step size.
+
+USD_SCALE = 8  # decimal places kept from the USD amount entered by the user
+
+
+
+def decimal_places(value: str) -> int:
+    """Returns the number of significant decimal places of a decimal string ("0.0100" -> 2)."""
+    _, _, fraction = value.partition(".")
+    return len(fraction.rstrip("0"))
+
+
+def to_units(value: str, scale: int) -> int:
+    """Converts a decimal string to an exact integer count of 10**-scale units."""
+    whole, _, fraction = value.partition(".")
+    fraction = (fraction + "0" * scale)[:scale]
+    sign = -1 if whole.startswith("-") else 1
+    return sign * (abs(int(whole or "0")) * 10 ** scale + int(fraction or "0"))
+
+
+def format_units(units: int, scale: int) -> str:
+    """Formats an integer count of 10**-scale units as a plain decimal string."""
+    if scale == 0:
+        return str(units)
+    whole, fraction = divmod(units, 10 ** scale)
+    return f"{whole}.{fraction:0{scale}d}".rstrip("0").rstrip(".")
+
+
+def units_format(scale: int) -> str:
+    """Returns a %-format that renders divmod(units, 10**scale) with all `scale` decimals."""
+    return "%d" if scale == 0 else f"%d.%0{scale}d"
+
+
+class SymbolQuantizer:
+    """Order quantization rules of one symbol, compiled into scaled integers.
+
+    Built once per symbol from its exchange filters (see `SymbolInfo`).
+    Market order quantities follow MARKET_LOT_SIZE, prices follow PRICE_FILTER.
+    """
+
+    __slots__ = (
+        "symbol",
+        "qty_scale", "qty_factor", "step", "min_qty", "max_qty",
+        "price_scale", "price_factor", "tick", "min_price", "max_price",
+        "min_notional", "_usd_factor", "_qty_numerator", "_qty_format", "_price_format",
+    )
+
+    def __init__(self, info):
+        self.symbol = info.symbol
+
+        step_size = info.market_step_size or info.step_size
+        self.qty_scale = decimal_places(step_size)
+        self.qty_factor = 10 ** self.qty_scale
+        self.step = to_units(step_size, self.qty_scale)
+        self.min_qty = to_units(info.market_min_qty or info.min_qty or "0", self.qty_scale)
+        self.max_qty = to_units(info.market_max_qty or info.max_qty or "0", self.qty_scale)
+
+        self.price_scale = decimal_places(info.tick_size)
+        self.price_factor = 10 ** self.price_scale
+        self.tick = to_units(info.tick_size, self.price_scale)
+        self.min_price = to_units(info.min_price or "0", self.price_scale)
+        self.max_price = to_units(info.max_price or "0", self.price_scale)
+
+        # Notional is compared as quantity units * price units, so it is kept on the combined scale.
+        # Rounding it up keeps the check conservative if the filter has even more decimals.
+        notional_scale = self.qty_scale + self.price_scale
+        min_notional = info.min_notional or "0"
+        self.min_notional = to_units(min_notional, notional_scale)
+        if decimal_places(min_notional) > notional_scale:
+            self.min_notional += 1
+
+        # quantity units = usd units * qty_factor * price_factor / (price units * 10**USD_SCALE)
+        self._usd_factor = 10 ** USD_SCALE
+        self._qty_numerator = self.qty_factor * self.price_factor
+
+        # Precompiled formats; trailing zeros are kept, Binance accepts them
+        self._qty_format = units_format(self.qty_scale)
+        self._price_format = units_format(self.price_scale)
+
+    def price_to_units(self, price: float) -> int:
+        """Converts a float price to the nearest tick, in price units."""
+        units = round(price * self.price_factor)
+        tick = self.tick
+        return (units + tick // 2) // tick * tick
+
+    def quantity_units_for_usd(self, amount_usd: float, price_units: int) -> int:
+        """Largest step multiple whose value at `price_units` does not exceed `amount_usd`."""
+        units = (
+            round(amount_usd * self._usd_factor) * self._qty_numerator
+            // (price_units * self._usd_factor)
+        )
+        return units - units % self.step
+
+    def check_order(self, quantity_units: int, price_units: int) -> str | None:
+        """Returns the reason the exchange would reject the order, or None if it is valid."""
+        if quantity_units <= 0 or quantity_units < self.min_qty:
+            return (
+                f"quantity {format_units(quantity_units, self.qty_scale)} is below "
+                f"the minimum {format_units(self.min_qty, self.qty_scale)}"
+            )
+        if self.max_qty and quantity_units > self.max_qty:
+            return (
+                f"quantity {format_units(quantity_units, self.qty_scale)} is above "
+                f"the maximum {format_units(self.max_qty, self.qty_scale)}"
+            )
+        if quantity_units * price_units < self.min_notional:
+            return (
+                f"order value is below the minimum notional "
+                f"{format_units(self.min_notional, self.qty_scale + self.price_scale)}"
+            )
+        return None
+
+    def check_price(self, price_units: int) -> str | None:
+        """Returns the reason a price would be rejected by PRICE_FILTER, or None."""
+        if price_units <= 0 or (self.min_price and price_units < self.min_price):
+            return f"price {format_units(price_units, self.price_scale)} is below the minimum"
+        if self.max_price and price_units > self.max_price:
+            return f"price {format_units(price_units, self.price_scale)} is above the maximum"
+        return None
+
+    def quantity_for_usd(self, amount_usd: float, price: float) -> str | None:
+        """Returns the order quantity for a USD amount at `price`, or None if it would be rejected."""
+        # Stream prices are already tick-aligned, so only float noise is removed here
+        price_units = round(price * self.price_factor)
+        if price_units <= 0:
+            print("Invalid price.")
+            return None
+
+        quantity_units = self.quantity_units_for_usd(amount_usd, price_units)
+
+        # Fast path: a single combined range check, details only for rejected orders
+        if not (
+            self.min_qty <= quantity_units
+            and quantity_units > 0
+            and (not self.max_qty or quantity_units <= self.max_qty)
+            and quantity_units * price_units >= self.min_notional
+        ):
+            print(f"Order for {self.symbol} rejected locally: {self.check_order(quantity_units, price_units)}")
+            return None
+
+        if self.qty_scale:
+            return self._qty_format % divmod(quantity_units, self.qty_factor)
+        return self._qty_format % quantity_units
+
+    def format_price(self, price: float) -> str | None:
+        """Rounds a price to the nearest tick, or returns None if PRICE_FILTER would reject it."""
+        price_units = self.price_to_units(price)
+        error = self.check_price(price_units)
+        if error:
+            print(f"Price for {self.symbol} rejected locally: {error}")
+            return None
+
+        if self.price_scale:
+            return self._price_format % divmod(price_units, self.price_factor)
+        return self._price_format % price_units
+
+
+def build_quantizer(registry, symbol: str) -> SymbolQuantizer | None:
+    """Compiles the quantizer of a symbol from the registry, or returns None if rules are missing."""
+    info = registry.get(symbol)
+    if info is None or not info.tick_size or not (info.market_step_size or info.step_size):
+        return None
+    return SymbolQuantizer(info)
@@ -0,0 +1,257 @@
+import asyncio
+import re
+import threading
+import time
+
+#  Client-side request weight and order rate limits of the futures API.
+#
+#  Binance counts the IP request weight and the account's orders in fixed windows and bans
+#  with 429, then 418, when a window overflows. Each window is mirrored by a bucket that is
+#  refilled at the window boundary. Requests take their cost from the buckets before they are
+#  sent, and the `X-MBX-USED-WEIGHT-*` / `X-MBX-ORDER-COUNT-*` headers (or `rateLimits` of the
+#  WebSocket API) raise the count to the server's, which also sees other clients of the IP.
+#
+#  Traffic is prioritized by how much of a window it may use: orders all of it, status polls
+#  less, background requests least. Past half of their share, polls and background requests
+#  are spread over the rest of the window, so they slow down instead of being refused.
+#
+#  The `requests` adapter applying the limiter lives in core/client_warmup.py and aiohttp is
+#  imported by `trace_config`, so the GUI can create the limiter without loading either.
+
+PRIORITY_ORDER = 0  # order entry, protective orders, cancels
+PRIORITY_POLL = 1  # order status, positions, listen key
+PRIORITY_BACKGROUND = 2  # exchange info, depth snapshots, warmup
+PRIORITY_SHARES = (1.0, 0.85, 0.6)  # share of each window a priority may use
+PACING_START = 0.5  # part of its share after which a lower priority is paced
+
+# Futures defaults, in case the server does not report its own
+WEIGHT_LIMIT = 2400  # per minute and IP
+ORDER_LIMITS = {"10s": 300, "1m": 1200}  # per account
+
+MAX_ORDER_WAIT = 1.0  # seconds an order may wait for its window before it is refused locally
+BAN_RETRY_AFTER = 60.0  # seconds, if a 429/418 response has no Retry-After header
+SYNC_GRACE = 0.5  # seconds after a window boundary in which counts of the old window may arrive
+
+# (method, path) -> (weight, orders, priority); paths include the /fapi prefix
+REST_COSTS = {
+    ("POST", "/fapi/v1/order"): (0, 1, PRIORITY_ORDER),
+    ("DELETE", "/fapi/v1/order"): (1, 0, PRIORITY_ORDER),
+    ("POST", "/fapi/v1/batchOrders"): (5, 5, PRIORITY_ORDER),
+    ("DELETE", "/fapi/v1/allOpenOrders"): (1, 0, PRIORITY_ORDER),
+    ("GET", "/fapi/v1/order"): (1, 0, PRIORITY_POLL),
+    ("GET", "/fapi/v1/openOrders"): (1, 0, PRIORITY_POLL),
+    ("GET", "/fapi/v3/positionRisk"): (5, 0, PRIORITY_POLL),
+    ("GET", "/fapi/v2/account"): (5, 0, PRIORITY_POLL),
+    ("GET", "/fapi/v3/balance"): (5, 0, PRIORITY_POLL),
+    ("GET", "/fapi/v1/ticker/price"): (1, 0, PRIORITY_POLL),
+    ("POST", "/fapi/v1/listenKey"): (1, 0, PRIORITY_POLL),
+    ("PUT", "/fapi/v1/listenKey"): (1, 0, PRIORITY_POLL),
+    ("DELETE", "/fapi/v1/listenKey"): (1, 0, PRIORITY_POLL),
+    ("GET", "/fapi/v1/exchangeInfo"): (1, 0, PRIORITY_BACKGROUND),
+    ("GET", "/fapi/v1/depth"): (20, 0, PRIORITY_BACKGROUND),  # limit=1000
+    ("GET", "/fapi/v1/time"): (1, 0, PRIORITY_BACKGROUND),
+    ("GET", "/fapi/v1/ping"): (1, 0, PRIORITY_BACKGROUND),
+}
+WS_API_COSTS = {
+    "order.place": (0, 1, PRIORITY_ORDER),
+    "order.cancel": (1, 0, PRIORITY_ORDER),
+    "order.status": (1, 0, PRIORITY_POLL),
+    "ticker.price": (1, 0, PRIORITY_POLL),
+}
+DEFAULT_COST = (1, 0, PRIORITY_BACKGROUND)
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+WS_INTERVAL_UNITS = {"SECOND": "s", "MINUTE": "m", "HOUR": "h", "DAY": "d"}
+USAGE_HEADER = re.compile(r"x-mbx-(used-weight|order-count)-(\d+[smhd])$", re.IGNORECASE)
+
+
+
+class RateLimitExceeded(Exception):
+    """An order was refused locally because its limit window is exhausted or the IP is banned."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit reached, retry in {retry_after:.1f} s")
+        self.retry_after = retry_after
+
+
+class LimitBucket:
+    """Usage of one fixed limit window, refilled at each window boundary."""
+
+    __slots__ = ("limit", "interval", "used", "window_start", "paced_until")
+
+    def __init__(self, limit: int, interval: float):
+        self.limit = limit
+        self.interval = interval
+        self.used = 0
+        self.window_start = 0.0
+        self.paced_until = 0.0
+
+    def roll(self, now: float) -> None:
+        window_start = now - now % self.interval
+        if window_start != self.window_start:
+            self.window_start = window_start
+            self.used = 0
+            self.paced_until = 0.0
+
+    def wait_time(self, cost: int, priority: int, now: float) -> float:
+        """Seconds until `cost` may be taken at `priority`, 0 if it can be taken now."""
+        self.roll(now)
+        allowed = self.limit * PRIORITY_SHARES[priority]
+        if self.used + cost > allowed:
+            return self.window_start + self.interval - now
+        if priority != PRIORITY_ORDER and now < self.paced_until:
+            return self.paced_until - now
+        return 0.0
+
+    def take(self, cost: int, priority: int, now: float) -> None:
+        self.used += cost
+        allowed = self.limit * PRIORITY_SHARES[priority]
+        if priority != PRIORITY_ORDER and self.used > allowed * PACING_START:
+            # The next paced request waits its share of the time left in the window
+            left = self.window_start + self.interval - now
+            self.paced_until = now + left * cost / max(allowed - self.used, cost)
+
+    def sync(self, used: int, now: float) -> None:
+        """Raises the count to the one reported by the server."""
+        self.roll(now)
+        if now - self.window_start >= SYNC_GRACE:
+            self.used = max(self.used, used)
+
+
+class RateLimiter:
+    """Request weight and order count buckets shared by every client of the app.
+
+    Args:
+        clock: Optional `ClockSync`; windows are aligned to the server clock when it is synced.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock
+        self.buckets = {("weight", "1m"): LimitBucket(WEIGHT_LIMIT, 60)}
+        for interval, limit in ORDER_LIMITS.items():
+            self.buckets[("orders", interval)] = LimitBucket(limit, parse_interval(interval))
+        self.banned_until = 0.0
+        self.refused = 0  # orders refused locally
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        offset = self.clock.offset if self.clock is not None and self.clock.is_synced else 0.0
+        return time.time() + offset / 1000
+
+    def _reserve(self, cost: tuple) -> float:
+        """Takes the cost if every bucket allows it; otherwise returns the seconds to wait."""
+        weight, orders, priority = cost
+        with self._lock:
+            now = self.now()
+            if now < self.banned_until:
+                return self.banned_until - now
+
+            needed = []
+            for (kind, _), bucket in self.buckets.items():
+                amount = weight if kind == "weight" else orders
+                if amount:
+                    needed.append((bucket, amount))
+            wait = max((bucket.wait_time(amount, priority, now) for bucket, amount in needed), default=0.0)
+            if wait > 0:
+                return wait
+            for bucket, amount in needed:
+                bucket.take(amount, priority, now)
+            return 0.0
+
+    def _check_order_wait(self, cost: tuple, wait: float) -> None:
+        if cost[2] == PRIORITY_ORDER and wait > MAX_ORDER_WAIT:
+            self.refused += 1
+            raise RateLimitExceeded(wait)
+
+    def acquire(self, cost: tuple) -> None:
+        """Blocks until the request may be sent; raises `RateLimitExceeded` for a long order wait."""
+        while wait := self._reserve(cost):
+            self._check_order_wait(cost, wait)
+            time.sleep(wait)
+
+    async def acquire_async(self, cost: tuple) -> None:
+        while wait := self._reserve(cost):
+            self._check_order_wait(cost, wait)
+            await asyncio.sleep(wait)
+
+    def record_headers(self, status: int, headers) -> None:
+        """Syncs the buckets with the usage headers of a REST response, and notes bans."""
+        with self._lock:
+            now = self.now()
+            for name, value in headers.items():
+                match = USAGE_HEADER.match(name)
+                if match is None:
+                    continue
+                kind = "weight" if match.group(1).lower() == "used-weight" else "orders"
+                self._sync(kind, match.group(2).lower(), int(value), None, now)
+
+            if status in (429, 418):
+                retry_after = headers.get("Retry-After")
+                self._ban(float(retry_after) if retry_after else BAN_RETRY_AFTER, now)
+
+    def record_ws_limits(self, status: int, rate_limits: list, retry_after_ms: int | None = None) -> None:
+        """Syncs the buckets with the `rateLimits` of a WebSocket API response."""
+        with self._lock:
+            now = self.now()
+            for rate_limit in rate_limits or ():
+                kind = "weight" if rate_limit.get("rateLimitType") == "REQUEST_WEIGHT" else "orders"
+                unit = WS_INTERVAL_UNITS.get(rate_limit.get("interval"), "m")
+                interval = f"{rate_limit.get('intervalNum', 1)}{unit}"
+                self._sync(kind, interval, rate_limit.get("count", 0), rate_limit.get("limit"), now)
+
+            if status in (429, 418):
+                self._ban(retry_after_ms / 1000 if retry_after_ms else BAN_RETRY_AFTER, now)
+
+    def _sync(self, kind: str, interval: str, used: int, limit: int | None, now: float) -> None:
+        bucket = self.buckets.get((kind, interval))
+        if bucket is None:
+            # A window the defaults do not know about can only be tracked with its limit
+            if not limit:
+                return
+            bucket = self.buckets[(kind, interval)] = LimitBucket(limit, parse_interval(interval))
+        if limit:
+            bucket.limit = limit
+        bucket.sync(used, now)
+
+    def _ban(self, retry_after: float, now: float) -> None:
+        self.banned_until = max(self.banned_until, now + retry_after)
+        print(f"Rate limit hit, requests paused for {retry_after:.0f} s")
+
+    def usage(self) -> dict:
+        """(used, limit) of every window, e.g. {"weight 1m": (120, 2400), "orders 10s": (3, 300)}."""
+        with self._lock:
+            now = self.now()
+            usage = {}
+            for (kind, interval), bucket in self.buckets.items():
+                bucket.roll(now)
+                usage[f"{kind} {interval}"] = (bucket.used, bucket.limit)
+            return usage
+
+    def report(self) -> str:
+        parts = [f"{name} {used}/{limit}" for name, (used, limit) in self.usage().items()]
+        remaining = self.banned_until - self.now()
+        if remaining > 0:
+            parts.append(f"paused {remaining:.0f} s")
+        return "Rate limits: " + ", ".join(parts)
+
+    def trace_config(self):
+        """`aiohttp.TraceConfig` hooks applying the limiter to every request of a session."""
+        import aiohttp
+
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params) -> None:
+            await self.acquire_async(REST_COSTS.get((params.method, params.url.path), DEFAULT_COST))
+
+        async def on_request_end(session, context, params) -> None:
+            self.record_headers(params.response.status, params.response.headers)
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        return trace_config
+
+
+def parse_interval(interval: str) -> int:
+    """'10s' -> 10, '1m' -> 60."""
+    return int(interval[:-1]) * INTERVAL_UNITS[interval[-1]]
+
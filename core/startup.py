@@ -0,0 +1,67 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+#  Application startup off the GUI thread.
+#
+#  The window is shown before anything touches the network. The blocking steps (credential
+#  check, exchange info, account snapshot) run in parallel worker threads while the GUI thread
+#  starts the stream worker; each result is delivered back to the GUI thread as a Qt signal.
+#  The timeline records when each milestone was reached, counted from process start.
+
+MILESTONES = ("import", "window_shown", "connected", "exchange_info", "account", "first_price", "ready")
+STARTUP_WORKERS = 4
+
+
+
+class StartupTimeline:
+    """Milestones of the startup in ms since `started_at` (a `time.perf_counter()` value)."""
+
+    def __init__(self, started_at: float | None = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.milestones = {}  # name -> ms
+
+    def mark(self, name: str) -> bool:
+        """Records a milestone the first time it is reached; returns False if it already was."""
+        if name in self.milestones:
+            return False
+        self.milestones[name] = (time.perf_counter() - self.started_at) * 1000
+        return True
+
+    def report(self) -> str:
+        reached = sorted(self.milestones.items(), key=lambda item: item[1])
+        return "Startup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in reached)
+
+
+class StartupSignals(QtCore.QObject):
+    """Results of the background startup tasks, delivered in the GUI thread."""
+    task_done = QtCore.pyqtSignal(str, object, object)  # task name, result, exception
+
+
+class StartupOrchestrator:
+    """Runs blocking startup tasks in parallel threads.
+
+    Results arrive through `signals.task_done` in the GUI thread; a failed task reports
+    its exception instead of a result.
+    """
+
+    def __init__(self, timeline: StartupTimeline):
+        self.timeline = timeline
+        self.signals = StartupSignals()
+        self.executor = ThreadPoolExecutor(STARTUP_WORKERS, thread_name_prefix="hermes-startup")
+
+    def run(self, name: str, function, *args) -> None:
+        """Starts `function(*args)` in the background as the task `name`."""
+        future = self.executor.submit(function, *args)
+
+        def on_done(done_future) -> None:
+            error = done_future.exception()
+            result = None if error is not None else done_future.result()
+            self.signals.task_done.emit(name, result, error)
+
+        future.add_done_callback(on_done)
+
+    def shutdown(self) -> None:
+        """Drops the tasks that have not started; running ones finish on their own."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
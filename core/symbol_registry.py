@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+
+from config.config_paths import EXCHANGE_INFO_PATH
+
+# Filters kept per symbol; everything else in exchange info is dropped from the snapshot
+TRACKED_FILTERS = ("LOT_SIZE", "MARKET_LOT_SIZE", "PRICE_FILTER", "MIN_NOTIONAL")
+DEFAULT_TTL = 6 * 60 * 60  # seconds
+
+
+
+class SymbolInfo:
+    """Trading rules of a single futures symbol."""
+
+    __slots__ = (
+        "symbol", "status", "quantity_precision", "price_precision", "filters",
+        "step_size", "min_qty", "max_qty",
+        "market_step_size", "market_min_qty", "market_max_qty",
+        "tick_size", "min_price", "max_price",
+        "min_notional",
+    )
+
+    def __init__(self, data: dict):
+        self.symbol = data["symbol"]
+        self.status = data.get("status")
+        self.quantity_precision = data.get("quantityPrecision")
+        self.price_precision = data.get("pricePrecision")
+        self.filters = data["filters"]
+
+        lot_size = self.filters.get("LOT_SIZE", {})
+        self.step_size = lot_size.get("stepSize")
+        self.min_qty = lot_size.get("minQty")
+        self.max_qty = lot_size.get("maxQty")
+
+        market_lot_size = self.filters.get("MARKET_LOT_SIZE", lot_size)
+        self.market_step_size = market_lot_size.get("stepSize")
+        self.market_min_qty = market_lot_size.get("minQty")
+        self.market_max_qty = market_lot_size.get("maxQty")
+
+        price_filter = self.filters.get("PRICE_FILTER", {})
+        self.tick_size = price_filter.get("tickSize")
+        self.min_price = price_filter.get("minPrice")
+        self.max_price = price_filter.get("maxPrice")
+
+        # Futures report the minimum order value as "notional"
+        self.min_notional = self.filters.get("MIN_NOTIONAL", {}).get("notional")
+
+    @property
+    def is_trading(self) -> bool:
+        return self.status == "TRADING"
+
+    def to_dict(self) -> dict:
+        """Returns the compact form stored in the snapshot file."""
+        return {
+            "symbol": self.symbol,
+            "status": self.status,
+            "quantityPrecision": self.quantity_precision,
+            "pricePrecision": self.price_precision,
+            "filters": self.filters,
+        }
+
+
+def compact_symbol(raw: dict) -> dict:
+    """Strips a futures exchange info symbol entry down to the fields Hermes uses."""
+    return {
+        "symbol": raw["symbol"],
+        "status": raw.get("status"),
+        "quantityPrecision": raw.get("quantityPrecision"),
+        "pricePrecision": raw.get("pricePrecision"),
+        "filters": {
+            f["filterType"]: {k: v for k, v in f.items() if k != "filterType"}
+            for f in raw.get("filters", [])
+            if f["filterType"] in TRACKED_FILTERS
+        },
+    }
+
+
+class SymbolRegistry:
+    """Futures exchange info, fetched once and indexed by symbol.
+
+    A compact snapshot is kept on disk so the registry is usable immediately at startup,
+    and the data is refreshed in the background once it is older than the TTL.
+    """
+
+    def __init__(self, path: str = EXCHANGE_INFO_PATH, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.updated_at = 0.0  # wall-clock time of the last successful fetch
+        self._symbols = {}
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._symbols
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def get(self, symbol: str) -> SymbolInfo | None:
+        """Returns the trading rules of a symbol, or None if it is unknown."""
+        return self._symbols.get(symbol)
+
+    def is_stale(self) -> bool:
+        return time.time() - self.updated_at > self.ttl
+
+    def load_snapshot(self) -> bool:
+        """Loads the snapshot saved by a previous run. Returns True on success."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self._symbols = {s["symbol"]: SymbolInfo(s) for s in snapshot["symbols"]}
+            self.updated_at = snapshot.get("updated_at", 0.0)
+            print(f"Exchange info loaded from snapshot ({len(self._symbols)} symbols)")
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Unable to read exchange info snapshot: {e}")
+            return False
+
+    def save_snapshot(self) -> None:
+        """Writes the compact snapshot atomically, so a crash never leaves a broken file."""
+        snapshot = {
+            "updated_at": self.updated_at,
+            "symbols": [info.to_dict() for info in self._symbols.values()],
+        }
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Unable to save exchange info snapshot: {e}")
+
+    def refresh(self, client, only_if_stale: bool = False) -> bool:
+        """Downloads futures exchange info, rebuilds the index and saves the snapshot.
+
+        With `only_if_stale`, a download finished meanwhile by another thread is not repeated.
+        """
+        with self._refresh_lock:
+            if only_if_stale and not self.is_stale():
+                return True
+            try:
+                exchange_info = client.futures_exchange_info()
+            except Exception as e:
+                print(f"Error while fetching exchange info: {e}")
+                return False
+
+            # Build the new index aside and swap it in, so readers never see a partial one
+            self._symbols = {
+                s["symbol"]: SymbolInfo(compact_symbol(s)) for s in exchange_info["symbols"]
+            }
+            self.updated_at = time.time()
+
+        self.save_snapshot()
+        print(f"Exchange info refreshed ({len(self._symbols)} symbols)")
+        return True
+
+    def ensure_loaded(self, client) -> bool:
+        """Makes sure the registry has data, downloading it if there is no snapshot."""
+        if self._symbols:
+            return True
+        return self.refresh(client)
+
+    def _refresh_loop(self, client) -> None:
+        while not self._stop_event.is_set():
+            if self.is_stale():
+                self.refresh(client, only_if_stale=True)
+            # Wake up when the data is due, but retry a failed refresh within a minute
+            delay = max(60.0, self.updated_at + self.ttl - time.time())
+            self._stop_event.wait(delay)
+
+    def start_background_refresh(self, client) -> None:
+        """Starts a background thread refreshing the data whenever it gets older than the TTL."""
+        self.stop_background_refresh()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, args=(client,), daemon=True)
+        self._thread.start()
+
+    def stop_background_refresh(self) -> None:
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join(timeout=1)
+            self._thread = None
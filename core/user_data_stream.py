@@ -0,0 +1,300 @@
+import asyncio
+import json
+import threading
+from typing import NamedTuple
+
+import websockets
+
+from core.event_loop import AsyncLoopThread
+from core.websockets_listener import reconnect_delay
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+#  Account events of the futures user data stream.
+#
+#  The stream is opened with a listen key, created over REST and valid for 60 minutes after
+#  its last keepalive. The service sends a keepalive every 30 minutes and starts over with a
+#  new key when the key expires (a `listenKeyExpired` event, or -1125 from the keepalive) or
+#  the connection drops; Binance also closes every connection after 24 hours.
+#
+#  Each event is decoded once into a named tuple, only if its type has subscribers, and handed
+#  to them synchronously on the stream's event-loop thread. Subscribers must not block: they
+#  hand work to another thread, or submit a coroutine to the loop. Events sent while the stream
+#  was down are lost, so subscribers keeping state resync over REST when EVENT_CONNECTION
+#  reports a new connection.
+
+FUTURES_USER_STREAM_URL = "wss://fstream.binance.com/ws/"
+
+EVENT_ORDER_UPDATE = "ORDER_TRADE_UPDATE"
+EVENT_ACCOUNT_UPDATE = "ACCOUNT_UPDATE"
+EVENT_MARGIN_CALL = "MARGIN_CALL"
+EVENT_LISTEN_KEY_EXPIRED = "listenKeyExpired"
+EVENT_CONNECTION = "connection"  # published with True on connect and False on disconnect
+
+# Binance closes a listen key after 60 minutes without a keepalive
+LISTEN_KEY_KEEPALIVE_INTERVAL = 30 * 60  # seconds
+LISTEN_KEY_MISSING = -1125  # error code of a keepalive for a listen key that expired
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+
+class OrderUpdate(NamedTuple):
+    """ORDER_TRADE_UPDATE: a new, filled, canceled or expired order, or a partial fill."""
+    symbol: str
+    order_id: int
+    client_order_id: str
+    side: str
+    order_type: str
+    original_type: str  # type the order was placed with, e.g. STOP_MARKET after it triggered
+    execution_type: str  # NEW, TRADE, CANCELED, EXPIRED, AMENDMENT, ...
+    status: str  # NEW, PARTIALLY_FILLED, FILLED, CANCELED, EXPIRED, ...
+    quantity: float
+    price: float
+    stop_price: float
+    average_price: float
+    filled_quantity: float  # cumulative
+    last_quantity: float  # of this fill
+    last_price: float
+    reduce_only: bool
+    close_position: bool
+    position_side: str
+    realized_profit: float
+    trade_time: int  # ms
+    event_time: int  # ms
+    raw: dict  # the "o" payload, as consumed by FillTracker.on_order_update
+
+
+class BalanceUpdate(NamedTuple):
+    asset: str
+    wallet_balance: float
+    cross_wallet_balance: float
+    balance_change: float  # except PnL and commission
+
+
+class PositionUpdate(NamedTuple):
+    symbol: str
+    amount: float  # signed, 0 once closed
+    entry_price: float
+    unrealized_profit: float
+    margin_type: str
+    position_side: str
+
+
+class AccountUpdate(NamedTuple):
+    """ACCOUNT_UPDATE: balances and positions that changed, and why (ORDER, FUNDING_FEE, ...)."""
+    reason: str
+    balances: tuple[BalanceUpdate, ...]
+    positions: tuple[PositionUpdate, ...]
+    event_time: int
+    transaction_time: int
+
+
+class MarginCallPosition(NamedTuple):
+    symbol: str
+    position_side: str
+    amount: float
+    margin_type: str
+    mark_price: float
+    unrealized_profit: float
+    maintenance_margin: float
+
+
+class MarginCall(NamedTuple):
+    """MARGIN_CALL: positions whose margin ratio is close to liquidation."""
+    cross_wallet_balance: float
+    positions: tuple[MarginCallPosition, ...]
+    event_time: int
+
+
+def decode_order_update(data: dict) -> OrderUpdate:
+    order = data["o"]
+    return OrderUpdate(
+        order["s"], order["i"], order.get("c", ""), order["S"], order["o"], order.get("ot", order["o"]),
+        order["x"], order["X"], float(order["q"]), float(order.get("p", 0)), float(order.get("sp", 0)),
+        float(order.get("ap", 0)), float(order.get("z", 0)), float(order.get("l", 0)), float(order.get("L", 0)),
+        bool(order.get("R", False)), bool(order.get("cp", False)), order.get("ps", "BOTH"),
+        float(order.get("rp", 0)), order.get("T", 0), data.get("E", 0), order
+    )
+
+
+def decode_account_update(data: dict) -> AccountUpdate:
+    account = data["a"]
+    return AccountUpdate(
+        account.get("m", ""),
+        tuple(
+            BalanceUpdate(balance["a"], float(balance["wb"]), float(balance["cw"]), float(balance.get("bc", 0)))
+            for balance in account.get("B", ())
+        ),
+        tuple(
+            PositionUpdate(
+                position["s"], float(position["pa"]), float(position["ep"]), float(position.get("up", 0)),
+                position.get("mt", ""), position.get("ps", "BOTH")
+            )
+            for position in account.get("P", ())
+        ),
+        data.get("E", 0),
+        data.get("T", 0)
+    )
+
+
+def decode_margin_call(data: dict) -> MarginCall:
+    return MarginCall(
+        float(data.get("cw", 0)),
+        tuple(
+            MarginCallPosition(
+                position["s"], position.get("ps", "BOTH"), float(position["pa"]), position.get("mt", ""),
+                float(position.get("mp", 0)), float(position.get("up", 0)), float(position.get("mm", 0))
+            )
+            for position in data.get("p", ())
+        ),
+        data.get("E", 0)
+    )
+
+
+DECODERS = {
+    EVENT_ORDER_UPDATE: decode_order_update,
+    EVENT_ACCOUNT_UPDATE: decode_account_update,
+    EVENT_MARGIN_CALL: decode_margin_call,
+}
+
+
+class UserDataStream:
+    """Futures user data stream with its listen key lifecycle, publishing decoded account events.
+
+    Args:
+        url: User data stream endpoint; the listen key is appended.
+        loop_thread: `AsyncLoopThread` to run on; a dedicated one is started when None.
+    """
+
+    def __init__(self, url: str = FUTURES_USER_STREAM_URL, loop_thread: AsyncLoopThread | None = None):
+        self.url = url
+        self.owns_loop_thread = loop_thread is None
+        self.loop_thread = loop_thread or AsyncLoopThread(name="hermes-user-data")
+        self.loop_thread.start()
+        self._subscribers = {}  # event type -> tuple of callbacks, replaced on every change
+        self._lock = threading.Lock()
+        self._future = None
+
+        self.listen_key = None
+        self.is_connected = False
+        self.connections = 0
+        self.events = 0  # events published to at least one subscriber
+
+    def subscribe(self, event_type: str, callback) -> None:
+        """Calls `callback(event)` on the stream's loop for every event of `event_type`."""
+        with self._lock:
+            self._subscribers[event_type] = self._subscribers.get(event_type, ()) + (callback,)
+
+    def unsubscribe(self, event_type: str, callback) -> None:
+        with self._lock:
+            callbacks = tuple(c for c in self._subscribers.get(event_type, ()) if c != callback)
+            self._subscribers[event_type] = callbacks
+
+    def publish(self, event_type: str, event) -> None:
+        """Hands an event to the subscribers of its type; a failing subscriber does not stop the others."""
+        for callback in self._subscribers.get(event_type, ()):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"User data subscriber error ({event_type}): {e}")
+
+    def start(self, client) -> None:
+        """Starts the stream for the account of `client` (python-binance `Client`), replacing any previous one."""
+        self.stop_stream()
+        self._future = self.loop_thread.submit(self._run(client))
+
+    def stop_stream(self) -> None:
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    def stop(self) -> None:
+        self.stop_stream()
+        if self.owns_loop_thread:
+            self.loop_thread.stop()
+
+    def report(self) -> str:
+        state = "connected" if self.is_connected else "disconnected"
+        return f"User data stream {state}, {self.events} events, {max(self.connections - 1, 0)} reconnects"
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self.is_connected:
+            self.is_connected = connected
+            self.publish(EVENT_CONNECTION, connected)
+
+    async def _run(self, client) -> None:
+        attempt = 0
+        while True:
+            try:
+                self.listen_key = await asyncio.to_thread(client.futures_stream_get_listen_key)
+                async with websockets.connect(self.url + self.listen_key) as ws:
+                    print("User data stream connected")
+                    attempt = 0
+                    self.connections += 1
+                    self._set_connected(True)
+                    await self._receive(ws, client, self.listen_key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"User data stream error: {e}")
+            finally:
+                self._set_connected(False)
+            await asyncio.sleep(reconnect_delay(attempt))
+            attempt += 1
+
+    async def _receive(self, ws, client, listen_key: str) -> None:
+        """Publishes the events of one connection until it closes or the listen key expires."""
+        keepalive = asyncio.create_task(self._keep_alive(ws, client, listen_key))
+        try:
+            async for message in ws:
+                data = loads(message)
+                event_type = data.get("e")
+                if event_type == EVENT_LISTEN_KEY_EXPIRED:
+                    print("User data stream listen key expired, reconnecting")
+                    return
+
+                decode = DECODERS.get(event_type)
+                if decode is not None and self._subscribers.get(event_type):
+                    self.events += 1
+                    self.publish(event_type, decode(data))
+        finally:
+            keepalive.cancel()
+
+    async def _keep_alive(self, ws, client, listen_key: str) -> None:
+        """Extends the validity of the listen key; closes the connection once the key is gone."""
+        while True:
+            await asyncio.sleep(LISTEN_KEY_KEEPALIVE_INTERVAL)
+            try:
+                await asyncio.to_thread(client.futures_stream_keepalive, listen_key)
+            except Exception as e:
+                print(f"Listen key keepalive error: {e}")
+                if getattr(e, "code", None) == LISTEN_KEY_MISSING:
+                    # Starts over with a new listen key
+                    await ws.close()
+                    return
+
+
+def feed_fill_tracker(stream: UserDataStream, fill_tracker) -> None:
+    """Delivers the order updates and the connection state of the stream to a `FillTracker`."""
+    stream.subscribe(EVENT_ORDER_UPDATE, lambda update: fill_tracker.on_order_update(update.raw))
+    stream.subscribe(EVENT_CONNECTION, lambda connected: setattr(fill_tracker, "is_streaming", connected))
+
+
+def start_user_data_listener(
+        client,
+        fill_tracker,
+        url: str = FUTURES_USER_STREAM_URL
+) -> UserDataStream | None:
+    """Starts a user data stream on its own loop thread that delivers fill events to the order path."""
+    if not client:
+        print("Binance client is not initialized, user data stream not started!")
+        return None
+
+    stream = UserDataStream(url)
+    feed_fill_tracker(stream, fill_tracker)
+    stream.start(client)
+    return stream
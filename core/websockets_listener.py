@@ -1,48 +1,504 @@
 import asyncio
+import itertools
 import json
+import random
+import threading
+import time
 import websockets
-import websockets.asyncio.client
 
+from core.candles import CandleStore
+from core.frame_recorder import FrameRecorder
+from core.market_data_table import MarketDataTable, StreamMetrics
 
-async def listen_price(symbol, price_value, event) -> None:
+# Optional faster JSON backends, used by the decoder layer when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+FUTURES_STREAM_URL = "wss://fstream.binance.com/stream"
+
+# Reconnect backoff: doubled after every failed attempt, with jitter, up to the maximum
+RECONNECT_BASE_DELAY = 0.5  # seconds
+RECONNECT_MAX_DELAY = 30  # seconds
+STABLE_CONNECTION = 30  # seconds; a connection that lived this long resets the backoff
+# Dead connection detection
+HEARTBEAT_INTERVAL = 10  # seconds between pings
+HEARTBEAT_TIMEOUT = 10  # seconds to wait for the pong
+IDLE_TIMEOUT = 15  # seconds without any frame while subscribed
+
+# Commands accepted by the stream worker over its command channel
+CMD_SUBSCRIBE = "subscribe"
+CMD_UNSUBSCRIBE = "unsubscribe"
+CMD_STOP = "stop"
+
+# Decoded stream events are plain tuples, the cheapest objects to build and unpack:
+# ("trade", symbol, price, quantity, trade time (ms), is buyer maker, trade ID)
+# ("bookTicker", symbol, best bid, best ask, event time (ms))
+EVENT_TRADE = "trade"
+EVENT_BOOK_TICKER = "bookTicker"
+
+DECODER_AUTO = "auto"
+
+
+
+def event_from_data(data: dict) -> tuple | None:
+    """Builds the event tuple from the decoded "data" object of a combined stream frame."""
+    kind = data.get("e")
+    if kind == EVENT_TRADE:
+        return EVENT_TRADE, data["s"], float(data["p"]), float(data["q"]), data["T"], data["m"], data["t"]
+    if kind == EVENT_BOOK_TICKER:
+        return EVENT_BOOK_TICKER, data["s"], float(data["b"]), float(data["a"]), data["E"]
+    return None
+
+
+def decode_json(message: bytes | str) -> tuple | None:
+    """Reference decoder: the whole frame is parsed with the stdlib json module."""
+    data = json.loads(message).get("data")
+    return None if data is None else event_from_data(data)
+
+
+def _string_field(message: bytes, key: bytes) -> bytes:
+    start = message.index(key) + len(key)
+    return message[start:message.index(b'"', start)]
+
+
+def _int_field(message: bytes, key: bytes) -> int:
+    start = message.index(key) + len(key)
+    end = message.find(b",", start)
+    close = message.find(b"}", start)
+    if end == -1 or close < end:
+        end = close
+    return int(message[start:end])
+
+
+def decode_scan(message: bytes) -> tuple | None:
+    """Fast path: extracts only the used fields from the raw frame, without building dicts.
+
+    Fields are located by key, so their order does not matter. Anything unexpected
+    (missing key, escaped content) falls back to the stdlib decoder.
     """
-    Connects to Binance WebSocket trade stream for the given symbol
-    and continuously listens for real-time price updates.
+    kind_start = message.find(b'"e":"')
+    if kind_start == -1:
+        # Subscription replies carry no event
+        return None
+    try:
+        kind = message[kind_start + 5:kind_start + 6]
+        if kind == b"t":
+            return (
+                EVENT_TRADE,
+                _string_field(message, b'"s":"').decode(),
+                float(_string_field(message, b'"p":"')),
+                float(_string_field(message, b'"q":"')),
+                _int_field(message, b'"T":'),
+                message[message.index(b'"m":') + 4] == 116,  # "t" of true
+                _int_field(message, b'"t":'),
+            )
+        if kind == b"b":
+            return (
+                EVENT_BOOK_TICKER,
+                _string_field(message, b'"s":"').decode(),
+                float(_string_field(message, b'"b":"')),
+                float(_string_field(message, b'"a":"')),
+                _int_field(message, b'"E":'),
+            )
+    except ValueError:
+        pass
+    return decode_json(message)
 
-    On receiving each new trade message:
-    - Parses the price from the JSON message.
-    - Updates the shared multiprocessing.Value with the latest price.
-    - Sets the multiprocessing.Event to notify other processes of the update.
 
-    Args:
-        symbol (str): Trading pair symbol, e.g. 'btcusdt'.
-        price_value (multiprocessing.Value): Shared memory double to store current price.
-        event (multiprocessing.Event): Event to signal a new price update.
+def decode_orjson(message: bytes | str) -> tuple | None:
+    """Same as `decode_json` with the orjson parser."""
+    data = orjson.loads(message).get("data")
+    return None if data is None else event_from_data(data)
+
+
+if msgspec is not None:
+    # Typed schemas: msgspec skips every field that is not declared
+    # and converts the quoted prices to floats while parsing (strict=False)
+    class _TradeData(msgspec.Struct, tag_field="e", tag=EVENT_TRADE):
+        s: str
+        p: float
+        q: float
+        T: int
+        m: bool
+        t: int
+
+    class _BookTickerData(msgspec.Struct, tag_field="e", tag=EVENT_BOOK_TICKER):
+        s: str
+        b: float
+        a: float
+        E: int
+
+    class _StreamFrame(msgspec.Struct):
+        data: _TradeData | _BookTickerData | None = None
+
+    _msgspec_decoder = msgspec.json.Decoder(_StreamFrame, strict=False)
+
+
+def decode_msgspec(message: bytes | str) -> tuple | None:
+    """Typed msgspec decoder; frames with other events go through `decode_json`."""
+    try:
+        data = _msgspec_decoder.decode(message).data
+    except msgspec.ValidationError:
+        return decode_json(message)
+    if data is None:
+        return None
+    if type(data) is _TradeData:
+        return EVENT_TRADE, data.s, data.p, data.q, data.T, data.m, data.t
+    return EVENT_BOOK_TICKER, data.s, data.b, data.a, data.E
+
+
+def available_decoders() -> dict:
+    """Returns the decoders usable in this environment, fastest first."""
+    decoders = {}
+    if msgspec is not None:
+        decoders["msgspec"] = decode_msgspec
+    decoders["scan"] = decode_scan
+    if orjson is not None:
+        decoders["orjson"] = decode_orjson
+    decoders["json"] = decode_json
+    return decoders
+
+
+def get_decoder(name: str = DECODER_AUTO):
+    """Returns a frame decoder by name; "auto" (or an unavailable one) picks the fastest installed."""
+    decoders = available_decoders()
+    if name in decoders:
+        return decoders[name]
+    if name != DECODER_AUTO:
+        print(f"Stream decoder {name} is not available, using the fastest installed one")
+    return next(iter(decoders.values()))
+
+
+def trade_stream(symbol: str) -> str:
+    """Returns the name of the trade stream of a symbol, e.g. 'btcusdt@trade'."""
+    return f"{symbol.lower()}@trade"
+
+
+def book_ticker_stream(symbol: str) -> str:
+    """Returns the name of the best bid/ask stream of a symbol, e.g. 'btcusdt@bookTicker'."""
+    return f"{symbol.lower()}@bookTicker"
+
+
+def symbol_streams(symbol: str) -> list:
+    """Returns all streams published into the market data table for a symbol."""
+    return [trade_stream(symbol), book_ticker_stream(symbol)]
+
+
+def reconnect_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, so a network blip does not make every client
+    reconnect in lockstep."""
+    cap = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** attempt)
+    return cap / 2 + random.uniform(0, cap / 2)
+
 
-    This coroutine runs indefinitely until an exception occurs or connection closes.
+class StreamWorkerState:
+    """State of the stream worker shared by its receive and command tasks."""
+
+    def __init__(
+            self,
+            table: MarketDataTable,
+            notify_sock,
+            decoder: str = DECODER_AUTO,
+            candles: CandleStore | None = None,
+            recorder: FrameRecorder | None = None
+    ):
+        self.table = table
+        self.notify_sock = notify_sock
+        self.candles = candles
+        self.recorder = recorder
+        self.decode = get_decoder(decoder)
+        self.slots = {}  # upper-case symbol -> market data table slot
+        self.last_trade_ids = {}  # upper-case symbol -> last trade ID, for gap accounting
+        self.last_message_ns = 0
+        self.request_ids = itertools.count(1)
+
+        # Connection health, published in the market data table header
+        self.connected = False
+        self.reconnects = 0
+        self.downtime_ns = 0
+        self.missed_trades = 0
+        self.disconnected_since = 0
+
+    def publish_metrics(self) -> None:
+        self.table.write_metrics(StreamMetrics(
+            self.connected, self.reconnects, self.downtime_ns, self.missed_trades, self.disconnected_since
+        ))
+
+    def on_connected(self) -> None:
+        now = time.monotonic_ns()
+        if self.disconnected_since:
+            self.reconnects += 1
+            self.downtime_ns += now - self.disconnected_since
+            print(
+                f"Stream worker reconnected (reconnects: {self.reconnects}, "
+                f"downtime: {self.downtime_ns / 1e6:.0f} ms, missed trades: {self.missed_trades})"
+            )
+        self.connected = True
+        self.disconnected_since = 0
+        self.last_message_ns = now
+        self.publish_metrics()
+
+    def on_disconnected(self) -> None:
+        self.connected = False
+        self.disconnected_since = time.monotonic_ns()
+        self.publish_metrics()
+
+    def record_gap(self, symbol: str, missed: int) -> None:
+        self.missed_trades += missed
+        print(f"Gap in the {symbol} trade stream: {missed} trades missed")
+        self.publish_metrics()
+
+
+def wake_ui(state: StreamWorkerState) -> None:
+    """Sends one wake-up byte to the UI per batch of updates; never blocks the worker."""
+    if not state.table.mark_notify_pending():
+        return
+    try:
+        state.notify_sock.send(b"\0")
+    except (BlockingIOError, OSError):
+        # A full buffer already guarantees a wake-up, a closed one means the UI is gone
+        pass
+
+
+async def send_stream_method(ws, state: StreamWorkerState, method: str, symbols) -> None:
+    """Sends a SUBSCRIBE or UNSUBSCRIBE request for the streams of the given symbols."""
+    await ws.send(json.dumps({
+        "method": method,
+        "params": [stream for symbol in symbols for stream in symbol_streams(symbol)],
+        "id": next(state.request_ids),
+    }))
+
+
+async def receive_trades(ws, state: StreamWorkerState) -> None:
+    """Publishes trades and best bid/ask of the subscribed symbols into the market data table."""
+    table = state.table
+    slots = state.slots
+    last_trade_ids = state.last_trade_ids
+    candles = state.candles
+    recorder = state.recorder
+    decode = state.decode
+    while True:
+        try:
+            # Raw bytes: the decoders do not need the UTF-8 decoding of the whole frame
+            message = await ws.recv(decode=False)
+        except websockets.ConnectionClosedOK:
+            return
+        recv_time = time.monotonic_ns()
+        state.last_message_ns = recv_time
+        if recorder is not None:
+            recorder.record(message)
+        event = decode(message)
+        # Skips subscription replies and frames of a symbol that was just unsubscribed
+        if event is None:
+            continue
+        symbol = event[1]
+        slot = slots.get(symbol)
+        if slot is None:
+            continue
+
+        if event[0] == EVENT_TRADE:
+            _, _, price, quantity, trade_time, is_buyer_maker, trade_id = event
+            table.publish_trade(slot, price, trade_time, recv_time)
+            if candles is not None:
+                candles.on_trade(slot, price, quantity, trade_time, is_buyer_maker)
+            # Trade IDs are consecutive per symbol, so a jump counts the trades never received
+            last_trade_id = last_trade_ids.get(symbol)
+            if last_trade_id is not None and trade_id > last_trade_id + 1:
+                state.record_gap(symbol, trade_id - last_trade_id - 1)
+            last_trade_ids[symbol] = trade_id
+        else:
+            _, _, bid, ask, event_time = event
+            table.publish_quote(slot, bid, ask, event_time, recv_time)
+        wake_ui(state)
+
+
+async def watch_idle(state: StreamWorkerState) -> None:
+    """Fails when a subscribed connection stops delivering frames, even if pings still pass."""
+    while True:
+        await asyncio.sleep(1)
+        if state.slots and time.monotonic_ns() - state.last_message_ns > IDLE_TIMEOUT * 1_000_000_000:
+            raise TimeoutError(f"no stream data for {IDLE_TIMEOUT} s")
+
+
+async def handle_commands(ws, state: StreamWorkerState, commands: asyncio.Queue) -> None:
+    """Applies subscription changes sent by the UI to the open connection.
+
+    With `ws=None` (while reconnecting) only the local subscriptions are updated;
+    they are sent once the connection is back.
+    """
+    while True:
+        command = await commands.get()
+        name = command[0]
+
+        if name == CMD_STOP:
+            return
+
+        if name == CMD_UNSUBSCRIBE:
+            # Without a symbol every subscription is dropped
+            symbols = [command[1].upper()] if len(command) > 1 else list(state.slots)
+            symbols = [symbol for symbol in symbols if symbol in state.slots]
+            if symbols and ws is not None:
+                await send_stream_method(ws, state, "UNSUBSCRIBE", symbols)
+            for symbol in symbols:
+                # Never leave a stale price where orders could pick it up
+                state.table.release_slot(state.slots.pop(symbol))
+                state.last_trade_ids.pop(symbol, None)
+
+        elif name == CMD_SUBSCRIBE:
+            symbol = command[1].upper()
+            if symbol in state.slots:
+                continue
+            slot = state.table.assign_slot(symbol)
+            if slot is None:
+                continue
+            state.slots[symbol] = slot
+            if state.candles is not None:
+                # The slot may have held the bars of another symbol
+                state.candles.reset(slot)
+            # The idle timeout counts from the subscription
+            state.last_message_ns = time.monotonic_ns()
+            if ws is not None:
+                await send_stream_method(ws, state, "SUBSCRIBE", [symbol])
+                print(f"Subscribed to {', '.join(symbol_streams(symbol))}")
+
+
+def forward_commands(command_conn, loop, commands: asyncio.Queue) -> None:
+    """Blocks on the command pipe in a helper thread and hands commands to the event loop."""
+    while True:
+        try:
+            command = command_conn.recv()
+        except (EOFError, OSError):
+            # The UI process is gone
+            command = (CMD_STOP,)
+        loop.call_soon_threadsafe(commands.put_nowait, command)
+        if command[0] == CMD_STOP:
+            return
+
+
+async def stream_worker(
+        command_conn,
+        table_name,
+        notify_sock,
+        url: str = FUTURES_STREAM_URL,
+        decoder: str = DECODER_AUTO,
+        candle_store_name: str | None = None,
+        record_path: str | None = None
+) -> None:
+    """
+    Keeps a single combined-stream connection open for the lifetime of the app
+    and switches symbols with SUBSCRIBE/UNSUBSCRIBE instead of reconnecting.
+
+    Args:
+        command_conn (multiprocessing.connection.Connection): Receives UI commands:
+            ("subscribe", symbol), ("unsubscribe", symbol), ("unsubscribe",) or ("stop",).
+        table_name (str): Shared memory name of the market data table to publish into.
+        notify_sock (socket.socket): Non-blocking wake-up channel to the UI (see core/price_notifier.py).
+        url (str): Combined stream endpoint.
+        decoder (str): Frame decoder ("auto", "msgspec", "scan", "orjson" or "json").
+        candle_store_name (str | None): Shared memory name of the candle store to build bars into.
+        record_path (str | None): Gzip file to append every raw frame to (see core/frame_recorder.py).
     """
+    commands = asyncio.Queue()
+    threading.Thread(
+        target=forward_commands,
+        args=(command_conn, asyncio.get_running_loop(), commands),
+        daemon=True
+    ).start()
 
-    url = f"wss://fstream.binance.com/ws/{symbol.lower()}@trade"
+    table = MarketDataTable.attach(table_name)
+    candles = CandleStore.attach(candle_store_name) if candle_store_name else None
+    recorder = FrameRecorder(record_path) if record_path else None
+    if recorder is not None and not recorder.start():
+        recorder = None
     try:
-        async with websockets.connect(url) as ws:
-            async for message in ws:
-                data = json.loads(message)
-                price = float(data['p'])
-                price_value.value = price
-                event.set()
-                #print("⚡ event.set() work!")  # for debug
-
-                # Uncomment below to display price updates in the console
-                #print(f"Price updated: {price}")
-    except Exception as e:
-        print(f"WebSocket error: {e}")
-
-def run_listener(symbol, price_value, event) -> None:
+        await run_connection_loop(
+            StreamWorkerState(table, notify_sock, decoder, candles, recorder), commands, url
+        )
+    finally:
+        table.close()
+        if candles is not None:
+            candles.close()
+        if recorder is not None:
+            recorder.stop()
+
+
+async def run_connection_loop(state: StreamWorkerState, commands: asyncio.Queue, url: str) -> None:
+    """Keeps the combined stream connected until a stop command arrives.
+
+    Dead connections are detected by pings and by an idle timeout, and are
+    reopened with jittered exponential backoff; subscriptions are restored.
+    """
+    attempt = 0
+    while True:
+        connected_at = None
+        try:
+            async with websockets.connect(
+                    url, ping_interval=HEARTBEAT_INTERVAL, ping_timeout=HEARTBEAT_TIMEOUT
+            ) as ws:
+                connected_at = time.monotonic()
+                print("Stream worker connected")
+                state.on_connected()
+                # Restore the subscriptions after a reconnect
+                if state.slots:
+                    await send_stream_method(ws, state, "SUBSCRIBE", list(state.slots))
+
+                receive_task = asyncio.create_task(receive_trades(ws, state))
+                command_task = asyncio.create_task(handle_commands(ws, state, commands))
+                idle_task = asyncio.create_task(watch_idle(state))
+                done, pending = await asyncio.wait(
+                    {receive_task, command_task, idle_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in pending:
+                    task.cancel()
+
+                # The command task only finishes on a stop command
+                if command_task in done and command_task.exception() is None:
+                    return
+                for task in done:
+                    if task.exception() is not None:
+                        raise task.exception()
+                print("Stream connection closed")
+        except Exception as e:
+            print(f"WebSocket error: {e}")
+
+        state.on_disconnected()
+        if connected_at is not None and time.monotonic() - connected_at >= STABLE_CONNECTION:
+            attempt = 0
+        delay = reconnect_delay(attempt)
+        attempt += 1
+        print(f"Reconnecting in {delay:.1f} s")
+
+        # Keep taking commands while waiting, so a stop is never delayed by the backoff
+        try:
+            await asyncio.wait_for(handle_commands(None, state, commands), delay)
+            return
+        except TimeoutError:
+            pass
+
+
+def run_stream_worker(
+        command_conn,
+        table_name,
+        notify_sock,
+        decoder: str = DECODER_AUTO,
+        candle_store_name: str | None = None,
+        url: str = FUTURES_STREAM_URL,
+        record_path: str | None = None
+) -> None:
     """
-    Entry point to start the asyncio event loop and run the WebSocket listener.
+    Entry point of the long-lived stream worker process.
 
-    This function is intended to be called in a separate process to isolate
-    the async WebSocket logic and allow continuous price streaming without blocking.
+    Started once by the UI; symbol switches arrive over `command_conn`.
     """
 
-    asyncio.run(listen_price(symbol, price_value, event))
+    asyncio.run(stream_worker(
+        command_conn, table_name, notify_sock, url=url, decoder=decoder,
+        candle_store_name=candle_store_name, record_path=record_path
+    ))
@@ -0,0 +1,215 @@
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import time
+from urllib.parse import urlencode
+
+import websockets
+
+from core.event_loop import AsyncLoopThread
+from core.place_order import format_decimal
+from core.rate_limiter import DEFAULT_COST, WS_API_COSTS
+
+
+FUTURES_WS_API_URL = "wss://ws-fapi.binance.com/ws-fapi/v1"
+REQUEST_TIMEOUT = 10  # seconds
+
+# Order transports selectable in settings ("order_transport")
+ORDER_TRANSPORT_REST = "rest"
+ORDER_TRANSPORT_WS = "ws"
+
+
+class BinanceWsApiException(Exception):
+    """Error returned by the WebSocket API for a single request."""
+
+    def __init__(self, status: int, code: int, message: str):
+        super().__init__(f"WS API error (status={status}, code={code}): {message}")
+        self.status_code = status
+        self.code = code
+        self.message = message
+
+
+def format_params(params: dict) -> dict:
+    """Converts parameter values to the string form used by Binance (booleans as 'true'/'false',
+    floats in fixed-point)."""
+    return {
+        key: (
+            ("true" if value else "false") if isinstance(value, bool)
+            else format_decimal(value) if isinstance(value, float)
+            else str(value)
+        )
+        for key, value in params.items()
+        if value is not None
+    }
+
+
+def sign_params(params: dict, api_secret: str) -> str:
+    """Returns the HMAC SHA256 signature of the alphabetically sorted parameters."""
+    payload = urlencode(sorted(params.items()))
+    return hmac.new(api_secret.encode(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+class WsApiSession:
+    """One authenticated Binance Futures WebSocket API session.
+
+    After the connection is warm, each order request is a single framed message.
+    Responses are matched to requests by ID, so several requests can be in flight at once.
+    The order methods mirror python-binance's `AsyncClient`, so the session can be used
+    wherever the async order functions expect a client.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, url: str = FUTURES_WS_API_URL, limiter=None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.url = url
+        self.limiter = limiter  # core/rate_limiter.RateLimiter shared with the REST clients
+        self._ws = None
+        self._reader_task = None
+        self._pending = {}  # request ID -> asyncio.Future
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        # Kept in sync with the server clock by core/clock_sync.py
+        self.timestamp_offset = 0
+        self.recv_window = None
+
+    async def connect(self) -> None:
+        """Opens the WebSocket connection if it is not open yet."""
+        async with self._connect_lock:
+            if self._ws is not None:
+                return
+            self._ws = await websockets.connect(self.url)
+            self._reader_task = asyncio.create_task(self._read_responses())
+            print("WebSocket API session connected")
+
+    async def _read_responses(self) -> None:
+        """Dispatches responses to the futures of the pending requests."""
+        try:
+            async for message in self._ws:
+                response = json.loads(message)
+                if self.limiter is not None:
+                    self.limiter.record_ws_limits(
+                        response.get("status"),
+                        response.get("rateLimits"),
+                        (response.get("error", {}).get("data") or {}).get("retryAfter")
+                    )
+                future = self._pending.pop(response.get("id"), None)
+                if future is None or future.done():
+                    continue
+
+                if response.get("status") == 200:
+                    future.set_result(response["result"])
+                else:
+                    error = response.get("error", {})
+                    future.set_exception(BinanceWsApiException(
+                        response.get("status"), error.get("code"), error.get("msg")
+                    ))
+        except Exception as e:
+            print(f"WebSocket API session error: {e}")
+        finally:
+            self._ws = None
+            # Fail every request that will never get a response
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("WebSocket API session closed"))
+            self._pending.clear()
+
+    async def request(self, method: str, params: dict, signed: bool = True):
+        """Sends a request (signed unless it is a market data request) and waits for its result."""
+        if self.limiter is not None:
+            await self.limiter.acquire_async(WS_API_COSTS.get(method, DEFAULT_COST))
+        await self.connect()
+
+        params = format_params(params)
+        if signed:
+            params["apiKey"] = self.api_key
+            if self.recv_window:
+                params.setdefault("recvWindow", str(self.recv_window))
+            params["timestamp"] = str(int(time.time() * 1000 + self.timestamp_offset))
+            params["signature"] = sign_params(params, self.api_secret)
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        await self._ws.send(json.dumps({"id": request_id, "method": method, "params": params}))
+        try:
+            return await asyncio.wait_for(future, REQUEST_TIMEOUT)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def futures_create_order(self, **params) -> dict:
+        return await self.request("order.place", params)
+
+    async def futures_get_order(self, **params) -> dict:
+        return await self.request("order.status", params)
+
+    async def futures_cancel_order(self, **params) -> dict:
+        return await self.request("order.cancel", params)
+
+    async def futures_symbol_ticker(self, **params) -> dict:
+        return await self.request("ticker.price", params, signed=False)
+
+    async def futures_place_batch_order(self, batchOrders: list) -> list:
+        """Emulates the batch endpoint by sending all orders at once without waiting in between."""
+        results = await asyncio.gather(
+            *(self.futures_create_order(**order) for order in batchOrders),
+            return_exceptions=True
+        )
+        return [
+            {"code": getattr(result, "code", -1), "msg": str(result)}
+            if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    async def close_connection(self) -> None:
+        """Closes the WebSocket connection."""
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+
+class WsApiOrderClient:
+    """Synchronous facade of `WsApiSession` for the functions in core/place_order.py.
+
+    Provides the same order methods as python-binance's `Client`, running the session
+    on its own event-loop thread.
+    """
+
+    def __init__(self, api_key: str, api_secret: str, url: str = FUTURES_WS_API_URL, limiter=None):
+        self.loop_thread = AsyncLoopThread(name="hermes-ws-api")
+        self.loop_thread.start()
+        self.session = WsApiSession(api_key, api_secret, url, limiter)
+
+    def _call(self, coro):
+        return self.loop_thread.submit(coro).result(timeout=REQUEST_TIMEOUT)
+
+    def connect(self) -> None:
+        """Opens the session in advance so the first order does not pay the handshake."""
+        self._call(self.session.connect())
+
+    def futures_create_order(self, **params) -> dict:
+        return self._call(self.session.futures_create_order(**params))
+
+    def futures_get_order(self, **params) -> dict:
+        return self._call(self.session.futures_get_order(**params))
+
+    def futures_cancel_order(self, **params) -> dict:
+        return self._call(self.session.futures_cancel_order(**params))
+
+    def futures_symbol_ticker(self, **params) -> dict:
+        return self._call(self.session.futures_symbol_ticker(**params))
+
+    def futures_place_batch_order(self, batchOrders: list) -> list:
+        return self._call(self.session.futures_place_batch_order(batchOrders))
+
+    def close(self) -> None:
+        """Closes the session and stops its event-loop thread."""
+        try:
+            self._call(self.session.close_connection())
+        except Exception as e:
+            print(f"WebSocket API shutdown error: {e}")
+        self.loop_thread.stop()
@@ -1,14 +1,29 @@
+import time
+
+# Taken before the heavy imports, so the startup timeline includes them
+STARTED_AT = time.perf_counter()
+
 import sys
-from PyQt5.QtWidgets import QApplication
-from core.hermesMainWindow import HermesMainWindow
 
-# Ensures Nuitka includes this module for python-binance WebSocket support
-import websockets.legacy.client  # noqa: F401
+#  The application imports live under the main guard: the stream worker is started with the
+#  spawn method on Windows (and in the packaged app), whose child process imports this module
+#  again and should only load core/websockets_listener.py.
+#
+#  websockets resolves `websockets.connect` and the legacy client python-binance uses on first
+#  access, which Nuitka cannot follow; both are included explicitly instead of imported here.
+# nuitka-project: --include-module=websockets.asyncio.client
+# nuitka-project: --include-module=websockets.legacy.client
 
 
 
 if __name__ == "__main__":
+    from PyQt5.QtWidgets import QApplication
+    from core.hermesMainWindow import HermesMainWindow
+    from core.startup import StartupTimeline
+
+    timeline = StartupTimeline(STARTED_AT)
+    timeline.mark("import")
     app = QApplication(sys.argv)
-    window = HermesMainWindow()
+    window = HermesMainWindow(timeline)
     window.show()
     sys.exit(app.exec_())